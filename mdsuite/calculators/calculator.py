@@ -17,6 +17,7 @@ Summary
 import logging
 
 import abc
+import copy
 import random
 import sys
 import matplotlib.figure
@@ -30,6 +31,7 @@ from mdsuite.utils.meta_functions import *
 from mdsuite.memory_management.memory_manager import MemoryManager
 from mdsuite.database.data_manager import DataManager
 from mdsuite.database.simulation_database import Database
+from mdsuite.database.handle_pool import handle_pool
 from mdsuite.calculators.computations_dict import switcher_transformations
 from mdsuite.database.properties_database import PropertiesDatabase
 from mdsuite.database.analysis_database import AnalysisDatabase
@@ -82,8 +84,9 @@ class Calculator(metaclass=abc.ABCMeta):
         self.export = export
         self.atom_selection = atom_selection
         self.correlation_time = correlation_time
-        self.database = Database(name=os.path.join(self.experiment.database_path, "database.hdf5"))
+        self.database = Database(name=self.experiment.database_file)
         self.gpu = gpu
+        self.dtype = tf.float32 if self.experiment.precision == 'float32' else tf.float64  # dtype of the loaded data
         self.time = np.linspace(0.0, self.data_range * self.experiment.time_step * self.experiment.sample_rate,
                                 self.data_range)
 
@@ -256,8 +259,7 @@ class Calculator(metaclass=abc.ABCMeta):
 
         return [np.mean(fits), np.std(fits)]
 
-    @staticmethod
-    def _update_species_type_dict(dictionary: dict, path_list: list, dimension: int):
+    def _update_species_type_dict(self, dictionary: dict, path_list: list, dimension: int):
         """
         Update a type spec dictionary for a species input.
 
@@ -275,7 +277,7 @@ class Calculator(metaclass=abc.ABCMeta):
                 Dictionary for the type spec.
         """
         for item in path_list:
-            dictionary[str.encode(item)] = tf.TensorSpec(shape=(None, None, dimension), dtype=tf.float64)
+            dictionary[str.encode(item)] = tf.TensorSpec(shape=(None, None, dimension), dtype=self.dtype)
 
         return dictionary
 
@@ -317,7 +319,41 @@ class Calculator(metaclass=abc.ABCMeta):
         """
         data.to_csv(name)
 
-    def _prepare_managers(self, data_path: list):
+    def _probe_operation(self, batch: tf.Tensor, ensemble_loop: int):
+        """
+        Apply the operation to the first windows of a batch without changing the results of the calculator.
+
+        The windows are drawn through the same ensemble generator as in perform_computation. The operation is applied
+        by a shallow copy of the calculator with its own deep copies of the arrays, lists, dicts and variables the
+        operation may accumulate into, also in place, so the memory manager can time the operation. The other
+        attributes, e.g. the experiment and the database, are shared with the copy.
+
+        Parameters
+        ----------
+        batch : tf.Tensor
+                Batch holding at least one window.
+        ensemble_loop : int
+                Number of windows to apply the operation to.
+        """
+        accumulator_types = (np.ndarray, list, dict, tf.Variable)
+        accumulators = {key: value for key, value in self.__dict__.items() if isinstance(value, accumulator_types)}
+        # objects referenced from the accumulators which are also attributes of their own are shared, not copied.
+        shared = {id(value): value for value in self.__dict__.values() if not isinstance(value, accumulator_types)}
+        probe = copy.copy(self)
+        probe.__dict__.update(copy.deepcopy(accumulators, memo=shared))
+
+        probe.batch_size = batch.shape[0] if probe.system_property else batch.shape[1]
+        probe._update_output_signatures()
+        data_manager = DataManager(data_range=probe.data_range, ensemble_loop=ensemble_loop,
+                                   correlation_time=probe.correlation_time)
+        ensemble_generator, ensemble_generator_args = data_manager.ensemble_generator(system=probe.system_property)
+        ensemble_data_set = tf.data.Dataset.from_generator(generator=ensemble_generator,
+                                                           args=ensemble_generator_args + (batch,),
+                                                           output_signature=probe.ensemble_output_signature)
+        for ensemble_index, ensemble in enumerate(ensemble_data_set):
+            probe._apply_operation(ensemble, ensemble_index)
+
+    def _prepare_managers(self, data_path: list, plan_batches: bool = False):
         """
         Prepare the memory and tensor_values monitors for calculation.
 
@@ -325,6 +361,9 @@ class Calculator(metaclass=abc.ABCMeta):
         ----------
         data_path : list
                 List of tensor_values paths to load from the hdf5 database_path.
+        plan_batches : bool
+                If true, the batch size is planned from the measured cost of reading the data and of applying the
+                operation to a window, otherwise it is the largest which fits into memory.
 
         Returns
         -------
@@ -334,11 +373,28 @@ class Calculator(metaclass=abc.ABCMeta):
                                             database=self.database,
                                             memory_fraction=0.8,
                                             scale_function=self.scale_function,
-                                            gpu=self.gpu)
+                                            gpu=self.gpu,
+                                            dtype=self.dtype,
+                                            data_range=self.data_range,
+                                            correlation_time=self.correlation_time,
+                                            window_operation=self._probe_operation if plan_batches else None)
         self.batch_size, self.n_batches, self.remainder = self.memory_manager.get_batch_size(
             system=self.system_property)
 
         self.ensemble_loop, minibatch = self.memory_manager.get_ensemble_loop(self.data_range, self.correlation_time)
+        plan = self.memory_manager.plan
+        if plan is not None and not minibatch:
+            message = (f"Batch plan for {', '.join(data_path)}: {plan['n_batches']} batches of {plan['batch_size']} "
+                       f"configurations (memory allows {plan['memory_bound_batch_size']}), {self.ensemble_loop} "
+                       f"windows per batch, {plan['windows']} windows in total")
+            if plan['window_time'] is None:
+                log.info(f"{message}; the only plan which keeps the windows")
+            else:
+                log.info(f"{message}; chosen from {plan['candidates']} plans, measured "
+                         f"{plan['read_overhead'] * 1e3:.2f} ms + {plan['configuration_read_time'] * 1e3:.3f} ms "
+                         f"per configuration per read and {plan['batch_overhead'] * 1e3:.2f} ms + "
+                         f"{plan['window_time'] * 1e3:.2f} ms per window per batch, estimated runtime "
+                         f"{plan['estimated_runtime']:.2f} s")
         if minibatch:
             self.batch_size = self.memory_manager.batch_size
             self.n_batches = self.memory_manager.n_batches
@@ -356,7 +412,8 @@ class Calculator(metaclass=abc.ABCMeta):
                                         minibatch=minibatch,
                                         atom_batch_size=self.memory_manager.atom_batch_size,
                                         n_atom_batches=self.memory_manager.n_atom_batches,
-                                        atom_remainder=self.memory_manager.atom_remainder
+                                        atom_remainder=self.memory_manager.atom_remainder,
+                                        dtype=self.dtype
                                         )
         self._update_output_signatures()
 
@@ -609,7 +666,7 @@ class Calculator(metaclass=abc.ABCMeta):
         if self.system_property:
             self._calculate_prefactor()
             data_path = [join_path(self.loaded_property, self.loaded_property)]
-            self._prepare_managers(data_path)
+            self._prepare_managers(data_path, plan_batches=True)
             batch_generator, batch_generator_args = self.data_manager.batch_generator(system=self.system_property)
             batch_data_set = tf.data.Dataset.from_generator(generator=batch_generator,
                                                             args=batch_generator_args,
@@ -642,7 +699,7 @@ class Calculator(metaclass=abc.ABCMeta):
             for species in self.species:
                 self._calculate_prefactor(species)
                 data_path = [join_path(species, self.loaded_property)]
-                self._prepare_managers(data_path)
+                self._prepare_managers(data_path, plan_batches=True)
                 batch_generator, batch_generator_args = self.data_manager.batch_generator()
                 batch_data_set = tf.data.Dataset.from_generator(generator=batch_generator,
                                                                 args=batch_generator_args,
@@ -685,13 +742,14 @@ class Calculator(metaclass=abc.ABCMeta):
         Run the appropriate analysis
         """
         self._check_input()
-        self._run_dependency_check()
-        if self.experimental:
-            log.warning("\n ########## \n "
-                     "This is an experimental calculator. It is provided as it can still be used, however, it may not be"
-                     " memory safe or completely accurate. \n Please see the documentation for more information. \n "
-                     "#########")
-        if self.optimize:
-            pass
-        else:
-            return self.perform_computation()
+        with handle_pool.session():
+            self._run_dependency_check()
+            if self.experimental:
+                log.warning("\n ########## \n "
+                         "This is an experimental calculator. It is provided as it can still be used, however, it may "
+                         "not be memory safe or completely accurate. \n Please see the documentation for more "
+                         "information. \n #########")
+            if self.optimize:
+                pass
+            else:
+                return self.perform_computation()
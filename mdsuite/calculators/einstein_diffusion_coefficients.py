@@ -124,8 +124,8 @@ class EinsteinDiffusionCoefficients(Calculator):
         -------
         Update the class state.
         """
-        self.batch_output_signature = tf.TensorSpec(shape=(None, self.batch_size, 3), dtype=tf.float64)
-        self.ensemble_output_signature = tf.TensorSpec(shape=(None, self.data_range, 3), dtype=tf.float64)
+        self.batch_output_signature = tf.TensorSpec(shape=(None, self.batch_size, 3), dtype=self.dtype)
+        self.ensemble_output_signature = tf.TensorSpec(shape=(None, self.data_range, 3), dtype=self.dtype)
 
     def _calculate_prefactor(self, species: str = None):
         """
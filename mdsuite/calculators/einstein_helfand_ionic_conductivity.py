@@ -117,8 +117,8 @@ class EinsteinHelfandIonicConductivity(Calculator):
         -------
 
         """
-        self.batch_output_signature = (tf.TensorSpec(shape=(self.batch_size, 3), dtype=tf.float64))
-        self.ensemble_output_signature = tf.TensorSpec(shape=(self.data_range, 3), dtype=tf.float64)
+        self.batch_output_signature = (tf.TensorSpec(shape=(self.batch_size, 3), dtype=self.dtype))
+        self.ensemble_output_signature = tf.TensorSpec(shape=(self.data_range, 3), dtype=self.dtype)
 
     def _calculate_prefactor(self, species: str = None):
         """
@@ -36,7 +36,7 @@ class DataManager:
                  n_batches: int = None, batch_size: int = None, ensemble_loop: int = None,
                  correlation_time: int = 1, remainder: int = None, atom_selection=np.s_[:],
                  minibatch: bool = False, atom_batch_size : int = None, n_atom_batches: int = None,
-                 atom_remainder: int = None, offset: int = 0):
+                 atom_remainder: int = None, offset: int = 0, dtype: tf.DType = tf.float64):
         """
         Constructor for the DataManager class
 
@@ -44,6 +44,8 @@ class DataManager:
         ----------
         database : Database
                 Database object from which tensor_values should be loaded
+        dtype : tf.DType
+                Type of the loaded tensors, tf.float32 halves the memory of every batch.
         """
         self.database = database
         self.data_path = data_path
@@ -52,6 +54,7 @@ class DataManager:
         self.n_atom_batches = n_atom_batches
         self.atom_remainder = atom_remainder
         self.offset = offset
+        self.dtype = dtype
 
         self.data_range = data_range
         self.n_batches = n_batches
@@ -74,6 +77,7 @@ class DataManager:
                 self.database.name,
                 self.data_path,
                 dictionary)
+        layouts = {} if system else self._get_layouts()
 
         def generator(batch_number: int, batch_size: int, database: str, data_path: list, dictionary: bool):
             """
@@ -112,7 +116,9 @@ class DataManager:
                 yield database.load_data(data_path,
                                          select_slice=select_slice,
                                          dictionary=dictionary,
-                                         d_size=data_size)
+                                         d_size=data_size,
+                                         dtype=self.dtype,
+                                         layouts=layouts)
 
         def system_generator(batch_number: int, batch_size: int, database: str, data_path: list, dictionary: bool):
             """
@@ -142,7 +148,8 @@ class DataManager:
                 if batch == batch_number:
                     stop = int(start + self.remainder)
 
-                yield database.load_data(data_path, select_slice=np.s_[start:stop], dictionary=dictionary)
+                yield database.load_data(data_path, select_slice=np.s_[start:stop], dictionary=dictionary,
+                                         dtype=self.dtype)
 
         def atom_generator(batch_number: int, batch_size: int, database: str, data_path: list, dictionary: bool):
             """
@@ -186,7 +193,9 @@ class DataManager:
                     yield database.load_data(data_path,
                                              select_slice=select_slice,
                                              dictionary=dictionary,
-                                             d_size=data_size)
+                                             d_size=data_size,
+                                             dtype=self.dtype,
+                                             layouts=layouts)
 
         if self.remainder == 0:
             remainder = False
@@ -198,6 +207,29 @@ class DataManager:
         else:
             return generator, args
 
+    def _get_layouts(self) -> dict:
+        """
+        Choose the layout from which each path is read by the batch generators.
+
+        The selection of the first batch stands for all of them, as they differ only in their configurations.
+
+        Returns
+        -------
+        layouts : dict
+                Paths of the time series copies to read instead of the datasets, see Database.get_layouts.
+        """
+        if self.data_path is None or self.batch_size is None:
+            return {}
+        configurations = np.s_[self.offset:self.offset + int(self.batch_size)]
+        if self.minibatch:
+            select_slice = np.s_[0:self.atom_batch_size, configurations]
+        elif type(self.atom_selection) is dict:
+            select_slice = {item: np.s_[self.atom_selection[item], configurations] for item in self.atom_selection}
+        else:
+            select_slice = np.s_[self.atom_selection, configurations]
+
+        return self.database.get_layouts(self.data_path, select_slice)
+
     def ensemble_generator(self, system: bool = False, dictionary: bool = False) -> tuple:
         """
         Build a generator for the ensemble loop
@@ -0,0 +1,305 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for the statistics of datasets which are updated while the datasets are written.
+
+Summary
+-------
+Every batch written into a dataset is reduced to the number of values, the minimum, maximum, mean and the sum of the
+squared deviations from the mean of each component. Statistics of adjacent batches are merged with the pairwise update
+of Chan et al., so the statistics of a dataset are exact whatever the batch size and are stored as attributes of the
+dataset, where summaries read them without loading the data.
+
+For positions, the number of box crossings is counted as well. A crossing is a change of a component between two
+consecutive configurations of more than half the side length of the box. For wrapped positions these are the atoms
+leaving the box through one side and entering through the other, for unwrapped positions there should be none, as any
+such jump means the unwrapping failed or the configurations were sampled too far apart. The first and last
+configuration of each batch are kept so the crossings between batches are counted as well.
+"""
+
+import logging
+
+import numpy as np
+
+log = logging.getLogger(__file__)
+
+positional_properties = ('Positions', 'Unwrapped_Positions')  # properties whose box crossings are counted
+statistics_attributes = ('configurations', 'count', 'minimum', 'maximum', 'mean', 'variance', 'box_crossings')
+
+
+def count_box_crossings(data: np.ndarray, box: list) -> int:
+    """
+    Count the jumps of more than half the box between consecutive configurations.
+
+    Parameters
+    ----------
+    data : np.ndarray
+            Positions of shape (n_atoms, n_configurations, n_dimensions).
+    box : list
+            Side lengths of the simulation box.
+
+    Returns
+    -------
+    crossings : int
+            Number of components of the atoms which jump across the box.
+    """
+    half_box = 0.5 * np.asarray(box, dtype=np.float64)[:data.shape[-1]]
+    return int(np.count_nonzero(np.abs(np.diff(data, axis=1)) > half_box))
+
+
+def _reduce_columns(values: np.ndarray, function: np.ufunc, square: bool = False, group: int = 64) -> np.ndarray:
+    """
+    Reduce the rows of a contiguous array of a few columns.
+
+    Reducing along the rows of an array with a few columns runs an inner loop over the few columns for every row. The
+    rows are therefore first reduced in groups, viewed as rows of group * n_columns values, and the groups are reduced
+    afterwards, which is several times faster.
+
+    Parameters
+    ----------
+    values : np.ndarray
+            Contiguous array of shape (n_rows, n_columns).
+    function : np.ufunc
+            Reduction, e.g. np.minimum or np.add.
+    square : bool
+            If true, the squares of the values are summed, function must be np.add.
+    group : int
+            Number of rows reduced together.
+
+    Returns
+    -------
+    reduced : np.ndarray
+            Array of shape (n_columns,).
+    """
+    n_rows, n_columns = values.shape
+    split = n_rows - n_rows % group
+    parts = []
+    if split > 0:
+        head = values[:split].reshape(-1, group * n_columns)
+        head = np.einsum('ij,ij->j', head, head) if square else function.reduce(head, axis=0)
+        parts.append(head.reshape(group, n_columns))
+    if split < n_rows:
+        tail = values[split:]
+        parts.append(tail * tail if square else tail)
+
+    return function.reduce(np.concatenate(parts), axis=0)
+
+
+class DatasetStatistics:
+    """
+    Class for the statistics of a range of configurations of a dataset.
+
+    Attributes
+    ----------
+    start : int
+            First configuration of the range.
+    stop : int
+            Configuration after the last one of the range.
+    count : int
+            Number of values of each component.
+    minimum : np.ndarray
+            Smallest value of each component.
+    maximum : np.ndarray
+            Largest value of each component.
+    mean : np.ndarray
+            Mean of each component.
+    m2 : np.ndarray
+            Sum of the squared deviations from the mean of each component.
+    box_crossings : int
+            Number of box crossings within the range, None if they are not counted.
+    first : np.ndarray
+            First configuration of the range, None if the crossings are not counted or it is not known.
+    last : np.ndarray
+            Last configuration of the range, None if the crossings are not counted or it is not known.
+    """
+
+    def __init__(self, start: int, stop: int, count: int, minimum: np.ndarray, maximum: np.ndarray,
+                 mean: np.ndarray, m2: np.ndarray, box_crossings: int = None, first: np.ndarray = None,
+                 last: np.ndarray = None):
+        """
+        Constructor for the DatasetStatistics.
+
+        Parameters
+        ----------
+        start : int
+                First configuration of the range.
+        stop : int
+                Configuration after the last one of the range.
+        count : int
+                Number of values of each component.
+        minimum : np.ndarray
+                Smallest value of each component.
+        maximum : np.ndarray
+                Largest value of each component.
+        mean : np.ndarray
+                Mean of each component.
+        m2 : np.ndarray
+                Sum of the squared deviations from the mean of each component.
+        box_crossings : int
+                Number of box crossings within the range.
+        first : np.ndarray
+                First configuration of the range.
+        last : np.ndarray
+                Last configuration of the range.
+        """
+        self.start = start
+        self.stop = stop
+        self.count = count
+        self.minimum = minimum
+        self.maximum = maximum
+        self.mean = mean
+        self.m2 = m2
+        self.box_crossings = box_crossings
+        self.first = first
+        self.last = last
+
+    @classmethod
+    def from_data(cls, data: np.ndarray, start: int, box: list = None):
+        """
+        Compute the statistics of a batch.
+
+        Parameters
+        ----------
+        data : np.ndarray
+                Batch of shape (n_atoms, n_configurations, n_dimensions), or (n_configurations, n_dimensions) for a
+                system property.
+        start : int
+                Configuration in the dataset at which the batch is written.
+        box : list
+                Side lengths of the simulation box. If given, the box crossings of the batch are counted.
+
+        Returns
+        -------
+        statistics : DatasetStatistics
+        """
+        data = np.asarray(data)
+        values = np.ascontiguousarray(data, dtype=np.float64).reshape(-1, data.shape[-1])
+        count = values.shape[0]
+        mean = _reduce_columns(values, np.add) / count
+        # the squares are summed in the same pass, which is accurate as long as the spread of the values is not
+        # negligible against their mean, as for the properties of a trajectory.
+        m2 = np.maximum(_reduce_columns(values, np.add, square=True) - count * mean ** 2, 0.0)
+        statistics = cls(start, start + data.shape[-2], count, _reduce_columns(values, np.minimum),
+                         _reduce_columns(values, np.maximum), mean, m2)
+        if box is not None:
+            statistics.count_box_crossings(data, box)
+
+        return statistics
+
+    def count_box_crossings(self, data: np.ndarray, box: list):
+        """
+        Count the box crossings of the batch the statistics were computed from.
+
+        Parameters
+        ----------
+        data : np.ndarray
+                Batch of shape (n_atoms, n_configurations, n_dimensions). The crossings of system properties are not
+                counted.
+        box : list
+                Side lengths of the simulation box.
+        """
+        if data.ndim != 3:
+            return
+        self.box_crossings = count_box_crossings(data, box)
+        self.first = np.array(data[:, 0])
+        self.last = np.array(data[:, -1])
+
+    def select(self, columns: slice) -> 'DatasetStatistics':
+        """
+        Select the statistics of some of the components.
+
+        Parameters
+        ----------
+        columns : slice
+                Components to select, e.g. the columns of a property in the statistics of all columns of a species.
+
+        Returns
+        -------
+        statistics : DatasetStatistics
+                Statistics of the selected components, without box crossings.
+        """
+        return DatasetStatistics(self.start, self.stop, self.count, self.minimum[columns], self.maximum[columns],
+                                 self.mean[columns], self.m2[columns])
+
+    @classmethod
+    def from_attributes(cls, attributes):
+        """
+        Load the statistics stored with a dataset.
+
+        Parameters
+        ----------
+        attributes
+                Attributes of the dataset.
+
+        Returns
+        -------
+        statistics : DatasetStatistics
+                Statistics of the configurations from the first one up to the stored number, or None if the dataset
+                has no statistics.
+        """
+        if 'configurations' not in attributes:
+            return None
+        count = int(attributes['count'])
+        box_crossings = attributes.get('box_crossings')
+
+        return cls(0, int(attributes['configurations']), count, np.asarray(attributes['minimum'], dtype=np.float64),
+                   np.asarray(attributes['maximum'], dtype=np.float64),
+                   np.asarray(attributes['mean'], dtype=np.float64),
+                   np.asarray(attributes['variance'], dtype=np.float64) * count,
+                   None if box_crossings is None else int(box_crossings))
+
+    def to_attributes(self) -> dict:
+        """
+        Build the attributes under which the statistics are stored.
+
+        Returns
+        -------
+        attributes : dict
+                Statistics keyed by their attribute name. box_crossings is None if they are not counted.
+        """
+        return {'configurations': self.stop,
+                'count': self.count,
+                'minimum': self.minimum,
+                'maximum': self.maximum,
+                'mean': self.mean,
+                'variance': self.m2 / max(self.count, 1),
+                'box_crossings': self.box_crossings}
+
+    def merge(self, other: 'DatasetStatistics', box: list = None) -> 'DatasetStatistics':
+        """
+        Merge the statistics of the range which follows this one.
+
+        Parameters
+        ----------
+        other : DatasetStatistics
+                Statistics of the range starting at the stop of this range.
+        box : list
+                Side lengths of the simulation box, used to count the crossings between the two ranges.
+
+        Returns
+        -------
+        statistics : DatasetStatistics
+                Statistics of both ranges.
+        """
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+
+        box_crossings = None
+        if self.box_crossings is not None and other.box_crossings is not None:
+            box_crossings = self.box_crossings + other.box_crossings
+            if self.last is not None and other.first is not None and box is not None:
+                box_crossings += count_box_crossings(np.stack([self.last, other.first], axis=1), box)
+
+        return DatasetStatistics(self.start, other.stop, count, np.minimum(self.minimum, other.minimum),
+                                 np.maximum(self.maximum, other.maximum), mean, m2, box_crossings, self.first,
+                                 other.last)
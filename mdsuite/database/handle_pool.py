@@ -0,0 +1,229 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for reusing open hdf5 files.
+
+Summary
+-------
+Outside of a session, every call to open_file opens the file and closes it again, so no file stays open between
+operations of the user. Inside a session, e.g. while a calculator or a transformation runs, the first call opens the
+file and later calls reuse the handle, so loops which load one batch at a time do not pay for opening the file on
+every batch. A process holds at most one handle per file, as hdf5 does not allow a file to be opened for reading and
+writing at the same time: a read handle is reopened for writing when needed, which is refused while a caller still
+holds the read handle. All handles are closed when the outermost session ends.
+
+Files are written with the library version required for single-writer/multiple-reader (SWMR) access, and read handles
+are opened as SWMR readers. Once start_swmr_write has been called on a file, other processes can read it while this
+process appends to its datasets.
+"""
+
+import logging
+import os
+from contextlib import contextmanager
+
+import h5py as hf
+
+log = logging.getLogger(__file__)
+
+swmr_libver = ('v110', 'latest')  # the oldest file format which supports SWMR
+
+
+class HDF5HandlePool:
+    """
+    Class to share open hdf5 files between the calls of a session.
+
+    Attributes
+    ----------
+    handles : dict
+            Open files of the current session keyed by their absolute path.
+    depth : int
+            Number of sessions entered and not yet left, handles are only kept while it is larger than zero.
+    users : dict
+            Number of open_file contexts which currently hold each handle, keyed like handles.
+    """
+
+    def __init__(self):
+        """
+        Constructor for the HDF5HandlePool.
+        """
+        self.handles = {}
+        self.depth = 0
+        self.users = {}
+        self._pid = os.getpid()
+        self._inherited = []
+
+    def _check_process(self):
+        """
+        Forget the handles of the parent process in a forked child.
+
+        The handles are kept referenced but never used or closed, closing them in the child could write to files the
+        parent still has open.
+
+        Returns
+        -------
+        Resets the pool if the process has changed.
+        """
+        if os.getpid() != self._pid:
+            self._inherited.extend(self.handles.values())
+            self.handles = {}
+            self.depth = 0
+            self.users = {}
+            self._pid = os.getpid()
+
+    @staticmethod
+    def _open(file_path: str, mode: str) -> hf.File:
+        """
+        Open a file for reading or writing.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the file.
+        mode : str
+                Mode of h5py.File.
+
+        Returns
+        -------
+        database : hf.File
+        """
+        if mode == 'r':
+            return hf.File(file_path, 'r', swmr=True)
+
+        return hf.File(file_path, mode, libver=swmr_libver)
+
+    @contextmanager
+    def session(self):
+        """
+        Keep the files opened within the session open until it ends.
+
+        Sessions can be nested, the handles are closed when the outermost one ends.
+
+        Yields
+        ------
+        pool : HDF5HandlePool
+        """
+        self._check_process()
+        self.depth += 1
+        try:
+            yield self
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                self.close_all()
+
+    @contextmanager
+    def open_file(self, file_path: str, mode: str = 'r'):
+        """
+        Open a file, reusing its handle within a session.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the file.
+        mode : str
+                Either 'r' for reading, or 'r+' or 'a' for writing.
+
+        Yields
+        ------
+        database : hf.File
+                Open file. It must not be closed by the caller.
+
+        Raises
+        ------
+        RuntimeError
+                If the file is opened for writing within a session while an enclosing context holds its read handle,
+                which would have to be closed to reopen the file.
+        """
+        self._check_process()
+        if self.depth == 0:
+            with self._open(file_path, mode) as database:
+                yield database
+            return
+
+        key = os.path.abspath(file_path)
+        database = self.handles.get(key)
+        if database is not None and database.id.valid and mode != 'r' and database.mode == 'r' and self.users.get(key):
+            raise RuntimeError(f"{file_path} can not be opened for writing while its read handle is in use")
+        if database is not None and (not database.id.valid or (mode != 'r' and database.mode == 'r')):
+            self.release(file_path)
+            database = None
+        if database is None:
+            database = self._open(file_path, mode)
+            self.handles[key] = database
+
+        self.users[key] = self.users.get(key, 0) + 1
+        try:
+            yield database
+        finally:
+            if self.users.get(key):  # the count is reset if the process was forked in the meantime
+                self.users[key] -= 1
+
+    def flush(self, file_path: str):
+        """
+        Write the buffered changes of a file to disk, so they can be seen by SWMR readers in other processes.
+
+        Without SWMR writing, the changes are written when the handle is closed at the end of the session.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the file.
+        """
+        database = self.handles.get(os.path.abspath(file_path))
+        if database is not None and database.id.valid and database.mode != 'r' and database.swmr_mode:
+            database.flush()
+
+    def start_swmr_write(self, file_path: str):
+        """
+        Let other processes read a file while this process writes to it.
+
+        Once SWMR writing has started, datasets can be resized and written but the structure of the file must not be
+        changed, so no datasets or groups can be added until the session ends.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the file, which must be opened within a session.
+        """
+        if self.depth == 0:
+            log.warning("SWMR writing is only possible within a session")
+            return
+        with self.open_file(file_path, 'r+') as database:
+            if database.swmr_mode:
+                return
+            try:
+                database.swmr_mode = True
+            except RuntimeError:
+                log.warning(f"{file_path} was created without SWMR support and cannot be read while it is written")
+
+    def release(self, file_path: str):
+        """
+        Close the handle of a file.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the file.
+        """
+        database = self.handles.pop(os.path.abspath(file_path), None)
+        if database is not None and database.id.valid:
+            database.close()
+
+    def close_all(self):
+        """
+        Close all handles of the pool.
+        """
+        self._check_process()
+        for file_path in list(self.handles):
+            self.release(file_path)
+
+
+handle_pool = HDF5HandlePool()
@@ -12,14 +12,23 @@ Copyright Contributors to the MDSuite Project.
 Class for database_path objects and all of their operations
 """
 
+import logging
+import os
+
 import h5py as hf
 import numpy as np
+from mdsuite.database.storage_backends import get_backend, is_dataset
+from mdsuite.database.storage_layout import get_chunk_shape, get_compression_options, make_resizable, \
+    get_read_cost, get_time_series_path, time_series_suffix
 from mdsuite.utils.meta_functions import join_path
 from mdsuite.utils.exceptions import *
 import tensorflow as tf
 import time
 from typing import Union
 import pandas as pd
+from mdsuite.database.dataset_statistics import DatasetStatistics, positional_properties, statistics_attributes
+
+log = logging.getLogger(__file__)
 
 var_names = ["Temperature", "Time", "Thermal_Flux", "Stress_visc", "Positions", "Scaled_Positions",
              "Unwrapped_Positions", "Scaled_Unwrapped_Positions", "Velocities", "Forces", "Box_Images",
@@ -43,9 +52,26 @@ class Database:
 
     name : str
             The name of the database_path in question.
+
+    access_pattern : str
+            Access pattern from which the chunk shapes of new datasets are derived, see
+            mdsuite.database.storage_layout. If None, the pattern stored in the database_path is used.
+
+    compression : str
+            Compression policy of new datasets, see mdsuite.database.storage_layout. If None, the policy stored in
+            the database_path is used.
+
+    box : list
+            Side lengths of the simulation box, used to count the box crossings of the positions which are written.
+
+    time_series_properties : list
+            Properties of which a copy with the 'time_series' layout is kept, see update_time_series_copies. If None,
+            the properties stored in the database_path are used.
     """
 
-    def __init__(self, architecture: str = 'simulation', name: str = 'database'):
+    def __init__(self, architecture: str = 'simulation', name: str = 'database', access_pattern: str = None,
+                 compression: str = None, backend: str = None, box: list = None,
+                 time_series_properties: list = None):
         """
         Constructor for the database_path class.
 
@@ -56,10 +82,33 @@ class Database:
                 database_path, or an analysis database_path.
         name : str
                 The name of the database_path in question.
+        access_pattern : str
+                One of 'batch', 'frame' or 'time_series'. If None, the pattern stored when the database_path was
+                initialized is used, or 'batch' if none was stored.
+        compression : str
+                One of 'none', 'lzf', 'gzip' or 'scaleoffset', optionally with a level, e.g. 'gzip:6'. If None, the
+                policy stored when the database_path was initialized is used, or 'lzf' if none was stored.
+        backend : str
+                Storage backend, either 'hdf5' for a single file or 'directory' for a directory of chunk files which
+                several processes can write to. If None, it is detected from name, see get_backend.
+        box : list
+                Side lengths of the simulation box. If None, the box crossings of the positions are not counted.
+        time_series_properties : list
+                Properties, e.g. ['Unwrapped_Positions', 'Velocities'], of which a copy with the 'time_series' layout
+                is kept. If None, the properties stored when the copies were last updated are used.
         """
 
         self.architecture = architecture  # architecture of database_path
         self.name = name  # name of the database_path
+        self.access_pattern = access_pattern
+        self.compression = compression
+        self.backend = get_backend(name, backend)  # storage the datasets are read from and written to
+        self._buffers = {}  # buffers of the species partitions, reused between batches, see _partition_batch
+        self._memory_maps = {}  # memory maps of contiguous datasets, see read_frames
+        self.box = box
+        self.time_series_properties = time_series_properties
+        self._statistics = {}  # statistics of the datasets written by this object, see merge_statistics
+        self._pending_statistics = {}  # statistics of batches written ahead of the preceding ones
 
     @staticmethod
     def close(database: hf.File):
@@ -78,22 +127,6 @@ class Database:
 
         database.close()
 
-    @staticmethod
-    def _update_indices(data: np.array, reference: np.array, batch_size: int, n_atoms: int):
-        """
-        Update the indices key of the structure dictionary if the tensor_values must be sorted.
-
-        Returns
-        -------
-
-        """
-
-        ids = np.reshape(np.array(data[:, 0]).astype(int), (-1, n_atoms))
-        ref_ids = np.argsort(ids, axis=1)
-        n_batches = ids.shape[0]
-
-        return (ref_ids[:, reference - 1] + (np.arange(n_batches) * n_atoms)[None].T).flatten()
-
     @staticmethod
     def _build_path_input(structure: dict) -> dict:
         """
@@ -134,9 +167,9 @@ class Database:
 
         return architecture
 
-    def open(self, mode: str = 'a') -> hf.File:
+    def open(self, mode: str = 'a'):
         """
-        Open the database_path
+        Open the database_path through its storage backend
 
         Parameters
         ----------
@@ -145,14 +178,14 @@ class Database:
 
         Returns
         -------
-        database_path : hf.File
-                returns a database_path object
+        context : contextmanager
+                Context manager which yields the root group of the database_path, see StorageBackend.open.
         """
 
-        return hf.File(self.name, mode)
+        return self.backend.open(mode)
 
     def add_data(self, data: np.array, structure: dict, start_index: int, batch_size: int, tensor: bool = False,
-                 system_tensor: bool = False, flux: bool = False, sort: bool = False, n_atoms: int = None):
+                 system_tensor: bool = False, flux: bool = False):
         """
         Add a set of tensor_values to the database_path.
 
@@ -174,48 +207,295 @@ class Database:
                 {'Na/Velocities': {'indices': [1, 3, 7, 8, ... ], 'columns' = [3, 4, 5], 'length': 500}}
         data : np.array
                 Data to be loaded in.
-        sort : bool
-                If true, tensor_values is sorted before being dumped into the database_path.
-        n_atoms : int
-                Necessary if the sort function is called. Total number of atoms in the experiment.
         Returns
         -------
         Adds tensor_values to the database_path
         """
 
-        with hf.File(self.name, 'r+') as database:
+        with self.backend.open('r+') as database:
             stop_index = start_index + batch_size  # get the stop index
+            if not (tensor or system_tensor or flux):
+                for buffer, items in self._partition_batch(data, structure, batch_size):
+                    statistics = DatasetStatistics.from_data(buffer, start_index)  # of every column of the species
+                    for item, columns in items:
+                        database[item].write_direct(buffer, source_sel=np.s_[:, :, columns],
+                                                    dest_sel=np.s_[:, start_index:stop_index, :])
+                        self._merge_statistics(database, item, buffer[:, :, columns], start_index,
+                                               statistics=statistics.select(columns))
             for item in structure:
                 if tensor:
                     database[item][:, start_index:stop_index, :] = data[:, :, 0:3]
+                    self._merge_statistics(database, item, data[:, :, 0:3], start_index)
                 elif system_tensor:
                     database[item][start_index:stop_index, :] = data[:, 0:3]
+                    self._merge_statistics(database, item, data[:, 0:3], start_index)
                 elif flux:
-                    database[item][start_index:stop_index, :] = data[structure[item]['indices']][
+                    values = data[structure[item]['indices']][
                         np.s_[:, structure[item]['columns'][0]:structure[item]['columns'][-1] + 1]].astype(float)
+                    database[item][start_index:stop_index, :] = values
+                    self._merge_statistics(database, item, values, start_index)
+        self.backend.flush()
+
+    def get_batch(self, data: np.array, structure: dict, batch_size: int) -> dict:
+        """
+        Split a batch of raw configurations into the numeric arrays of each dataset.
+
+        Parameters
+        ----------
+        data : np.array
+                Raw configurations as returned by a trajectory reader.
+        structure : dict
+                Structure of the tensor_values, see add_data.
+        batch_size : int
+                Number of configurations in the batch.
+
+        Returns
+        -------
+        batch : dict
+                Arrays of shape (n_atoms, batch_size, n_columns) keyed by database path.
+        """
+        batch = {}
+        for buffer, items in self._partition_batch(data, structure, batch_size, reuse_buffers=False):
+            batch.update({item: buffer[:, :, columns] for item, columns in items})
+
+        return batch
+
+    def write_batch(self, batch: dict, start_index: int, update_statistics: bool = True) -> dict:
+        """
+        Write the arrays of a batch into the database_path.
+
+        Parameters
+        ----------
+        batch : dict
+                Arrays of shape (n_atoms, n_configurations, n_columns) keyed by database path, e.g. from get_batch.
+        start_index : int
+                Configuration from which to start filling.
+        update_statistics : bool
+                If true, the statistics of the batch are merged into the stored ones. Processes which write batches
+                alongside others return the statistics instead, to be merged by a single process with
+                merge_statistics.
+
+        Returns
+        -------
+        statistics : dict
+                DatasetStatistics of the batch keyed by database path, or None if they have been merged.
+        """
+        statistics = {}
+        with self.backend.open('r+') as database:
+            for item, data in batch.items():
+                data = np.ascontiguousarray(data)
+                database[item].write_direct(data, dest_sel=np.s_[:, start_index:start_index + data.shape[1], :])
+                if update_statistics:
+                    self._merge_statistics(database, item, data, start_index)
                 else:
-                    database[item][:, start_index:stop_index, :] = self._get_data(data, structure, item, batch_size, sort,
-                                                                                  n_atoms=n_atoms)
+                    statistics[item] = DatasetStatistics.from_data(data, start_index, box=self._get_box(item, data))
+        self.backend.flush()
+
+        return None if update_statistics else statistics
 
-    def _get_data(self, data: np.array, structure: dict, item: str, batch_size: int, sort: bool = False,
-                  n_atoms: int = None):
+    def _get_box(self, path: str, data: np.ndarray) -> Union[list, None]:
         """
-        Fetch tensor_values with some format from a large array.
+        Get the box with which the crossings of a dataset are counted.
+
+        Parameters
+        ----------
+        path : str
+                Path to the dataset in the database_path.
+        data : np.ndarray
+                Data written into the dataset.
 
         Returns
         -------
+        box : list
+                Side lengths of the box, or None if the dataset holds no atomistic positions.
+        """
+        if self.box is None or len(data.shape) != 3 or path.rstrip('/').split('/')[-1] not in positional_properties:
+            return None
+
+        return self.box
 
+    def _merge_statistics(self, database: hf.File, path: str, data: np.ndarray, start_index: int,
+                          statistics: DatasetStatistics = None):
         """
-        if sort:
-            indices = self._update_indices(data, structure[item]['indices'], batch_size, n_atoms)
-            return data[indices][
-                np.s_[:, structure[item]['columns'][0]:structure[item]['columns'][-1] + 1]].astype(float).reshape(
-                (structure[item]['length'], batch_size, len(structure[item]['columns'])), order='F')
-        else:
-            indices = structure[item]['indices']
-            return data[indices][
-                np.s_[:, structure[item]['columns'][0]:structure[item]['columns'][-1] + 1]].astype(float).reshape(
-                (structure[item]['length'], batch_size, len(structure[item]['columns'])), order='F')
+        Compute the statistics of a batch and merge them into those stored with its dataset.
+
+        Parameters
+        ----------
+        database : hf.File
+                Open database_path.
+        path : str
+                Path to the dataset.
+        data : np.ndarray
+                Batch written into the dataset.
+        start_index : int
+                Configuration at which the batch is written.
+        statistics : DatasetStatistics
+                Statistics of the batch if they are already computed, the box crossings are counted here.
+        """
+        data = np.asarray(data)
+        if data.shape[-2] == 0:
+            return
+        box = self._get_box(path, data)
+        if statistics is None:
+            statistics = DatasetStatistics.from_data(data, int(start_index), box=box)
+        elif box is not None:
+            statistics.count_box_crossings(data, box)
+        self._update_statistics(database, path, statistics)
+
+    def merge_statistics(self, statistics: dict):
+        """
+        Merge the statistics of batches, e.g. returned by write_batch, into those stored with their datasets.
+
+        The batches may arrive in any order. A batch is merged once all configurations before it are, until then its
+        statistics are held by this object.
+
+        Parameters
+        ----------
+        statistics : dict
+                DatasetStatistics keyed by database path.
+        """
+        with self.backend.open('r+') as database:
+            for path, item in statistics.items():
+                self._update_statistics(database, path, item)
+        self.backend.flush()
+
+    def _update_statistics(self, database: hf.File, path: str, statistics: DatasetStatistics):
+        """
+        Merge the statistics of a batch into the stored statistics of its dataset.
+
+        Parameters
+        ----------
+        database : hf.File
+                Open database_path.
+        path : str
+                Path to the dataset.
+        statistics : DatasetStatistics
+                Statistics of the batch.
+        """
+        dataset = database[path]
+        stored = DatasetStatistics.from_attributes(dataset.attrs)
+        cached = self._statistics.get(path)
+        if stored is not None and cached is not None and cached.stop == stored.stop:
+            stored = cached  # keeps the last configuration, which is not stored
+        pending = self._pending_statistics.setdefault(path, {})
+        stop = 0 if stored is None else stored.stop
+
+        if statistics.start < stop:
+            # configurations which are already summarised are written again.
+            pending.clear()
+            self._statistics.pop(path, None)
+            stored, stop = None, 0
+            if statistics.start > 0:
+                log.debug(f"{path} is partly overwritten, its statistics are dropped")
+                for key in statistics_attributes:
+                    dataset.attrs.pop(key, None)
+                return
+
+        pending[statistics.start] = statistics
+        if stop not in pending:
+            return
+        while stop in pending:
+            following = pending.pop(stop)
+            if stored is None:
+                stored = following
+            else:
+                if stored.last is None and following.first is not None:
+                    stored.last = np.asarray(self._read(database, path, np.s_[:, stop - 1]))
+                stored = stored.merge(following, box=self.box)
+            stop = stored.stop
+
+        self._statistics[path] = stored
+        attributes = stored.to_attributes()
+        if attributes['box_crossings'] is None:
+            dataset.attrs.pop('box_crossings', None)
+            del attributes['box_crossings']
+        dataset.attrs.update(attributes)
+
+    def get_statistics(self, path: str = None) -> dict:
+        """
+        Get the statistics stored with the datasets, without reading the data.
+
+        Parameters
+        ----------
+        path : str
+                Path to a dataset or group. If None, the statistics of every dataset are returned.
+
+        Returns
+        -------
+        statistics : dict
+                Dictionaries with the number of configurations summarised and the minimum, maximum, mean and variance
+                of each component, as well as the number of box crossings if they were counted, keyed by the path to
+                the dataset. Datasets without statistics are left out.
+        """
+        statistics = {}
+
+        def collect(name, item):
+            if is_dataset(item) and 'configurations' in item.attrs:
+                statistics[name] = {key: item.attrs[key] for key in statistics_attributes if key in item.attrs}
+
+        with self.backend.open('r') as database:
+            if path is None:
+                database.visititems(collect)
+            elif is_dataset(database[path]):
+                collect(path, database[path])
+            else:
+                database[path].visititems(lambda name, item: collect(join_path(path, name), item))
+
+        return statistics
+
+    def _partition_batch(self, data: np.array, structure: dict, batch_size: int, reuse_buffers: bool = True):
+        """
+        Split a batch of raw configurations by species.
+
+        The rows of each species are gathered once, with all columns, into a buffer of shape
+        (n_atoms, batch_size, n_columns). Every property of the species is then a slice of the columns of the buffer,
+        which hdf5 reads directly when the property is written, so the batch is copied once rather than once per
+        property.
+
+        Parameters
+        ----------
+        data : np.array
+                Raw configurations as returned by a trajectory reader.
+        structure : dict
+                Structure of the tensor_values, see add_data. The properties of a species share their indices.
+        batch_size : int
+                Number of configurations in the batch.
+        reuse_buffers : bool
+                If true, the buffers are kept and overwritten by the next batch of the same size, so the partitions
+                must be written before the next call.
+
+        Yields
+        ------
+        buffer : np.ndarray
+                Rows of a species of shape (n_atoms, batch_size, n_columns).
+        items : list
+                (path, columns) tuples of the properties of the species, where columns is the slice of the columns of
+                the buffer which hold the property.
+        """
+        if data.dtype.kind != 'f':
+            data = data.astype(float)
+        if reuse_buffers and any(shape[1] != batch_size for shape, _ in self._buffers):
+            self._buffers = {}  # the batch size has changed
+
+        species = {}
+        for item in structure:
+            species.setdefault(item.split('/')[0], []).append(item)  # paths are species/property
+
+        for items in species.values():
+            indices = structure[items[0]]['indices']
+            length = structure[items[0]]['length']
+            rows = np.asarray(indices).reshape(batch_size, length).T  # (atom, configuration) -> row of data
+
+            shape = (length, batch_size, data.shape[1])
+            buffer = self._buffers.get((shape, data.dtype)) if reuse_buffers else None
+            if buffer is None:
+                buffer = np.empty(shape, dtype=data.dtype)
+                if reuse_buffers:
+                    self._buffers[(shape, data.dtype)] = buffer
+            np.take(data, rows, axis=0, out=buffer, mode='raise')
+
+            columns = [structure[item]['columns'] for item in items]
+            yield buffer, [(item, slice(column[0], column[-1] + 1)) for item, column in zip(items, columns)]
 
     def resize_dataset(self, structure: dict):
         """
@@ -231,33 +511,34 @@ class Database:
         -------
 
         """
-        # ensure the database_path already exists
-        try:
-            database = hf.File(self.name, 'r+')
-        except DatabaseDoesNotExist:
-            raise DatabaseDoesNotExist
-
         # construct the architecture dict
         architecture = self._build_path_input(structure=structure)
 
-        # Check for a type error in the dataset information
-        for identifier in architecture:
-            dataset_information = architecture[identifier]
-            try:
-                if type(dataset_information) is not tuple:
-                    print("Invalid input for dataset generation")
+        with self.backend.open('r+') as database:
+            # Check for a type error in the dataset information
+            for identifier in architecture:
+                dataset_information = architecture[identifier]
+                try:
+                    if type(dataset_information) is not tuple:
+                        print("Invalid input for dataset generation")
+                        raise TypeError
+                except TypeError:
                     raise TypeError
-            except TypeError:
-                raise TypeError
 
-            # get the correct maximum shape for the dataset -- changes if a experiment property or an atomic property
-            if len(dataset_information[:-1]) == 1:
-                axis = 0
-                expansion = dataset_information[0] + database[identifier].shape[0]
-            else:
-                axis = 1
-                expansion = dataset_information[1] + database[identifier].shape[1]
-            database[identifier].resize(expansion, axis)
+                # get the correct maximum shape for the dataset -- changes if a experiment property or an atomic
+                # property
+                if len(dataset_information[:-1]) == 1:
+                    axis = 0
+                    expansion = dataset_information[0] + database[identifier].shape[0]
+                else:
+                    axis = 1
+                    expansion = dataset_information[1] + database[identifier].shape[1]
+                if database[identifier].chunks is None:  # contiguous datasets cannot be resized
+                    make_resizable(database, identifier,
+                                   access_pattern=self.access_pattern or database.attrs.get('access_pattern', 'batch'),
+                                   compression=self.compression or database.attrs.get('compression', 'lzf'))
+                database[identifier].resize(expansion, axis)
+        self.backend.flush()
 
     def initialize_database(self, structure: dict):
         """
@@ -278,6 +559,11 @@ class Database:
         -------
 
         """
+        with self.backend.open('a') as database:
+            if self.access_pattern is not None:
+                database.attrs['access_pattern'] = self.access_pattern
+            if self.compression is not None:
+                database.attrs['compression'] = self.compression
 
         self.add_dataset(structure)  # add a dataset to the groups
 
@@ -302,7 +588,9 @@ class Database:
         Updates the database_path directly.
         """
 
-        with hf.File(self.name, 'a') as database:
+        with self.backend.open('a') as database:
+            access_pattern = self.access_pattern or database.attrs.get('access_pattern', 'batch')
+            filters = get_compression_options(self.compression or database.attrs.get('compression', 'lzf'))
             architecture = self._build_path_input(structure)  # get the correct file path
             for item in architecture:
                 dataset_information = architecture[item]  # get the tuple information
@@ -324,8 +612,9 @@ class Database:
                     max_shape[1] = None
                     max_shape = tuple(max_shape)
 
+                chunks = get_chunk_shape(dataset_information, access_pattern)
                 database.create_dataset(dataset_path, dataset_information,
-                                        maxshape=max_shape, scaleoffset=5, chunks=True)
+                                        maxshape=max_shape, chunks=chunks, **filters)
 
     def _add_group_structure(self, structure: dict):
         """
@@ -345,7 +634,7 @@ class Database:
         Updates the database_path directly.
         """
 
-        with hf.File(self.name, 'a') as database:
+        with self.backend.open('a') as database:
             # Build file paths for the addition.
             architecture = self._build_path_input(structure=structure)
             for item in list(architecture):
@@ -363,7 +652,7 @@ class Database:
         memory_database : dict
                 A dictionary of the memory information of the groups in the database_path
         """
-        with hf.File(self.name, 'r') as database:
+        with self.backend.open('r') as database:
             memory_database = {}
             for item in database:
                 for ds in database[item]:
@@ -385,10 +674,10 @@ class Database:
         response : bool
                 If true, the path exists, else, it does not.
         """
-        with hf.File(self.name, 'r') as database_object:
+        with self.backend.open('r') as database_object:
             keys = []
-            database_object.visit(lambda item: keys.append(database_object[item].name) if type(database_object[item]) is
-                                                                                          hf.Dataset else None)
+            database_object.visit(
+                lambda item: keys.append(database_object[item].name) if is_dataset(database_object[item]) else None)
             path = f'/{path}'  # add the / to avoid name overlapping
 
             response = any(list(item.endswith(path) for item in keys))
@@ -409,19 +698,129 @@ class Database:
         """
 
         # db = hf.File(self.name, 'r+')  # open the database_path object
-        with hf.File(self.name, 'r+') as db:
+        with self.backend.open('r+') as db:
             groups = list(db.keys())
 
             for item in groups:
                 if item in mapping:
                     db.move(item, mapping[item])
 
+    @staticmethod
+    def _get_dataset(database: hf.File, path: str) -> hf.Dataset:
+        """
+        Get a dataset from an open database_path.
+
+        A handle which is reused within a session does not see the configurations appended by a SWMR writer in another
+        process unless the dataset is refreshed.
+
+        Parameters
+        ----------
+        database : hf.File
+                Open database_path.
+        path : str
+                Path to the dataset.
+
+        Returns
+        -------
+        dataset : hf.Dataset
+        """
+        dataset = database[path]
+        if database.swmr_mode and database.mode == 'r':
+            dataset.refresh()
+
+        return dataset
+
+    def _get_memory_map(self, dataset: hf.Dataset) -> Union[np.memmap, None]:
+        """
+        Memory-map a dataset which is stored as one contiguous, uncompressed block.
+
+        The maps are kept for the lifetime of the instance and replaced when the file or the dataset has moved, e.g.
+        after the database_path was repacked.
+
+        Parameters
+        ----------
+        dataset : hf.Dataset
+                Dataset of the open database_path.
+
+        Returns
+        -------
+        memory_map : np.memmap
+                Read only map of the dataset, or None if the dataset is chunked or not yet written.
+        """
+        offset = dataset.id.get_offset() if dataset.chunks is None else None
+        if offset is None or dataset.size == 0:
+            self._memory_maps.pop(dataset.name, None)
+            return None
+
+        key = (os.stat(self.name).st_ino, offset, dataset.shape)
+        cached = self._memory_maps.get(dataset.name)
+        if cached is None or cached[0] != key:
+            cached = (key, np.memmap(self.name, dtype=dataset.dtype, mode='r', offset=offset, shape=dataset.shape))
+            self._memory_maps[dataset.name] = cached
+
+        return cached[1]
+
+    def _read(self, database: hf.File, path: str, select_slice: np.s_) -> np.ndarray:
+        """
+        Read a selection of a dataset, from its memory map if it has one.
+
+        Parameters
+        ----------
+        database : hf.File
+                Open database_path.
+        path : str
+                Path to the dataset.
+        select_slice : np.s_
+                Selection to read.
+
+        Returns
+        -------
+        data : np.ndarray
+                A view of the memory map, or a copy read by hdf5.
+        """
+        dataset = self._get_dataset(database, path)
+        memory_map = self._get_memory_map(dataset)
+        if memory_map is None:
+            return dataset[select_slice]
+
+        return memory_map[select_slice]
+
+    def read_frames(self, path: str, select_slice: np.s_ = np.s_[:]) -> np.ndarray:
+        """
+        Read a selection of a dataset as a numpy array.
+
+        Datasets of a database_path repacked with contiguous=True are memory-mapped, so the selection is a read only
+        view of the file and nothing is copied until the values are used. Chunked datasets are read through hdf5.
+
+        Parameters
+        ----------
+        path : str
+                Path to the dataset, e.g. 'Na/Positions'.
+        select_slice : np.s_
+                Selection to read, e.g. np.s_[:, 0:100] for the first 100 configurations of all atoms.
+
+        Returns
+        -------
+        data : np.ndarray
+        """
+        with self.backend.open('r') as database:
+            return self._read(database, path, select_slice)
+
     def load_data(self, path_list: list = None, select_slice: np.s_ = None, dictionary: bool = False,
-                  scaling: list = None, d_size: int = None):
+                  scaling: list = None, d_size: int = None, dtype: tf.DType = tf.float64, layouts: dict = None):
         """
         Load tensor_values from the database_path for some operation.
 
         Should be called by the tensor_values fetch class as this will ensure correct loading and pre-loading.
+
+        Parameters
+        ----------
+        dtype : tf.DType
+                Type of the returned tensors.
+        layouts : dict
+                Paths of the copies from which some of the paths are read instead, e.g. from get_layouts. The data
+                keeps the path of the dataset.
+
         Returns
         -------
 
@@ -429,12 +828,15 @@ class Database:
         data: Union[list, dict] = {}
         if scaling is None:
             scaling = [1 for _ in range(len(path_list))]
+        if layouts is None:
+            layouts = {}
 
-        with hf.File(self.name, 'r') as database:
+        with self.backend.open('r') as database:
             if not dictionary:
                 data = []
                 for i, item in enumerate(path_list):
-                    data.append(tf.convert_to_tensor(database[item][select_slice], dtype=tf.float64) * scaling[i])
+                    data.append(tf.convert_to_tensor(self._read(database, layouts.get(item, item), select_slice),
+                                                     dtype=dtype) * scaling[i])
 
             if dictionary:
                 data = {}
@@ -443,7 +845,8 @@ class Database:
                         my_slice = select_slice[item]
                     else:
                         my_slice = select_slice
-                    data[item] = tf.convert_to_tensor(database[item][my_slice], dtype=tf.float64)
+                    data[item] = tf.convert_to_tensor(self._read(database, layouts.get(item, item), my_slice),
+                                                      dtype=dtype)
                 data[str.encode('data_size')] = d_size
 
         if len(data) == 1:
@@ -456,6 +859,177 @@ class Database:
         else:
             return data
 
+    def _get_time_series_properties(self, database: hf.File) -> list:
+        """
+        Get the properties of which a copy with the 'time_series' layout is kept.
+
+        Parameters
+        ----------
+        database : hf.File
+                Open database_path.
+
+        Returns
+        -------
+        properties : list
+        """
+        if self.time_series_properties is not None:
+            return list(self.time_series_properties)
+        stored = database.attrs.get('time_series_properties', '')
+        if isinstance(stored, bytes):
+            stored = stored.decode()
+
+        return [item for item in str(stored).split(',') if item]
+
+    def update_time_series_copies(self, copy_size: int = 64 * 2 ** 20):
+        """
+        Bring the copies of the datasets with the 'time_series' layout up to date.
+
+        Copies of the time series properties are created where they are missing, and the configurations added to
+        their datasets since the last update are copied in blocks of whole chunks of the copy, so each chunk is
+        written about once rather than once per batch written into the dataset. Copies of properties which are no
+        longer selected are removed. A copy is only read once it holds every configuration of its dataset, see
+        get_layouts.
+
+        Parameters
+        ----------
+        copy_size : int
+                Number of bytes copied at once.
+        """
+        with self.backend.open('r+') as database:
+            properties = self._get_time_series_properties(database)
+            swmr = getattr(database, 'swmr_mode', False)  # datasets can not be added or removed while SWMR writing
+            if self.time_series_properties is not None and not swmr:
+                database.attrs['time_series_properties'] = ','.join(properties)
+
+            datasets = []
+            database.visititems(lambda name, item: datasets.append(name) if is_dataset(item) else None)
+            for path in datasets:
+                name = path.split('/')[-1]
+                if name.endswith(time_series_suffix):
+                    if name[:-len(time_series_suffix)] not in properties and not swmr:
+                        del database[path]
+                    continue
+                if name not in properties or database[path].ndim != 3:
+                    continue
+                self._update_time_series_copy(database, path, swmr, copy_size)
+        self.backend.flush()
+
+    def _update_time_series_copy(self, database: hf.File, path: str, swmr: bool, copy_size: int):
+        """
+        Copy the configurations of a dataset which its time series copy does not hold yet.
+
+        Parameters
+        ----------
+        database : hf.File
+                Database opened for writing.
+        path : str
+                Path to the dataset.
+        swmr : bool
+                If true, the copy can not be created if it is missing.
+        copy_size : int
+                Number of bytes copied at once.
+        """
+        source = self._get_dataset(database, path)
+        copy_path = get_time_series_path(path)
+        compression = self.compression or database.attrs.get('compression', 'lzf')
+        if copy_path not in database:
+            if swmr:
+                log.debug(f"The time series copy of {path} can not be created while the database is SWMR written")
+                return
+            database.create_dataset(copy_path, source.shape, dtype=source.dtype,
+                                    maxshape=(source.shape[0], None, source.shape[2]),
+                                    chunks=get_chunk_shape(source.shape, 'time_series', source.dtype.itemsize),
+                                    **get_compression_options(compression))
+        elif getattr(database[copy_path], 'is_virtual', False):
+            return  # stitched from the copies of segments, see stitch_databases
+        elif database[copy_path].chunks is None:
+            make_resizable(database, copy_path, access_pattern='time_series', compression=compression)
+        copy = database[copy_path]
+
+        n_configurations = source.shape[1]
+        synchronised = int(copy.attrs.get('synchronised', 0))
+        if synchronised > n_configurations:
+            synchronised = 0  # the dataset was rewritten with fewer configurations
+        if copy.shape[1] != n_configurations:
+            copy.resize(n_configurations, axis=1)
+
+        per_configuration = source.shape[0] * source.shape[2] * source.dtype.itemsize
+        step = max(1, copy_size // max(per_configuration, 1))
+        if step >= copy.chunks[1]:
+            step -= step % copy.chunks[1]  # blocks of whole chunks of the copy
+        start = synchronised
+        while start < n_configurations:
+            stop = min(n_configurations, (start // step + 1) * step)
+            copy[:, start:stop] = self._read(database, path, np.s_[:, start:stop])
+            start = stop
+        copy.attrs['synchronised'] = n_configurations
+        if synchronised < n_configurations:
+            log.debug(f"Copied configurations {synchronised} to {n_configurations} of {path} to its time series copy")
+
+    @staticmethod
+    def _get_chunks(dataset: hf.Dataset) -> Union[tuple, None]:
+        """
+        Get the shape of the chunks in which a dataset is read.
+
+        Parameters
+        ----------
+        dataset : hf.Dataset
+                Dataset of the open database_path.
+
+        Returns
+        -------
+        chunks : tuple
+                The chunks of the dataset, or of its segments for a virtual dataset built by stitch_databases. None if
+                the dataset is stored contiguously.
+        """
+        if dataset.chunks is not None:
+            return dataset.chunks
+        if 'segment_chunks' in dataset.attrs:
+            return tuple(int(item) for item in dataset.attrs['segment_chunks'])
+
+        return None
+
+    def get_layouts(self, path_list: list, select_slice) -> dict:
+        """
+        Choose for each dataset whether a selection is read from the dataset or its time series copy.
+
+        The copy is chosen if it is up to date and the chunks the selection touches in it hold fewer bytes than in
+        the dataset, e.g. for a few atoms over many configurations.
+
+        Parameters
+        ----------
+        path_list : list
+                Paths to the datasets.
+        select_slice : np.s_
+                Selection which is read from every dataset, or a dict of selections keyed by path.
+
+        Returns
+        -------
+        layouts : dict
+                Paths of the copies keyed by the paths of the datasets which are read from them, see load_data.
+        """
+        layouts = {}
+        with self.backend.open('r') as database:
+            for path in path_list:
+                copy_path = get_time_series_path(path)
+                if copy_path not in database:
+                    continue
+                source, copy = database[path], database[copy_path]
+                source_chunks, copy_chunks = self._get_chunks(source), self._get_chunks(copy)
+                if source_chunks is None or copy_chunks is None or copy.shape != source.shape:
+                    continue  # contiguous datasets are memory-mapped, reading them costs the selection only
+                if int(copy.attrs.get('synchronised', -1)) != source.shape[1]:
+                    continue
+                selection = select_slice.get(path, np.s_[:]) if isinstance(select_slice, dict) else select_slice
+                source_cost = get_read_cost(source.shape, source_chunks, source.dtype.itemsize, selection)
+                copy_cost = get_read_cost(copy.shape, copy_chunks, copy.dtype.itemsize, selection)
+                if copy_cost < source_cost:
+                    layouts[path] = copy_path
+                    log.info(f"Reading {path} from its time series copy, {copy_cost / 1e6:.1f} MB of chunks per "
+                             f"batch instead of {source_cost / 1e6:.1f} MB")
+
+        return layouts
+
     def get_load_time(self, database_path: str = None):
         """
         Calculate the open/close time of the database_path.
@@ -469,20 +1043,16 @@ class Database:
         opening time : float
                 Time taken to open and close the database_path
         """
-        if database_path is None:
-            start = time.time()
-            database_path = hf.File(self.name, 'r')
-            database_path.close()
-            stop = time.time()
-        else:
-            start = time.time()
-            database_path = hf.File(database_path, 'r')
-            database_path.close()
-            stop = time.time()
+        backend = self.backend if database_path is None else get_backend(database_path)
+        start = time.time()
+        with backend.open('r'):
+            pass
+        stop = time.time()
 
         return stop - start
 
-    def get_data_size(self, data_path: str, database_path: str = None, system: bool = False) -> tuple:
+    def get_data_size(self, data_path: str, database_path: str = None, system: bool = False,
+                      itemsize: int = None) -> tuple:
         """
         Return the size of a dataset as a tuple (n_rows, n_columns, n_bytes)
 
@@ -494,21 +1064,23 @@ class Database:
                 path to a specific database_path, if None, the class instance database_path will be used
         system : bool
                 If true, the row number is the relevant property
+        itemsize : int
+                Bytes per element once loaded. If None, the bytes of the stored dataset are returned.
 
         Returns
         -------
         dataset_properties : tuple
                 Tuple of tensor_values about the dataset, e.g. (n_rows, n_columns, n_bytes)
         """
-        if database_path is None:
-            database_path = self.name
+        backend = self.backend if database_path is None else get_backend(database_path)
 
-        if system:
-            with hf.File(database_path, 'r') as db:
-                data_tuple = (db[data_path].shape[0], db[data_path].shape[0], db[data_path].nbytes)
-        else:
-            with hf.File(database_path, 'r') as db:
-                data_tuple = (db[data_path].shape[0], db[data_path].shape[1], db[data_path].nbytes)
+        with backend.open('r') as db:
+            dataset = self._get_dataset(db, data_path)
+            n_bytes = dataset.nbytes if itemsize is None else dataset.size * itemsize
+            if system:
+                data_tuple = (dataset.shape[0], dataset.shape[0], n_bytes)
+            else:
+                data_tuple = (dataset.shape[0], dataset.shape[1], n_bytes)
 
         return data_tuple
 
@@ -536,7 +1108,7 @@ class Database:
             return
 
         identifier = None
-        with hf.File(self.name, 'r') as database:
+        with self.backend.open('r') as database:
             first_layer = list(database.keys())
             for item in first_layer:
                 if group in item:
@@ -545,7 +1117,7 @@ class Database:
                 print("This group does not seem to exist.")
                 return
             second_layer = list(database[identifier].keys())
-            if type(database[identifier][second_layer[0]]) is hf.Dataset:
+            if is_dataset(database[identifier][second_layer[0]]):
                 for item in second_layer:
                     data = np.array(database[identifier][item])
                     data = data.reshape((len(data[0]), 2))
@@ -589,15 +1161,14 @@ class Database:
                 A list of properties that are in the database
         """
         dump_list = []
-        database = hf.File(self.name, 'r')
-        initial_list = list(database.keys())
-        for item in var_names:
-            if item in initial_list:
-                dump_list.append(item)
-        for item in initial_list:
-            sub_items = list(database[item].keys())
-            for var in var_names:
-                if var in sub_items:
-                    dump_list.append(var)
-        database.close()
+        with self.backend.open('r') as database:
+            initial_list = list(database.keys())
+            for item in var_names:
+                if item in initial_list:
+                    dump_list.append(item)
+            for item in initial_list:
+                sub_items = list(database[item].keys())
+                for var in var_names:
+                    if var in sub_items:
+                        dump_list.append(var)
         return np.unique(dump_list)
@@ -0,0 +1,892 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for the storage backends of the simulation database.
+
+Summary
+-------
+The Database class reads and writes its datasets through a backend. A backend opens the storage and yields a root group
+which behaves like an h5py.File for the operations the Database uses:
+
+* groups: indexing by path, ``in``, iteration over the members, keys, create_group, require_group, create_dataset,
+  move, visit, visititems and attrs;
+* datasets: shape, maxshape, dtype, size, ndim, nbytes, chunks, attrs, resize, refresh, write_direct, and reading
+  and writing selections made of integers, slices with a positive step and at most one list of indices.
+
+Two backends are available:
+
+* 'hdf5': a single hdf5 file opened through the handle pool. Only one process can write to it at a time.
+* 'directory': a directory per group and per dataset, in which every chunk of a dataset is stored in its own file.
+  A chunk is written to a temporary file which then replaces it, and chunks which are only partly written are locked
+  while they are updated, so several processes can write to the same dataset at the same time, e.g. the workers of a
+  parallel ingest. Datasets should be created and resized by a single process before the writers start. The chunk
+  files are not compressed.
+"""
+
+import json
+import logging
+import os
+import shutil
+import zlib
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from itertools import product
+
+import h5py as hf
+import numpy as np
+
+from mdsuite.database.handle_pool import handle_pool
+from mdsuite.database.storage_layout import get_chunk_shape
+
+try:
+    import fcntl
+except ImportError:  # not available on windows, where chunks are written without locks.
+    fcntl = None
+
+log = logging.getLogger(__file__)
+
+storage_backends = ('hdf5', 'directory')
+
+
+class StorageBackend:
+    """
+    Parent class of the storage backends.
+
+    Attributes
+    ----------
+    name : str
+            Path to the storage.
+    concurrent_writes : bool
+            If true, several processes can write to the storage at the same time.
+    """
+
+    concurrent_writes = False
+
+    def __init__(self, name: str):
+        """
+        Constructor for the StorageBackend.
+
+        Parameters
+        ----------
+        name : str
+                Path to the storage.
+        """
+        self.name = name
+
+    def open(self, mode: str = 'r'):
+        """
+        Open the storage.
+
+        Parameters
+        ----------
+        mode : str
+                'r' for reading, 'r+' for writing, 'a' for writing and creating the storage if it does not exist.
+
+        Returns
+        -------
+        context : contextmanager
+                Context manager which yields the root group of the storage.
+        """
+        raise NotImplementedError  # implemented in child class.
+
+    def flush(self):
+        """
+        Make the written data visible to readers in other processes.
+        """
+        pass
+
+    def start_swmr_write(self):
+        """
+        Let other processes read the storage while this process writes to it.
+        """
+        pass
+
+    def exists(self) -> bool:
+        """
+        Check whether the storage has been created.
+
+        Returns
+        -------
+        exists : bool
+        """
+        return os.path.exists(self.name)
+
+
+class HDF5Backend(StorageBackend):
+    """
+    Backend storing the database in a single hdf5 file.
+    """
+
+    def open(self, mode: str = 'r'):
+        """
+        Open the file through the handle pool, see StorageBackend.open.
+        """
+        return handle_pool.open_file(self.name, mode)
+
+    def flush(self):
+        """
+        Write the buffered changes to disk, see HDF5HandlePool.flush.
+        """
+        handle_pool.flush(self.name)
+
+    def start_swmr_write(self):
+        """
+        Start single-writer/multiple-reader access, see HDF5HandlePool.start_swmr_write.
+        """
+        handle_pool.start_swmr_write(self.name)
+
+
+class DirectoryBackend(StorageBackend):
+    """
+    Backend storing every dataset as a directory of chunk files.
+    """
+
+    concurrent_writes = True
+
+    @contextmanager
+    def open(self, mode: str = 'r'):
+        """
+        Open the directory, see StorageBackend.open.
+        """
+        if mode == 'w' and os.path.exists(self.name):
+            shutil.rmtree(self.name)
+        if mode in ('a', 'w'):
+            os.makedirs(self.name, exist_ok=True)
+        elif not os.path.isdir(self.name):
+            raise FileNotFoundError(f"{self.name} does not exist")
+
+        yield DirectoryGroup(self.name, '/', mode)
+
+
+def get_backend(name: str, backend: str = None) -> StorageBackend:
+    """
+    Get the backend of a database.
+
+    Parameters
+    ----------
+    name : str or bytes
+            Path to the database.
+    backend : str
+            One of 'hdf5' or 'directory'. If None, 'directory' is used if name is an existing directory, else 'hdf5'.
+
+    Returns
+    -------
+    backend : StorageBackend
+    """
+    name = os.fsdecode(name)  # tf.data generators pass their arguments as bytes
+    if backend is None:
+        backend = 'directory' if os.path.isdir(name) else 'hdf5'
+    if backend == 'hdf5':
+        return HDF5Backend(name)
+    if backend == 'directory':
+        return DirectoryBackend(name)
+
+    raise ValueError(f"Unknown storage backend {backend}, choose one of {storage_backends}")
+
+
+def is_dataset(item) -> bool:
+    """
+    Check whether a member of a root group is a dataset.
+
+    Parameters
+    ----------
+    item : hf.Dataset, hf.Group, DirectoryDataset or DirectoryGroup
+
+    Returns
+    -------
+    is_dataset : bool
+    """
+    return isinstance(item, (hf.Dataset, DirectoryDataset))
+
+
+def _write_atomically(file_path: str, write):
+    """
+    Write a file through a temporary file which then replaces it, so readers never see a partly written file.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the file.
+    write : callable
+            Function writing the content into the open temporary file.
+    """
+    temporary_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temporary_path, 'wb') as file_object:
+        write(file_object)
+    os.replace(temporary_path, file_path)
+
+
+def _write_json(file_path: str, content: dict):
+    """
+    Write a dictionary as a json file.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the file.
+    content : dict
+            Content of the file.
+    """
+    _write_atomically(file_path, lambda file_object: file_object.write(json.dumps(content).encode()))
+
+
+class DirectoryAttributes(MutableMapping):
+    """
+    Attributes of a group or dataset of the directory backend, stored as a json file.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Constructor for the DirectoryAttributes.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the json file.
+        """
+        self.file_path = file_path
+
+    def _read(self) -> dict:
+        """
+        Read the attributes.
+
+        Returns
+        -------
+        attributes : dict
+        """
+        if not os.path.exists(self.file_path):
+            return {}
+        with open(self.file_path) as file_object:
+            return json.load(file_object)
+
+    def __getitem__(self, key: str):
+        return self._read()[key]
+
+    def __setitem__(self, key: str, value):
+        attributes = self._read()
+        attributes[key] = value.tolist() if hasattr(value, 'tolist') else value
+        _write_json(self.file_path, attributes)
+
+    def __delitem__(self, key: str):
+        attributes = self._read()
+        del attributes[key]
+        _write_json(self.file_path, attributes)
+
+    def update(self, other=(), **kwargs):
+        """
+        Set several attributes, writing the json file once.
+        """
+        attributes = self._read()
+        for key, value in dict(other, **kwargs).items():
+            attributes[key] = value.tolist() if hasattr(value, 'tolist') else value
+        _write_json(self.file_path, attributes)
+
+    def __iter__(self):
+        return iter(self._read())
+
+    def __len__(self) -> int:
+        return len(self._read())
+
+
+class DirectoryGroup:
+    """
+    Group of the directory backend.
+
+    Attributes
+    ----------
+    root : str
+            Directory of the database.
+    name : str
+            Absolute path of the group in the database, e.g. '/Na'.
+    mode : str
+            Mode in which the database was opened.
+    swmr_mode : bool
+            Always False, the chunks written by other processes are seen as soon as they are replaced.
+    """
+
+    swmr_mode = False
+
+    def __init__(self, root: str, name: str = '/', mode: str = 'r'):
+        """
+        Constructor for the DirectoryGroup.
+
+        Parameters
+        ----------
+        root : str
+                Directory of the database.
+        name : str
+                Absolute path of the group in the database.
+        mode : str
+                Mode in which the database was opened.
+        """
+        self.root = root
+        self.name = name
+        self.mode = mode
+
+    def _name(self, path: str) -> str:
+        """
+        Absolute path of a member in the database.
+
+        Parameters
+        ----------
+        path : str or bytes
+                Path relative to the group, or absolute if it starts with '/'. Paths are passed as bytes by
+                tf.data generators.
+
+        Returns
+        -------
+        name : str
+        """
+        if isinstance(path, bytes):
+            path = path.decode()
+        if path.startswith('/'):
+            return '/' + path.strip('/')
+
+        return '/' + '/'.join(item for item in (self.name.strip('/'), path.strip('/')) if item)
+
+    def _directory(self, path: str) -> str:
+        """
+        Directory of a member.
+
+        Parameters
+        ----------
+        path : str
+                Path relative to the group, or absolute if it starts with '/'.
+
+        Returns
+        -------
+        directory : str
+        """
+        return os.path.join(self.root, *self._name(path).strip('/').split('/'))
+
+    def _check_writable(self):
+        """
+        Raise an error if the database was opened for reading.
+        """
+        if self.mode == 'r':
+            raise OSError(f"{self.root} was opened for reading")
+
+    def __getitem__(self, path: str):
+        directory = self._directory(path)
+        if not os.path.isdir(directory):
+            raise KeyError(path)
+        if os.path.exists(os.path.join(directory, DirectoryDataset.metadata_file)):
+            return DirectoryDataset(directory, self._name(path), self.mode)
+
+        return DirectoryGroup(self.root, self._name(path), self.mode)
+
+    def __contains__(self, path: str) -> bool:
+        return os.path.isdir(self._directory(path))
+
+    def __delitem__(self, path: str):
+        self._check_writable()
+        shutil.rmtree(self._directory(path))
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def keys(self) -> list:
+        """
+        Names of the members of the group.
+
+        Returns
+        -------
+        keys : list
+        """
+        directory = self._directory('')
+        return sorted(item for item in os.listdir(directory) if os.path.isdir(os.path.join(directory, item)))
+
+    @property
+    def attrs(self) -> DirectoryAttributes:
+        """
+        Attributes of the group.
+        """
+        return DirectoryAttributes(os.path.join(self._directory(''), DirectoryDataset.attributes_file))
+
+    def create_group(self, path: str) -> 'DirectoryGroup':
+        """
+        Create a group and the groups above it.
+
+        Parameters
+        ----------
+        path : str
+                Path of the group.
+
+        Returns
+        -------
+        group : DirectoryGroup
+        """
+        self._check_writable()
+        if path in self:
+            raise ValueError(f"{self._name(path)} already exists")
+        os.makedirs(self._directory(path))
+
+        return self[path]
+
+    def require_group(self, path: str) -> 'DirectoryGroup':
+        """
+        Get a group, creating it if it does not exist.
+
+        Parameters
+        ----------
+        path : str
+                Path of the group.
+
+        Returns
+        -------
+        group : DirectoryGroup
+        """
+        if path in self:
+            return self[path]
+
+        return self.create_group(path)
+
+    def create_dataset(self, path: str, shape: tuple = None, dtype=None, data: np.ndarray = None,
+                       maxshape: tuple = None, chunks: tuple = None, **filters) -> 'DirectoryDataset':
+        """
+        Create a dataset.
+
+        Parameters
+        ----------
+        path : str
+                Path of the dataset.
+        shape : tuple
+                Shape of the dataset. If None, the shape of data is used.
+        dtype : np.dtype
+                Type of the values. If None, the type of data is used, or float32 if no data is given.
+        data : np.ndarray
+                Values to write into the new dataset.
+        maxshape : tuple
+                Largest shape the dataset can be resized to, None for an unlimited axis. If None, the dataset cannot be
+                resized.
+        chunks : tuple
+                Shape of the chunk files. If None, the chunk shape of the batch access pattern is used.
+        filters
+                Compression options of h5py, which are ignored as the chunk files are not compressed.
+
+        Returns
+        -------
+        dataset : DirectoryDataset
+        """
+        self._check_writable()
+        if data is not None:
+            data = np.asarray(data, dtype=dtype)
+            shape, dtype = data.shape, data.dtype
+        elif dtype is None:
+            dtype = np.float32
+        shape = tuple(int(item) for item in shape)
+        if chunks is None or chunks is True:
+            chunks = get_chunk_shape(shape) if len(shape) in (2, 3) else shape
+        if path in self:
+            raise ValueError(f"{self._name(path)} already exists")
+
+        directory = self._directory(path)
+        os.makedirs(directory)
+        _write_json(os.path.join(directory, DirectoryDataset.metadata_file),
+                    {'shape': shape, 'maxshape': maxshape if maxshape is not None else shape,
+                     'chunks': tuple(max(1, int(item)) for item in chunks), 'dtype': np.dtype(dtype).str})
+        dataset = DirectoryDataset(directory, self._name(path), self.mode)
+        if data is not None:
+            dataset[...] = data
+
+        return dataset
+
+    def move(self, source: str, destination: str):
+        """
+        Move a member of the group.
+
+        Parameters
+        ----------
+        source : str
+                Path of the member.
+        destination : str
+                New path of the member.
+        """
+        self._check_writable()
+        os.makedirs(os.path.dirname(self._directory(destination)), exist_ok=True)
+        os.rename(self._directory(source), self._directory(destination))
+
+    def visititems(self, function):
+        """
+        Call a function on every member below the group, stopping when it returns a value.
+
+        Parameters
+        ----------
+        function : callable
+                Function of the path of the member relative to the group and the member.
+
+        Returns
+        -------
+        value
+                The first value which is not None returned by the function.
+        """
+        for key in self.keys():
+            item = self[key]
+            value = function(key, item)
+            if value is not None:
+                return value
+            if isinstance(item, DirectoryGroup):
+                value = item.visititems(lambda path, member: function(f"{key}/{path}", member))
+                if value is not None:
+                    return value
+
+    def visit(self, function):
+        """
+        Call a function on the path of every member below the group, stopping when it returns a value.
+
+        Parameters
+        ----------
+        function : callable
+                Function of the path of the member relative to the group.
+
+        Returns
+        -------
+        value
+                The first value which is not None returned by the function.
+        """
+        return self.visititems(lambda path, item: function(path))
+
+    def close(self):
+        """
+        Nothing is held open by a directory.
+        """
+        pass
+
+
+def _axis_selection(selection, length: int):
+    """
+    Convert the selection of one axis into the indices it selects.
+
+    Parameters
+    ----------
+    selection : int, slice or list
+            Selection of the axis.
+    length : int
+            Length of the axis.
+
+    Returns
+    -------
+    indices : np.ndarray
+            Selected indices in increasing order.
+    kind : str
+            'int' if the axis is dropped from the result, 'slice' or 'list' otherwise.
+    step : int
+            Step of a slice, 1 otherwise.
+    """
+    if isinstance(selection, (int, np.integer)):
+        index = int(selection) + length if selection < 0 else int(selection)
+        if not 0 <= index < length:
+            raise IndexError(f"Index {selection} is out of range for an axis of length {length}")
+        return np.array([index]), 'int', 1
+    if isinstance(selection, slice):
+        start, stop, step = selection.indices(length)
+        if step < 1:
+            raise ValueError("Slices must have a positive step")
+        return np.arange(start, stop, step), 'slice', step
+
+    indices = np.asarray(selection, dtype=int)
+    indices = np.where(indices < 0, indices + length, indices)
+    if indices.ndim != 1 or np.any(np.diff(indices) <= 0) or np.any((indices < 0) | (indices >= length)):
+        raise TypeError("Lists of indices must be increasing and within the dataset")
+
+    return indices, 'list', 1
+
+
+class DirectoryDataset:
+    """
+    Dataset of the directory backend.
+
+    The metadata is stored in dataset.json and every chunk in a file named after its position in the grid of chunks,
+    e.g. 0.3.0.npy. Chunks which were never written are read as zeros.
+
+    Attributes
+    ----------
+    name : str
+            Absolute path of the dataset in the database, e.g. '/Na/Positions'.
+    shape : tuple
+    maxshape : tuple
+    chunks : tuple
+    dtype : np.dtype
+    """
+
+    metadata_file = 'dataset.json'
+    attributes_file = 'attributes.json'
+    lock_file = 'chunks.lock'
+    compression = None
+    compression_opts = None
+    shuffle = False
+    scaleoffset = None
+    fletcher32 = False
+
+    def __init__(self, directory: str, name: str, mode: str = 'r'):
+        """
+        Constructor for the DirectoryDataset.
+
+        Parameters
+        ----------
+        directory : str
+                Directory of the dataset.
+        name : str
+                Absolute path of the dataset in the database.
+        mode : str
+                Mode in which the database was opened.
+        """
+        self.directory = directory
+        self.name = name
+        self.mode = mode
+        self.refresh()
+
+    def refresh(self):
+        """
+        Read the metadata again, e.g. after another process has resized the dataset.
+        """
+        with open(os.path.join(self.directory, self.metadata_file)) as file_object:
+            metadata = json.load(file_object)
+        self.shape = tuple(metadata['shape'])
+        self.maxshape = tuple(metadata['maxshape'])
+        self.chunks = tuple(metadata['chunks'])
+        self.dtype = np.dtype(metadata['dtype'])
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self) -> int:
+        return self.size * self.dtype.itemsize
+
+    @property
+    def attrs(self) -> DirectoryAttributes:
+        """
+        Attributes of the dataset.
+        """
+        return DirectoryAttributes(os.path.join(self.directory, self.attributes_file))
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __array__(self, dtype=None):
+        data = self[...]
+        return data if dtype is None else data.astype(dtype)
+
+    def _chunk_path(self, chunk: tuple) -> str:
+        """
+        Path to the file of a chunk.
+
+        Parameters
+        ----------
+        chunk : tuple
+                Position of the chunk in the grid of chunks.
+
+        Returns
+        -------
+        path : str
+        """
+        return os.path.join(self.directory, '.'.join(str(item) for item in chunk) + '.npy')
+
+    def _read_chunk(self, chunk: tuple) -> np.ndarray:
+        """
+        Read a chunk, which is zero if it was never written.
+
+        Parameters
+        ----------
+        chunk : tuple
+                Position of the chunk in the grid of chunks.
+
+        Returns
+        -------
+        data : np.ndarray
+                Values of the chunk with the chunk shape.
+        """
+        try:
+            return np.load(self._chunk_path(chunk))
+        except FileNotFoundError:
+            return np.zeros(self.chunks, dtype=self.dtype)
+
+    @contextmanager
+    def _lock(self, chunk: tuple):
+        """
+        Lock a chunk against other processes while it is updated.
+
+        A byte of the lock file of the dataset, chosen by the position of the chunk, is locked. Two chunks may share a
+        byte, which only makes their writers wait for each other.
+
+        Parameters
+        ----------
+        chunk : tuple
+                Position of the chunk in the grid of chunks.
+        """
+        if fcntl is None:
+            yield
+            return
+        offset = zlib.crc32(str(chunk).encode())
+        with open(os.path.join(self.directory, self.lock_file), 'a') as lock_file:
+            fcntl.lockf(lock_file, fcntl.LOCK_EX, 1, offset)
+            try:
+                yield
+            finally:
+                fcntl.lockf(lock_file, fcntl.LOCK_UN, 1, offset)
+
+    def _plan(self, selection) -> tuple:
+        """
+        Split a selection into the parts which fall into each chunk.
+
+        Parameters
+        ----------
+        selection
+                Selection of the dataset.
+
+        Returns
+        -------
+        axes : list
+                For every axis a list of (chunk index, selection in the chunk, selection in the result) tuples.
+        shape : tuple
+                Shape of the result, with axes selected by an integer kept at length one.
+        dropped : tuple
+                Axes selected by an integer, which are removed from the result.
+        """
+        if not isinstance(selection, tuple):
+            selection = (selection,)
+        if any(item is Ellipsis for item in selection):
+            position = next(i for i, item in enumerate(selection) if item is Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(selection) + 1)
+            selection = selection[:position] + fill + selection[position + 1:]
+        if len(selection) > self.ndim:
+            raise IndexError(f"Too many indices for a dataset with {self.ndim} axes")
+        selection = selection + (slice(None),) * (self.ndim - len(selection))
+        if sum(not isinstance(item, (int, np.integer, slice)) for item in selection) > 1:
+            raise TypeError("Only one axis can be selected with a list of indices")
+
+        axes, shape, dropped = [], [], []
+        for axis, (item, length, chunk_length) in enumerate(zip(selection, self.shape, self.chunks)):
+            indices, kind, step = _axis_selection(item, length)
+            if kind == 'int':
+                dropped.append(axis)
+            shape.append(len(indices))
+            parts = []
+            if len(indices) == 0:
+                axes.append(parts)
+                continue
+            chunk_ids = indices // chunk_length
+            boundaries = np.flatnonzero(np.diff(chunk_ids)) + 1
+            for start, stop in zip(np.r_[0, boundaries], np.r_[boundaries, len(indices)]):
+                local = indices[start:stop] - chunk_ids[start] * chunk_length
+                if kind == 'list':
+                    parts.append((int(chunk_ids[start]), local, slice(start, stop)))
+                else:
+                    parts.append((int(chunk_ids[start]), slice(int(local[0]), int(local[-1]) + 1, step),
+                                  slice(start, stop)))
+            axes.append(parts)
+
+        return axes, tuple(shape), tuple(dropped)
+
+    def __getitem__(self, selection) -> np.ndarray:
+        axes, shape, dropped = self._plan(selection)
+        data = np.zeros(shape, dtype=self.dtype)
+        for parts in product(*axes):
+            chunk = tuple(part[0] for part in parts)
+            data[tuple(part[2] for part in parts)] = self._read_chunk(chunk)[tuple(part[1] for part in parts)]
+
+        return data.squeeze(axis=dropped) if dropped else data
+
+    def __setitem__(self, selection, value):
+        if self.mode == 'r':
+            raise OSError(f"{self.name} was opened for reading")
+        axes, shape, dropped = self._plan(selection)
+        squeezed_shape = tuple(length for axis, length in enumerate(shape) if axis not in dropped)
+        value = np.broadcast_to(np.asarray(value, dtype=self.dtype), squeezed_shape).reshape(shape)
+        for parts in product(*axes):
+            chunk = tuple(part[0] for part in parts)
+            chunk_selection = tuple(part[1] for part in parts)
+            # a chunk is covered if the selection spans every stored value in it.
+            covered = all(isinstance(part[1], slice) and part[1].step == 1 and part[1].start == 0 and
+                          part[1].stop == min(chunk_length, length - index * chunk_length)
+                          for part, chunk_length, length, index in zip(parts, self.chunks, self.shape, chunk))
+            with self._lock(chunk):
+                data = np.zeros(self.chunks, dtype=self.dtype) if covered else self._read_chunk(chunk)
+                data[chunk_selection] = value[tuple(part[2] for part in parts)]
+                _write_atomically(self._chunk_path(chunk), lambda file_object: np.save(file_object, data))
+
+    def write_direct(self, source: np.ndarray, source_sel=None, dest_sel=None):
+        """
+        Write a selection of an array into a selection of the dataset, as h5py.Dataset.write_direct.
+
+        Parameters
+        ----------
+        source : np.ndarray
+                Array to write from.
+        source_sel
+                Selection of the array. If None, the whole array is written.
+        dest_sel
+                Selection of the dataset. If None, the whole dataset is written.
+        """
+        self[Ellipsis if dest_sel is None else dest_sel] = source[Ellipsis if source_sel is None else source_sel]
+
+    def resize(self, size, axis: int = None):
+        """
+        Resize the dataset.
+
+        Chunks beyond the new shape are removed, so the dataset reads zeros where it is grown again.
+
+        Parameters
+        ----------
+        size : int or tuple
+                New length of the axis, or the new shape if axis is None.
+        axis : int
+                Axis to resize.
+        """
+        if self.mode == 'r':
+            raise OSError(f"{self.name} was opened for reading")
+        shape = list(size) if axis is None else list(self.shape)
+        if axis is not None:
+            shape[axis] = int(size)
+        for length, maximum in zip(shape, self.maxshape):
+            if maximum is not None and length > maximum:
+                raise ValueError(f"{self.name} cannot be resized beyond {self.maxshape}")
+
+        for axis_index, (old_length, new_length) in enumerate(zip(self.shape, shape)):
+            if new_length < old_length:
+                self._truncate(axis_index, new_length)
+        metadata = {'shape': tuple(shape), 'maxshape': self.maxshape, 'chunks': self.chunks, 'dtype': self.dtype.str}
+        _write_json(os.path.join(self.directory, self.metadata_file), metadata)
+        self.shape = tuple(shape)
+
+    def _truncate(self, axis: int, length: int):
+        """
+        Remove the values beyond a length of an axis.
+
+        Parameters
+        ----------
+        axis : int
+                Axis which is shortened.
+        length : int
+                New length of the axis.
+        """
+        chunk_length = self.chunks[axis]
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.npy'):
+                continue
+            chunk = tuple(int(item) for item in file_name[:-len('.npy')].split('.'))
+            first = chunk[axis] * chunk_length
+            if first >= length:
+                os.remove(self._chunk_path(chunk))
+            elif first + chunk_length > length:
+                with self._lock(chunk):
+                    data = self._read_chunk(chunk)
+                    data[(slice(None),) * axis + (slice(length - first, None),)] = 0
+                    _write_atomically(self._chunk_path(chunk), lambda file_object: np.save(file_object, data))
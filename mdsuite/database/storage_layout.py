@@ -0,0 +1,654 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for the layout and compression of the datasets in the simulation database.
+
+Summary
+-------
+hdf5 reads and decompresses whole chunks, so a read is fastest when the chunks match the slices taken from a dataset.
+The chunk shapes are derived from the access pattern of the experiment:
+
+* 'batch': all atoms of a species over a window of configurations, as loaded by the DataManager.
+* 'frame': all atoms of a species in one or a few configurations, e.g. structural analyses of single configurations.
+* 'time_series': a few atoms over many configurations, e.g. correlation functions of selected atoms.
+
+The compression policy decides how the chunks are filtered:
+
+* 'none': no filter, fastest to read and write.
+* 'lzf': lossless and fast, with byte shuffling.
+* 'gzip' or e.g. 'gzip:6': lossless with byte shuffling, smaller but slower than lzf. The level defaults to 4.
+* 'scaleoffset' or e.g. 'scaleoffset:5': lossy, rounds the values to the given number of decimals, as databases were
+  stored before the policy could be chosen.
+
+The access pattern and the compression policy are stored as attributes of the database file, so datasets added later,
+e.g. by transformations, get the same layout. repack_database rewrites an existing database with another layout or
+compression, or stores it contiguously so it can be memory-mapped, and benchmark_compression compares the policies on
+a sample of data.
+
+A single layout can not serve every calculator, e.g. correlation functions of a few atoms over long times read a small
+part of every chunk of the 'batch' layout. Properties can therefore be kept a second time with the 'time_series'
+layout, in a dataset named after the property with the suffix '_time_series' next to it. get_read_cost estimates what a
+selection costs in either layout, so the cheaper one is read.
+
+stitch_databases builds a database of virtual datasets over the databases of several segments of a simulation, e.g.
+restarts ingested as separate experiments, so they are read as one continuous trajectory without copying them.
+"""
+
+import logging
+import os
+import time
+
+import tempfile
+
+import h5py as hf
+import numpy as np
+import pandas as pd
+
+from mdsuite.database.dataset_statistics import DatasetStatistics, positional_properties, statistics_attributes
+from mdsuite.database.handle_pool import handle_pool, swmr_libver
+
+log = logging.getLogger(__file__)
+
+access_patterns = ('batch', 'frame', 'time_series')
+compression_policies = ('none', 'lzf', 'gzip', 'scaleoffset')
+default_chunk_size = 2 ** 20  # bytes, the size of the default chunk cache of hdf5
+time_series_suffix = '_time_series'  # suffix of the copies of datasets with the 'time_series' layout
+
+
+def _resizable_length(length: int) -> int:
+    """
+    Round the length of a resizable axis up to a power of two.
+
+    Chunks along the configuration axis may be longer than the dataset, as it grows when configurations are appended,
+    but should not be much longer than the data which exists.
+
+    Parameters
+    ----------
+    length : int
+            Current length of the axis.
+
+    Returns
+    -------
+    length : int
+    """
+    return int(2 ** np.ceil(np.log2(max(length, 1))))
+
+
+def get_chunk_shape(shape: tuple, access_pattern: str = 'batch', itemsize: int = 4,
+                    chunk_size: int = default_chunk_size) -> tuple:
+    """
+    Choose the chunk shape of a dataset for an access pattern.
+
+    Parameters
+    ----------
+    shape : tuple
+            Shape of the dataset, either (n_atoms, n_configurations, n_dimensions) for atomic properties or
+            (n_configurations, n_dimensions) for properties of the whole system.
+    access_pattern : str
+            One of 'batch', 'frame' or 'time_series', see the module documentation.
+    itemsize : int
+            Number of bytes of one value.
+    chunk_size : int
+            Number of bytes a chunk should hold.
+
+    Returns
+    -------
+    chunks : tuple
+            Shape of the chunks.
+    """
+    if access_pattern not in access_patterns:
+        raise ValueError(f"Unknown access pattern {access_pattern}, choose one of {access_patterns}")
+
+    values_per_chunk = max(1, chunk_size // itemsize)
+    if len(shape) == 2:
+        n_configurations, n_dimensions = shape
+        length = max(1, min(values_per_chunk // max(n_dimensions, 1), _resizable_length(n_configurations)))
+        return length, max(n_dimensions, 1)
+
+    n_atoms, n_configurations, n_dimensions = shape
+    n_atoms, n_dimensions = max(n_atoms, 1), max(n_dimensions, 1)
+    maximum_length = _resizable_length(n_configurations)
+    if access_pattern == 'time_series':
+        length = max(1, min(values_per_chunk // n_dimensions, maximum_length))
+        atoms = int(np.clip(values_per_chunk // (length * n_dimensions), 1, n_atoms))
+        return atoms, length, n_dimensions
+
+    if access_pattern == 'frame':
+        values_per_chunk = max(1, values_per_chunk // 16)  # a single configuration should not read many others
+    length = int(np.clip(values_per_chunk // (n_atoms * n_dimensions), 1, maximum_length))
+
+    return n_atoms, length, n_dimensions
+
+
+def get_time_series_path(path: str) -> str:
+    """
+    Get the path of the copy of a dataset with the 'time_series' layout.
+
+    Parameters
+    ----------
+    path : str
+            Path to the dataset, e.g. 'Na/Velocities'.
+
+    Returns
+    -------
+    path : str
+            Path to the copy, e.g. 'Na/Velocities_time_series'.
+    """
+    return f"{path.rstrip('/')}{time_series_suffix}"
+
+
+def get_read_cost(shape: tuple, chunks: tuple, itemsize: int, selection: tuple) -> int:
+    """
+    Estimate the number of bytes read for a selection of a chunked dataset.
+
+    Every chunk touched by the selection is read and decompressed as a whole.
+
+    Parameters
+    ----------
+    shape : tuple
+            Shape of the dataset.
+    chunks : tuple
+            Shape of the chunks of the dataset.
+    itemsize : int
+            Number of bytes of one value.
+    selection : tuple
+            Selection of the dataset, made of integers, slices and lists of indices, e.g. np.s_[[1, 4, 7], 0:500].
+
+    Returns
+    -------
+    cost : int
+            Number of bytes of the chunks touched by the selection.
+    """
+    if not isinstance(selection, tuple):
+        selection = (selection,)
+    cost = itemsize * int(np.prod(chunks))
+    for axis, (length, chunk) in enumerate(zip(shape, chunks)):
+        item = selection[axis] if axis < len(selection) else slice(None)
+        if isinstance(item, slice):
+            start, stop, step = item.indices(length)
+            if step == 1:
+                touched = (stop - 1) // chunk - start // chunk + 1 if stop > start else 0
+            else:
+                touched = len(np.unique(np.arange(start, stop, step) // chunk))
+        elif np.ndim(item) == 0:
+            touched = 1
+        else:
+            indices = np.asarray(item)
+            if indices.dtype == bool:
+                indices = np.flatnonzero(indices)
+            touched = len(np.unique(indices % length // chunk))
+        cost *= touched
+
+    return cost
+
+
+def get_compression_options(compression: str = 'lzf') -> dict:
+    """
+    Translate a compression policy into the filter arguments of h5py.Group.create_dataset.
+
+    Parameters
+    ----------
+    compression : str
+            One of 'none', 'lzf', 'gzip' or 'scaleoffset', optionally followed by the level, e.g. 'gzip:6'.
+
+    Returns
+    -------
+    options : dict
+            Keyword arguments of create_dataset, e.g. {'compression': 'gzip', 'compression_opts': 6, 'shuffle': True}.
+    """
+    name, _, level = compression.partition(':')
+    if name not in compression_policies or (level and not level.isdigit()):
+        raise ValueError(f"Unknown compression {compression}, choose one of {compression_policies}")
+
+    if name == 'lzf':
+        return {'compression': 'lzf', 'shuffle': True}
+    if name == 'gzip':
+        return {'compression': 'gzip', 'compression_opts': int(level or 4), 'shuffle': True}
+    if name == 'scaleoffset':
+        return {'scaleoffset': int(level or 5)}
+
+    return {}
+
+
+def _read_slices(shape: tuple, access_pattern: str, itemsize: int, read_size: int = 8 * 2 ** 20):
+    """
+    Slices of a dataset as they are read with an access pattern.
+
+    Parameters
+    ----------
+    shape : tuple
+            Shape of the dataset.
+    access_pattern : str
+            One of 'batch', 'frame' or 'time_series'.
+    itemsize : int
+            Number of bytes of one value.
+    read_size : int
+            Number of bytes read at once with the batch and time_series patterns.
+
+    Returns
+    -------
+    slices : list
+    """
+    if len(shape) == 2:
+        length = max(1, read_size // (itemsize * max(shape[1], 1)))
+        return [np.s_[start:start + length] for start in range(0, shape[0], length)]
+
+    n_atoms, n_configurations, n_dimensions = shape
+    if access_pattern == 'frame':
+        step = max(1, n_configurations // 256)
+        return [np.s_[:, i] for i in range(0, n_configurations, step)]
+    if access_pattern == 'time_series':
+        atoms = max(1, read_size // (itemsize * n_configurations * n_dimensions))
+        return [np.s_[start:start + atoms] for start in range(0, n_atoms, atoms)]
+    length = max(1, read_size // (itemsize * n_atoms * n_dimensions))
+
+    return [np.s_[:, start:start + length] for start in range(0, n_configurations, length)]
+
+
+def measure_read_throughput(file_path: str, access_pattern: str = 'batch', max_bytes: int = 256 * 2 ** 20,
+                            max_time: float = 10.0) -> float:
+    """
+    Measure how fast the datasets of a database are read with an access pattern.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the database.
+    access_pattern : str
+            One of 'batch', 'frame' or 'time_series'.
+    max_bytes : int
+            Stop reading after this many bytes.
+    max_time : float
+            Stop reading after this many seconds, as a layout which does not match the pattern can be very slow.
+
+    Returns
+    -------
+    throughput : float
+            Bytes read per second.
+    """
+    datasets = []
+    with hf.File(file_path, 'r') as database:
+        database.visititems(lambda name, item: datasets.append(name) if isinstance(item, hf.Dataset) else None)
+        read_bytes = 0
+        start = time.perf_counter()
+        for name in datasets:
+            dataset = database[name]
+            if dataset.ndim not in (2, 3) or dataset.size == 0:
+                continue
+            for selection in _read_slices(dataset.shape, access_pattern, dataset.dtype.itemsize):
+                read_bytes += dataset[selection].nbytes
+                if read_bytes >= max_bytes or time.perf_counter() - start > max_time:
+                    break
+            if read_bytes >= max_bytes or time.perf_counter() - start > max_time:
+                break
+        elapsed = time.perf_counter() - start
+
+    return read_bytes / max(elapsed, 1e-9)
+
+
+def _resizable_shape(shape: tuple) -> tuple:
+    """
+    Maximum shape of a dataset to which configurations can be appended.
+
+    Parameters
+    ----------
+    shape : tuple
+            Shape of the dataset.
+
+    Returns
+    -------
+    maxshape : tuple
+            The shape with the configuration axis unlimited.
+    """
+    maxshape = list(shape)
+    maxshape[len(shape) - 2] = None
+
+    return tuple(maxshape)
+
+
+def _copy_dataset(source: hf.Dataset, target: hf.Group, name: str, access_pattern: str, chunk_size: int,
+                  compression: str = None, contiguous: bool = False, copy_size: int = 64 * 2 ** 20):
+    """
+    Copy a dataset with a new chunk shape, keeping its type, maximum shape and attributes.
+
+    Parameters
+    ----------
+    source : hf.Dataset
+            Dataset to copy.
+    target : hf.Group
+            Group to copy the dataset into.
+    name : str
+            Name of the new dataset.
+    access_pattern : str
+            Access pattern from which the chunk shape is derived.
+    chunk_size : int
+            Number of bytes a chunk should hold.
+    compression : str
+            Compression policy of the copy. If None, the filters of the source are kept.
+    contiguous : bool
+            If true, the copy is stored contiguously without chunks and filters, so it can be memory-mapped but not
+            resized. A contiguous source is copied into a resizable dataset otherwise.
+    copy_size : int
+            Number of bytes copied at once.
+    """
+    if source.ndim not in (2, 3):
+        source.parent.copy(source, target, name=name)
+        return
+
+    if contiguous:
+        dataset = target.create_dataset(name, shape=source.shape, dtype=source.dtype)
+    else:
+        if compression is None:
+            filters = {'compression': source.compression, 'compression_opts': source.compression_opts,
+                       'shuffle': source.shuffle, 'scaleoffset': source.scaleoffset}
+        else:
+            filters = get_compression_options(compression)
+        maxshape = source.maxshape if source.chunks is not None else _resizable_shape(source.shape)
+        chunks = get_chunk_shape(source.shape, access_pattern, itemsize=source.dtype.itemsize, chunk_size=chunk_size)
+        dataset = target.create_dataset(name, shape=source.shape, dtype=source.dtype, maxshape=maxshape,
+                                        chunks=chunks, fletcher32=source.fletcher32, **filters)
+    for key, value in source.attrs.items():
+        dataset.attrs[key] = value
+
+    axis = source.ndim - 2  # the configuration axis
+    per_configuration = max(1, source.size // max(source.shape[axis], 1)) * source.dtype.itemsize
+    length = max(1, copy_size // per_configuration)
+    for start in range(0, source.shape[axis], length):
+        selection = np.s_[start:start + length] if axis == 0 else np.s_[:, start:start + length]
+        dataset[selection] = source[selection]
+
+
+def make_resizable(database: hf.File, path: str, access_pattern: str = 'batch', compression: str = 'lzf'):
+    """
+    Replace a contiguous dataset by a chunked copy to which configurations can be appended.
+
+    The space of the contiguous dataset is only returned when the database is repacked.
+
+    Parameters
+    ----------
+    database : hf.File
+            Database opened for writing.
+    path : str
+            Path to the dataset.
+    access_pattern : str
+            Access pattern from which the chunk shape is derived.
+    compression : str
+            Compression policy of the copy.
+    """
+    temporary_path = f"{path}.resizable"
+    _copy_dataset(database[path], database, temporary_path, access_pattern, default_chunk_size,
+                  compression=compression)
+    del database[path]
+    database.move(temporary_path, path)
+    log.info(f"Stored {path} in chunks so it can be extended")
+
+
+def repack_database(file_path: str, access_pattern: str = 'batch', chunk_size: int = default_chunk_size,
+                    compression: str = None, contiguous: bool = False) -> dict:
+    """
+    Rewrite a database with the chunk layout of an access pattern and optionally another compression policy.
+
+    A contiguous database stores every dataset as one uncompressed block, which Database.read_frames memory-maps
+    instead of copying it through hdf5. Its datasets are made resizable again when configurations are appended.
+
+    The datasets are copied into a new file next to the database, which then replaces it. Values which were rounded by
+    the lossy scaleoffset filter stay rounded, and are rounded again if the copy uses scaleoffset, which can move them
+    by up to the precision of the filter.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the database.
+    access_pattern : str
+            One of 'batch', 'frame' or 'time_series'.
+    chunk_size : int
+            Number of bytes a chunk should hold.
+    compression : str
+            Compression policy of the repacked database, see get_compression_options. If None, the filters of each
+            dataset are kept. It is ignored for a contiguous database.
+    contiguous : bool
+            If true, the datasets are stored contiguously without chunks or compression.
+
+    Returns
+    -------
+    throughput : dict
+            Read throughput of the access pattern in MB/s before and after repacking, e.g.
+            {'before': 210.3, 'after': 540.8}.
+    """
+    if access_pattern not in access_patterns:
+        raise ValueError(f"Unknown access pattern {access_pattern}, choose one of {access_patterns}")
+    if compression is not None:
+        get_compression_options(compression)  # check the policy before anything is written
+    handle_pool.release(file_path)
+
+    before = measure_read_throughput(file_path, access_pattern)
+    repacked_path = f"{file_path}.repack"
+    with hf.File(file_path, 'r') as source, hf.File(repacked_path, 'w', libver=swmr_libver) as target:
+        for key, value in source.attrs.items():
+            target.attrs[key] = value
+        target.attrs['access_pattern'] = access_pattern
+        if compression is not None:
+            target.attrs['compression'] = compression
+
+        def copy_item(name: str, item):
+            """
+            Copy a group or dataset of the source file.
+            """
+            if isinstance(item, hf.Group):
+                group = target.require_group(name)
+                for key, value in item.attrs.items():
+                    group.attrs[key] = value
+            else:
+                # the time series copies keep their layout, whichever layout the rest of the database is given.
+                _copy_dataset(item, target, name,
+                              'time_series' if name.endswith(time_series_suffix) else access_pattern, chunk_size,
+                              compression=compression, contiguous=contiguous)
+
+        source.visititems(copy_item)
+    os.replace(repacked_path, file_path)
+    after = measure_read_throughput(file_path, access_pattern)
+
+    throughput = {'before': before / 1e6, 'after': after / 1e6}
+    layout = 'contiguous' if contiguous else f"{access_pattern} access"
+    log.info(f"Repacked {file_path} for {layout}: read throughput {throughput['before']:.1f} MB/s "
+             f"before, {throughput['after']:.1f} MB/s after")
+
+    return throughput
+
+
+def _stitch_statistics(name: str, members: list, ranges: list, box: list = None) -> dict:
+    """
+    Merge the statistics of the datasets of the segments.
+
+    Parameters
+    ----------
+    name : str
+            Path to the dataset in the segments.
+    members : list
+            Datasets of the segments.
+    ranges : list
+            (start, stop) ranges of the configurations taken from each segment.
+    box : list
+            Side lengths of the simulation box, used to count the box crossings between the segments.
+
+    Returns
+    -------
+    attributes : dict
+            Attributes of the statistics of the stitched dataset, empty if a segment has no statistics.
+    """
+    axis = members[0].ndim - 2
+    if box is None or name.split('/')[-1] not in positional_properties or members[0].ndim != 3:
+        box = None
+    merged = None
+    offset = 0
+    for member, (start, stop) in zip(members, ranges):
+        statistics = DatasetStatistics.from_attributes(member.attrs)
+        if statistics is None or statistics.stop != member.shape[axis]:
+            return {}
+        if start != 0 or stop != statistics.stop:
+            # only part of the segment is used, e.g. after a restart, so the statistics of that part are computed.
+            selection = (slice(None), slice(start, stop)) if axis == 1 else (slice(start, stop),)
+            statistics = DatasetStatistics.from_data(member[selection], offset, box=box)
+        else:
+            statistics.start, statistics.stop = offset, offset + stop
+            if box is not None and statistics.box_crossings is not None:
+                statistics.first = member[:, 0]
+                statistics.last = member[:, stop - 1]
+        merged = statistics if merged is None else merged.merge(statistics, box=box)
+        offset += stop - start
+
+    return {key: value for key, value in merged.to_attributes().items() if value is not None}
+
+
+def stitch_databases(file_path: str, segment_paths: list, ranges: list = None, box: list = None):
+    """
+    Build a database whose datasets are virtual datasets over the datasets of several databases.
+
+    The configurations of the segments are concatenated in order without copying them, hdf5 reads every selection from
+    the files of the segments, which must therefore stay where they are. The virtual datasets can not be extended.
+    Datasets which are not stored in every segment, or whose shapes differ apart from the number of configurations,
+    are left out.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the new database.
+    segment_paths : list
+            Paths to the hdf5 databases of the segments, in the order of their configurations.
+    ranges : list
+            (start, stop) range of the configurations taken from each segment, e.g. to leave out the configurations a
+            restart repeats. If None, every configuration is taken.
+    box : list
+            Side lengths of the simulation box, used to count the box crossings between the segments.
+
+    Returns
+    -------
+    number_of_configurations : int
+            Number of configurations of the stitched database.
+    """
+    segments = [hf.File(path, 'r') for path in segment_paths]
+    number_of_configurations = 0
+    try:
+        datasets = []
+        segments[0].visititems(lambda name, item: datasets.append(name) if isinstance(item, hf.Dataset) else None)
+        with hf.File(file_path, 'w', libver=swmr_libver) as target:
+            for key, value in segments[0].attrs.items():
+                target.attrs[key] = value
+            for name in datasets:
+                members = [segment.get(name) for segment in segments]
+                if any(not isinstance(member, hf.Dataset) for member in members):
+                    log.warning(f"{name} is not stored in every segment and is left out")
+                    continue
+                if members[0].ndim not in (2, 3):
+                    continue
+                axis = members[0].ndim - 2  # the configuration axis
+                other_axes = {member.shape[:axis] + member.shape[axis + 1:] for member in members}
+                if len(other_axes) > 1 or len({member.dtype for member in members}) > 1:
+                    log.warning(f"{name} has a different shape or type in the segments and is left out")
+                    continue
+
+                if ranges is None:
+                    selections = [(0, member.shape[axis]) for member in members]
+                else:
+                    selections = [(min(start, member.shape[axis]), min(stop, member.shape[axis]))
+                                  for member, (start, stop) in zip(members, ranges)]
+                shape = list(members[0].shape)
+                shape[axis] = sum(stop - start for start, stop in selections)
+                layout = hf.VirtualLayout(shape=tuple(shape), dtype=members[0].dtype)
+                offset = 0
+                for path, member, (start, stop) in zip(segment_paths, members, selections):
+                    if stop <= start:
+                        continue
+                    source = hf.VirtualSource(os.path.abspath(path), name, shape=member.shape)
+                    if axis == 0:
+                        layout[offset:offset + stop - start] = source[start:stop]
+                    else:
+                        layout[:, offset:offset + stop - start] = source[:, start:stop]
+                    offset += stop - start
+                dataset = target.create_virtual_dataset(name, layout, fillvalue=0)
+
+                for key, value in members[0].attrs.items():
+                    if key not in statistics_attributes and key != 'synchronised':
+                        dataset.attrs[key] = value
+                dataset.attrs.update(_stitch_statistics(name, members, selections, box=box))
+                if all(int(member.attrs.get('synchronised', -1)) == member.shape[axis] for member in members):
+                    dataset.attrs['synchronised'] = shape[axis]  # the time series copies of the segments are whole
+                if members[0].chunks is not None:
+                    dataset.attrs['segment_chunks'] = members[0].chunks  # the chunks in which the data is read
+                number_of_configurations = max(number_of_configurations, shape[axis])
+    finally:
+        for segment in segments:
+            segment.close()
+
+    return number_of_configurations
+
+
+def benchmark_compression(data: np.ndarray, policies: list = None, access_pattern: str = 'batch',
+                          directory: str = None) -> pd.DataFrame:
+    """
+    Compare the compression policies on a sample of data.
+
+    Every policy writes the sample into a temporary file with the chunk layout of the access pattern and reads it back
+    with the same pattern.
+
+    Parameters
+    ----------
+    data : np.ndarray
+            Sample of shape (n_atoms, n_configurations, n_dimensions), e.g. the positions of a species over a few
+            hundred configurations. It is stored as float32, like the simulation database.
+    policies : list
+            Compression policies to compare. If None, ['none', 'lzf', 'gzip:1', 'gzip:4', 'gzip:9', 'scaleoffset'].
+    access_pattern : str
+            One of 'batch', 'frame' or 'time_series'.
+    directory : str
+            Directory of the temporary files, it should be on the disk of the database. If None, the default
+            temporary directory is used.
+
+    Returns
+    -------
+    results : pd.DataFrame
+            One row per policy with the compression ratio, the write and read throughput in MB/s of uncompressed data
+            and the largest absolute difference to the sample.
+    """
+    if policies is None:
+        policies = ['none', 'lzf', 'gzip:1', 'gzip:4', 'gzip:9', 'scaleoffset']
+    data = np.asarray(data, dtype=np.float32)
+    maxshape = (data.shape[0], None, data.shape[2]) if data.ndim == 3 else (None, data.shape[1])
+    chunks = get_chunk_shape(data.shape, access_pattern, itemsize=data.dtype.itemsize)
+    slices = _read_slices(data.shape, access_pattern, data.dtype.itemsize)
+
+    results = []
+    for policy in policies:
+        options = get_compression_options(policy)
+        with tempfile.TemporaryDirectory(dir=directory) as temporary_directory:
+            file_path = os.path.join(temporary_directory, 'benchmark.hdf5')
+            start = time.perf_counter()
+            with hf.File(file_path, 'w') as database:
+                dataset = database.create_dataset('data', shape=data.shape, dtype=np.float32, maxshape=maxshape,
+                                                  chunks=chunks, **options)
+                for selection in slices:
+                    dataset[selection] = data[selection]
+            write_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with hf.File(file_path, 'r') as database:
+                stored = [database['data'][selection] for selection in slices]
+            read_time = time.perf_counter() - start
+            file_size = os.path.getsize(file_path)
+        error = max(float(np.abs(values - data[selection]).max()) for values, selection in zip(stored, slices))
+
+        results.append({'policy': policy,
+                        'ratio': data.nbytes / file_size,
+                        'write MB/s': data.nbytes / write_time / 1e6,
+                        'read MB/s': data.nbytes / read_time / 1e6,
+                        'max error': error})
+
+    return pd.DataFrame(results)
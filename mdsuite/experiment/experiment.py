@@ -17,13 +17,17 @@ The experiment class is the main class involved in characterizing and analyzing
 """
 import logging
 
+import copy
 import json
 import os
 import pickle
 import sys
+import time
 from pathlib import Path
+from typing import Iterable
 
 import numpy as np
+import pandas as pd
 import pubchempy as pcp
 import yaml
 from tqdm import tqdm
@@ -36,9 +40,19 @@ from mdsuite.transformations.transformation_dict import transformations_dict
 from mdsuite.file_io.file_io_dict import dict_file_io
 from mdsuite.utils.units import units_dict
 from mdsuite.utils.meta_functions import join_path
+from mdsuite.utils.meta_functions import get_dimensionality
+from mdsuite.utils.meta_functions import optimize_batch_size
 from mdsuite.utils.exceptions import *
+from mdsuite.database.handle_pool import handle_pool
 from mdsuite.database.simulation_database import Database
+from mdsuite.database.storage_backends import storage_backends
+from mdsuite.database.storage_layout import access_patterns, compression_policies, repack_database, \
+    benchmark_compression, stitch_databases
 from mdsuite.file_io.file_read import FileProcessor
+from mdsuite.file_io.batch_controller import BatchSizeController
+from mdsuite.file_io.parallel_reader import parallel_read
+from mdsuite.file_io.trajectory_files import TrajectoryFile
+from mdsuite.file_io.array_data import get_array_layout, iterate_array_batches
 from mdsuite.database.properties_database import PropertiesDatabase
 from mdsuite.database.analysis_database import AnalysisDatabase
 
@@ -71,7 +85,8 @@ class Experiment:
    """
 
     def __init__(self, analysis_name, storage_path='./', time_step=1.0, temperature=0, units='real',
-                 cluster_mode=False):
+                 cluster_mode=False, access_pattern='batch', compression='lzf', precision='float64',
+                 storage_backend='hdf5', time_series_properties=None):
         """
         Initialise the experiment class.
 
@@ -88,7 +103,33 @@ class Experiment:
         cluster_mode : bool
                 If true, several parameters involved in plotting and parallelization will be adjusted so as to allow
                 for optimal performance on a large computing cluster.
+        access_pattern : str
+                How the stored data is mostly read, which decides the chunk shapes of the database_path: 'batch' for
+                all atoms over windows of configurations, 'frame' for single configurations, or 'time_series' for a
+                few atoms over many configurations. See repack to change it once the database_path is built.
+        compression : str
+                Compression of the stored data: 'none', 'lzf', 'gzip' with an optional level, e.g. 'gzip:6', or the
+                lossy 'scaleoffset' which keeps 5 decimals. See benchmark_compression to compare them.
+        precision : str
+                Precision in which the calculators load the stored data, either 'float64' or 'float32'. The data is
+                stored in single precision, loading it as 'float32' halves the memory of every batch so twice as many
+                configurations are loaded at once. Sums over configurations are still accumulated in double precision.
+        storage_backend : str
+                How the database_path is stored: 'hdf5' for a single hdf5 file, or 'directory' for a directory in
+                which every chunk of a dataset is a file, so several processes can write at the same time, e.g. the
+                workers of add_data with n_jobs > 1. Repacking is only available for 'hdf5'.
+        time_series_properties : list
+                Properties, e.g. ['Unwrapped_Positions', 'Velocities'], of which a second copy with the 'time_series'
+                layout is kept up to date. Calculators which load a few atoms over many configurations read from the
+                copy instead of the dataset, at the cost of storing the property twice. See
+                set_time_series_properties to change them once the database_path is built.
         """
+        if precision not in ('float32', 'float64'):
+            print(f"Unknown precision {precision}, choose either 'float32' or 'float64'")
+            sys.exit(1)
+        if storage_backend not in storage_backends:
+            print(f"Unknown storage backend {storage_backend}, choose one of {storage_backends}")
+            sys.exit(1)
 
         # Taken upon instantiation
         self.analysis_name = analysis_name  # Name of the experiment.
@@ -96,6 +137,11 @@ class Experiment:
         self.temperature = temperature  # Temperature of the experiment.
         self.time_step = time_step  # Timestep chosen for the simulation.
         self.cluster_mode = cluster_mode  # whether or not the script will run on a cluster
+        self.access_pattern = access_pattern  # how the database is read, decides its chunk shapes
+        self.compression = compression  # compression policy of the database
+        self.precision = precision  # precision in which the calculators load the data
+        self.storage_backend = storage_backend  # hdf5 file or directory of chunk files
+        self.time_series_properties = time_series_properties  # properties also stored with the time_series layout
 
         # Added from trajectory file
         self.units = self.units_to_si(units)  # Units used during the simulation.
@@ -111,10 +157,14 @@ class Experiment:
         self.volume = None  # Volume of the experiment.
         self.properties = None  # Properties measured in the simulation.
         self.property_groups = None  # Names of the properties measured in the simulation
+        self.ingested_configurations = {}  # Number of configurations read from each trajectory file.
+        self.stored_timesteps = None  # Timesteps of the stored configurations, used to skip repeated ones.
+        self.segments = None  # Databases of the experiments this one is stitched from, see stitch_segments.
 
         # Internal File paths
         self.experiment_path: str
         self.database_path: str
+        self.database_file: str
         self.figures_path: str
         self.logfile_path: str
         self._create_internal_file_paths()  # fill the path attributes
@@ -162,6 +212,10 @@ class Experiment:
         """
         self.experiment_path = os.path.join(self.storage_path, self.analysis_name)  # path to the experiment files
         self.database_path = os.path.join(self.experiment_path, 'databases')  # path to the databases
+        if self.storage_backend == 'directory':
+            self.database_file = os.path.join(self.database_path, 'database')  # path to the simulation database
+        else:
+            self.database_file = os.path.join(self.database_path, 'database.hdf5')
         self.figures_path = os.path.join(self.experiment_path, 'figures')  # path to the figures directory
         self.logfile_path = os.path.join(self.experiment_path, 'logfiles')
 
@@ -269,7 +323,7 @@ class Experiment:
             self.species[mapping[item]] = self.species.pop(item)
 
         # rename database_path groups
-        db_object = Database(name=os.path.join(self.database_path, "database_path.hdf5"))
+        db_object = Database(name=self.database_file)
         db_object.change_key_names(mapping)
 
         self.save_class()  # update the class state
@@ -334,7 +388,112 @@ class Experiment:
             sys.exit(1)
 
         transformation_run = transformation(self, **kwargs)
-        transformation_run.run_transformation()  # perform the transformation
+        with handle_pool.session():
+            transformation_run.run_transformation()  # perform the transformation
+            Database(name=self.database_file,
+                     time_series_properties=self.time_series_properties).update_time_series_copies()
+
+    def set_time_series_properties(self, properties: list = None):
+        """
+        Choose the properties of which a copy with the 'time_series' layout is kept.
+
+        Copies of the chosen properties are built from the stored configurations, and those of the properties which
+        are no longer chosen are removed.
+
+        Parameters
+        ----------
+        properties : list
+                Properties, e.g. ['Unwrapped_Positions', 'Velocities']. If None or empty, no copies are kept.
+        """
+        self.time_series_properties = list(properties or [])
+        if Path(self.database_file).exists():
+            with handle_pool.session():
+                Database(name=self.database_file,
+                         time_series_properties=self.time_series_properties).update_time_series_copies()
+            self.memory_requirements = Database(name=self.database_file).get_memory_information()
+        self.save_class()
+
+    def repack(self, access_pattern: str = None, compression: str = None, contiguous: bool = False) -> dict:
+        """
+        Rewrite the database_path with the chunk layout of an access pattern.
+
+        Parameters
+        ----------
+        access_pattern : str
+                One of 'batch', 'frame' or 'time_series'. If None, the access pattern of the experiment is used, e.g.
+                to give a database_path built before chunk layouts were chosen the layout of its pattern.
+        compression : str
+                Compression policy of the rewritten database_path, e.g. 'lzf' or 'gzip:6'. If None, each dataset keeps
+                its compression.
+        contiguous : bool
+                If true, the datasets are stored uncompressed in one block each, so the calculators read them through
+                memory maps instead of hdf5. Datasets are chunked again when data is added to the experiment.
+
+        Returns
+        -------
+        throughput : dict
+                Read throughput of the access pattern in MB/s before and after repacking.
+        """
+        if access_pattern is None:
+            access_pattern = self.access_pattern
+        if access_pattern not in access_patterns:
+            print(f"Unknown access pattern {access_pattern}, choose one of {access_patterns}")
+            sys.exit(1)
+        if compression is not None and compression.partition(':')[0] not in compression_policies:
+            print(f"Unknown compression {compression}, choose one of {compression_policies}")
+            sys.exit(1)
+        if self.storage_backend != 'hdf5':
+            print(f"Only hdf5 databases can be repacked, this experiment uses the {self.storage_backend} backend")
+            sys.exit(1)
+
+        throughput = repack_database(self.database_file, access_pattern,
+                                     compression=compression, contiguous=contiguous)
+        self.segments = None  # the data of stitched segments is copied into the repacked database_path
+        self.access_pattern = access_pattern
+        if compression is not None:
+            self.compression = compression
+        self.save_class()
+
+        return throughput
+
+    def benchmark_compression(self, species: str = None, data_property: str = 'Positions',
+                              number_of_configurations: int = 500, policies: list = None) -> pd.DataFrame:
+        """
+        Compare the compression policies on a sample of the stored data.
+
+        The sample is written and read back with every policy in temporary files next to the database_path, so the
+        throughput reflects the disk the experiment is stored on.
+
+        Parameters
+        ----------
+        species : str
+                Species whose data is sampled. If None, the first species is used.
+        data_property : str
+                Property which is sampled, e.g. 'Positions'.
+        number_of_configurations : int
+                Number of configurations in the sample.
+        policies : list
+                Compression policies to compare, e.g. ['none', 'lzf', 'gzip:4']. If None, a default selection is used.
+
+        Returns
+        -------
+        results : pd.DataFrame
+                Compression ratio, write and read throughput in MB/s and largest rounding error of every policy.
+        """
+        if species is None:
+            species = list(self.species)[0]
+        database = Database(name=self.database_file, architecture='simulation')
+        path = join_path(species, data_property)
+        if not database.check_existence(path):
+            print(f"{path} is not stored in the database")
+            sys.exit(1)
+
+        sample = database.read_frames(path, np.s_[:, :number_of_configurations])
+        results = benchmark_compression(sample, policies=policies, access_pattern=self.access_pattern,
+                                        directory=self.database_path)
+        self.log.info(f"Compression benchmark on {path}:\n{results.to_string(index=False)}")
+
+        return results
 
     def _build_model(self):
         """
@@ -377,7 +536,8 @@ class Experiment:
         return attributes
 
     def add_data(self, trajectory_file: str = None, file_format: str = 'lammps_traj', rename_cols: dict = None,
-                 sort: bool = False):
+                 sort: bool = False, n_jobs: int = 1, topology: str = None, properties: list = None, start: int = 0,
+                 stop: int = None, stride: int = 1):
         """
         Add tensor_values to the database_path
 
@@ -392,45 +552,79 @@ class Experiment:
                 the values.
         sort : bool
                 If true, the tensor_values will be sorted when being entered into the database_path.
+        n_jobs : int
+                Number of processes used to parse the trajectory. Each process reads its own range of configurations
+                and the parsed arrays are written into the database_path by this process. Flux files are always read
+                in serial.
+        topology : str
+                Topology file for trajectory formats which do not store the atom names, e.g. a gro file for xtc.
+        properties : list
+                Property groups to store, e.g. ['Positions']. The columns of all other properties are neither parsed
+                nor stored. If None, every property in the file is stored, or, when adding to an existing
+                database_path, every property already stored.
+        start : int
+                First configuration of the file to read.
+        stop : int
+                Configuration of the file at which to stop reading (exclusive). If None, read to the end of the file.
+        stride : int
+                Only read every stride-th configuration from start on. The configurations in between are skipped
+                through the frame index without being parsed, and the sample rate of the experiment is multiplied by
+                the stride.
         """
 
         # Check if there is a trajectory file.
         if trajectory_file is None:
             print("No tensor_values has been given")
             sys.exit(1)
+        self._check_appendable()
 
         # Load the file reader and the database_path object
-        trajectory_reader, file_type = self._load_trajectory_reader(file_format, trajectory_file, sort=sort)
-        database = Database(name=os.path.join(self.database_path, "database.hdf5"), architecture='simulation')
+        frames = None
+        if start != 0 or stop is not None or stride != 1:
+            frames = slice(start, stop, stride)
+        trajectory_reader, file_type = self._load_trajectory_reader(file_format, trajectory_file, sort=sort,
+                                                                    topology=topology, properties=properties,
+                                                                    frames=frames)
+        database = Database(name=self.database_file, architecture='simulation',
+                            access_pattern=self.access_pattern, compression=self.compression,
+                            backend=self.storage_backend, time_series_properties=self.time_series_properties)
 
         # Check to see if a database_path exists
-        database_path = Path(os.path.join(self.database_path, 'database.hdf5'))  # get theoretical path.
+        database_path = Path(self.database_file)  # get theoretical path.
 
         if file_type == 'flux':
             flux = True
         else:
             flux = False
 
-        if database_path.exists():
-            self._update_database(trajectory_reader,
-                                  trajectory_file,
-                                  database,
-                                  rename_cols,
-                                  sort=sort)
-        else:
-            self._build_new_database(trajectory_reader,
-                                     trajectory_file,
-                                     database,
-                                     rename_cols=rename_cols,
-                                     flux=flux,
-                                     sort=sort)
-
-        self.build_species_dictionary()
-        self.memory_requirements = database.get_memory_information()
+        with handle_pool.session():
+            if database_path.exists():
+                self._update_database(trajectory_reader,
+                                      trajectory_file,
+                                      database,
+                                      rename_cols,
+                                      flux=flux,
+                                      n_jobs=n_jobs)
+            else:
+                self._build_new_database(trajectory_reader,
+                                         trajectory_file,
+                                         database,
+                                         rename_cols=rename_cols,
+                                         flux=flux,
+                                         n_jobs=n_jobs)
+            database.update_time_series_copies()
+
+            if trajectory_reader.frame_index is not None:
+                self.ingested_configurations[os.path.abspath(trajectory_file)] = \
+                    trajectory_reader.frame_index.number_of_configurations
+                if not flux:
+                    self._record_timesteps(trajectory_reader.selected_timesteps())
+            self.build_species_dictionary()
+            self.memory_requirements = database.get_memory_information()
         self.save_class()  # Update the class state.
 
     def _build_new_database(self, trajectory_reader: FileProcessor, trajectory_file: str, database: Database,
-                            rename_cols: dict, flux: bool = False, sort: bool = False):
+                            rename_cols: dict, flux: bool = False, n_jobs: int = 1):
         """
         Build a new database_path
         """
@@ -438,32 +632,8 @@ class Experiment:
         architecture, line_length = trajectory_reader.process_trajectory_file(rename_cols=rename_cols)
         database.initialize_database(architecture)  # initialize the database_path
 
-        batch_range = int(self.number_of_configurations / self.batch_size)  # calculate the batch range
-        remainder = self.number_of_configurations - batch_range * self.batch_size
-        counter = 0  # instantiate counter
-        structure = trajectory_reader.build_file_structure()  # build the file structure
-
-        f_object = open(trajectory_file, 'r')  # open the trajectory file
-        for _ in tqdm(range(batch_range), ncols=70):
-            database.add_data(data=trajectory_reader.read_configurations(self.batch_size, f_object, line_length),
-                              structure=structure,
-                              start_index=counter,
-                              batch_size=self.batch_size,
-                              flux=flux,
-                              n_atoms=self.number_of_atoms,
-                              sort=sort)
-            counter += self.batch_size
-
-        if remainder > 0:
-            structure = trajectory_reader.build_file_structure(batch_size=remainder)  # build the file structure
-            database.add_data(data=trajectory_reader.read_configurations(remainder, f_object, line_length),
-                              structure=structure,
-                              start_index=counter,
-                              batch_size=remainder,
-                              flux=flux,
-                              n_atoms=self.number_of_atoms,
-                              sort=sort)
-        f_object.close()
+        self._fill_database(trajectory_reader, trajectory_file, database, 0, self.number_of_configurations,
+                            line_length, flux=flux, n_jobs=n_jobs)
 
         analysis_database = AnalysisDatabase(name=os.path.join(self.database_path, "analysis_database"))
         analysis_database.build_database()
@@ -473,7 +643,7 @@ class Experiment:
         self.save_class()  # Update the class state
 
     def _update_database(self, trajectory_reader: FileProcessor, trajectory_file: str, database: Database,
-                         rename_cols: dict, flux: bool = False, sort: bool = False):
+                         rename_cols: dict, flux: bool = False, n_jobs: int = 1):
         """
         Update the database rather than build a new database.
 
@@ -485,32 +655,469 @@ class Experiment:
         architecture, line_length = trajectory_reader.process_trajectory_file(rename_cols=rename_cols,
                                                                               update_class=False)
         number_of_new_configurations = self.number_of_configurations - counter
+        if number_of_new_configurations == 0:
+            self.log.info(f"Every configuration of {trajectory_file} is already stored")
+            return
         database.resize_dataset(architecture)  # initialize the database_path
-        batch_range = int(number_of_new_configurations / self.batch_size)  # calculate the batch range
-        remainder = number_of_new_configurations - (batch_range * self.batch_size)
-        structure = trajectory_reader.build_file_structure()  # build the file structure
-        f_object = open(trajectory_file, 'r')  # open the trajectory file
-        for _ in tqdm(range(batch_range), ncols=70):
-            database.add_data(data=trajectory_reader.read_configurations(self.batch_size, f_object, line_length),
-                              structure=structure,
-                              start_index=counter,
-                              batch_size=self.batch_size,
-                              flux=flux,
-                              n_atoms=self.number_of_atoms,
-                              sort=sort)
-            counter += self.batch_size
-
-        if remainder > 0:
-            structure = trajectory_reader.build_file_structure(batch_size=remainder)  # build the file structure
-            database.add_data(data=trajectory_reader.read_configurations(remainder, f_object, line_length),
-                              structure=structure,
-                              start_index=counter,
-                              batch_size=remainder,
-                              flux=flux)
-
-        f_object.close()
-
-    def _load_trajectory_reader(self, file_format, trajectory_file, sort: bool = False):
+
+        self._fill_database(trajectory_reader, trajectory_file, database, counter, number_of_new_configurations,
+                            line_length, flux=flux, n_jobs=n_jobs)
+
+    def _fill_database(self, trajectory_reader: FileProcessor, trajectory_file: str, database: Database,
+                       start_index: int, number_of_configurations: int, line_length: int, flux: bool = False,
+                       n_jobs: int = 1, first_configuration: int = 0):
+        """
+        Read the configurations of a trajectory file in batches and write them into the database_path.
+
+        Readers which sort by atom id do so while parsing, so the batches are written as they are read. When reading
+        serially, the batch size starts small and is adapted by a BatchSizeController to the measured throughput and
+        memory use, and self.batch_size only bounds the first batch. The parallel reader splits the configurations into
+        batches derived from self.batch_size up front.
+
+        Parameters
+        ----------
+        trajectory_reader : FileProcessor
+                Reader of the trajectory file, after process_trajectory_file has been called.
+        trajectory_file : str
+                Path to the trajectory file.
+        database : Database
+                Database to write into.
+        start_index : int
+                Configuration in the database_path at which to start writing.
+        number_of_configurations : int
+                Number of configurations to read from the trajectory file. If the reader has a frame selection, only
+                selected configurations are counted.
+        line_length : int
+                Number of columns in each line of the trajectory file.
+        flux : bool
+                If true, the file is a flux file.
+        n_jobs : int
+                Number of processes used to parse the trajectory.
+        first_configuration : int
+                Configuration in the trajectory file at which to start reading.
+        """
+        start_index -= first_configuration  # batches are numbered by their configuration in the file
+        database.box = self.box_array  # the box is only known once the trajectory has been processed
+        if n_jobs > 1 and not flux:
+            # several batches per worker keep all processes busy and bound the memory of the batches in flight.
+            batch_size = int(np.clip(min(self.batch_size // (2 * n_jobs), np.ceil(number_of_configurations / n_jobs)),
+                                     1, None))
+            batches = [(first_configuration + start, min(batch_size, number_of_configurations - start))
+                       for start in range(0, number_of_configurations, batch_size)]
+            self.log.info(f"Reading {len(batches)} batches with {n_jobs} processes")
+            # the workers write their batches themselves if the backend allows several writers.
+            database_name = database.name if database.backend.concurrent_writes else None
+            for start, batch, statistics in tqdm(parallel_read(trajectory_reader, batches, line_length,
+                                                               n_jobs=n_jobs, database_name=database_name,
+                                                               start_index=start_index),
+                                                 total=len(batches), ncols=70):
+                if batch is not None:
+                    database.write_batch(batch, start_index + start)
+                else:
+                    database.merge_statistics(statistics)
+            return
+
+        controller = BatchSizeController(self.batch_size)
+        structure, structure_size = None, 0
+        start = first_configuration
+        stop = first_configuration + number_of_configurations
+        with trajectory_reader.open_file() as f_object, tqdm(total=number_of_configurations, ncols=70) as progress:
+            if first_configuration > 0:
+                trajectory_reader.seek_configuration(f_object, first_configuration)
+            while start < stop:
+                n_configurations = min(controller.batch_size, stop - start)
+                if n_configurations != structure_size:
+                    structure = trajectory_reader.build_file_structure(batch_size=n_configurations)
+                    structure_size = n_configurations
+                controller.start_batch()
+                if trajectory_reader.frames is None:
+                    data = trajectory_reader.read_configurations(n_configurations, f_object, line_length)
+                else:
+                    frames = trajectory_reader.frames[start:start + n_configurations]
+                    data = trajectory_reader.read_frames(f_object, frames, line_length)
+                controller.sample_memory()
+                database.add_data(data=data,
+                                  structure=structure,
+                                  start_index=start_index + start,
+                                  batch_size=n_configurations,
+                                  flux=flux)
+                controller.finish_batch(n_configurations, data.nbytes)
+                start += n_configurations
+                progress.update(n_configurations)
+
+    def follow_data(self, trajectory_file: str = None, file_format: str = 'lammps_traj', rename_cols: dict = None,
+                    sort: bool = False, n_jobs: int = 1, poll_interval: float = 10.0, max_idle_time: float = None,
+                    minimum_configurations: int = 1, transformations: list = None, topology: str = None,
+                    properties: list = None, swmr: bool = False):
+        """
+        Follow a trajectory file which is still being written and append its new configurations to the database_path.
+
+        The frame index of the file is updated on every poll, so only the part of the file written since the last poll
+        is scanned. Configurations are only appended once they are completely written. Following can be stopped with
+        a keyboard interrupt and resumed later, the number of configurations read from each file is stored in the
+        experiment.
+
+        Parameters
+        ----------
+        trajectory_file : str
+                Trajectory file to follow. If the database_path does not yet exist, it is built from the configurations
+                already in the file, at least two of which must be written.
+        file_format : str
+                Format of the file being read in.
+        rename_cols : dict
+                If this argument is given, the columns with names in the keys of the dictionary will be replaced with
+                the values.
+        sort : bool
+                If true, the tensor_values will be sorted when being entered into the database_path.
+        n_jobs : int
+                Number of processes used to parse the new configurations.
+        poll_interval : float
+                Time in seconds to wait between checks for new configurations.
+        max_idle_time : float
+                Stop following after this many seconds without new configurations. If None, follow until interrupted,
+                if 0, append what is currently in the file and return.
+        minimum_configurations : int
+                Number of complete new configurations which must be waiting before they are appended. Larger values
+                mean fewer, larger writes and fewer runs of the transformations.
+        transformations : list
+                Names of transformations to run after every append, e.g. ['UnwrapViaIndices']. Transformations which
+                extend their existing datasets only process the new configurations.
+        topology : str
+                Topology file for trajectory formats which do not store the atom names, e.g. a gro file for xtc.
+        properties : list
+                Property groups to store when the database_path is built, see add_data. Appended configurations
+                always hold the properties already stored.
+        swmr : bool
+                If true, the database_path is kept open for single-writer/multiple-reader access while following, so
+                calculators in other processes can read the configurations appended so far. Datasets created while
+                following, e.g. by the first run of a transformation, are only seen by readers which open the
+                database_path afterwards. Databases built before SWMR support was added cannot be followed this way.
+        """
+        if trajectory_file is None:
+            print("No tensor_values has been given")
+            sys.exit(1)
+        self._check_appendable()
+        if transformations is None:
+            transformations = []
+
+        if not Path(self.database_file).exists():
+            self.add_data(trajectory_file, file_format=file_format, rename_cols=rename_cols, sort=sort, n_jobs=n_jobs,
+                          topology=topology, properties=properties)
+            for transformation in transformations:
+                self.perform_transformation(transformation)
+
+        trajectory_reader, file_type = self._load_trajectory_reader(file_format, trajectory_file, sort=sort,
+                                                                    topology=topology)
+        if file_type == 'flux':
+            print("Flux files can not be followed, please use add_data.")
+            sys.exit(1)
+        database = Database(name=self.database_file, architecture='simulation',
+                            access_pattern=self.access_pattern, compression=self.compression,
+                            backend=self.storage_backend, time_series_properties=self.time_series_properties)
+        line_length = trajectory_reader.prepare_reading()
+
+        with handle_pool.session():
+            self.log.info(f"Following {trajectory_file}")
+            if swmr:
+                database.update_time_series_copies()  # the copies can not be created once SWMR writing has started
+                database.backend.start_swmr_write()
+            idle_time = 0.0
+            while True:
+                number_of_new_configurations = self._append_new_configurations(
+                    trajectory_reader, trajectory_file, database, line_length, n_jobs=n_jobs,
+                    minimum_configurations=minimum_configurations)
+                if number_of_new_configurations > 0:
+                    idle_time = 0.0
+                    for transformation in transformations:
+                        self.perform_transformation(transformation)
+                    continue
+                if max_idle_time is not None and idle_time >= max_idle_time:
+                    break
+
+                try:
+                    time.sleep(poll_interval)
+                except KeyboardInterrupt:
+                    break
+                idle_time += poll_interval
+
+        self.log.info(f"Stopped following {trajectory_file} after {self.number_of_configurations} configurations")
+
+    def _append_new_configurations(self, trajectory_reader: FileProcessor, trajectory_file: str, database: Database,
+                                   line_length: int, n_jobs: int = 1,
+                                   minimum_configurations: int = 1) -> int:
+        """
+        Append the configurations written to a trajectory file since it was last read.
+
+        Parameters
+        ----------
+        trajectory_reader : FileProcessor
+                Reader of the trajectory file, after prepare_reading has been called.
+        trajectory_file : str
+                Path to the trajectory file.
+        database : Database
+                Database to write into.
+        line_length : int
+                Number of columns in each line of the trajectory file.
+        n_jobs : int
+                Number of processes used to parse the trajectory.
+        minimum_configurations : int
+                Number of new configurations below which nothing is appended.
+
+        Returns
+        -------
+        number_of_new_configurations : int
+                Number of configurations appended to the database_path.
+        """
+        file_key = os.path.abspath(trajectory_file)
+        frame_index = trajectory_reader.frame_index
+        if frame_index.update() > 0:
+            frame_index.save()
+
+        first_configuration = self.ingested_configurations.get(file_key, 0)
+        if frame_index.number_of_configurations - first_configuration < max(minimum_configurations, 1):
+            return 0
+
+        frames = np.arange(first_configuration, frame_index.number_of_configurations)
+        new_frames = trajectory_reader.skip_stored_configurations(frames)
+        number_of_new_configurations = len(new_frames)
+        if len(new_frames) != len(frames):
+            trajectory_reader.frames = new_frames  # batches then count the new configurations
+            first_configuration = 0
+        if number_of_new_configurations > 0:
+            architecture = trajectory_reader._build_architecture(self.species, self.property_groups,
+                                                                 number_of_new_configurations)
+            database.resize_dataset(architecture)
+            self._fill_database(trajectory_reader, trajectory_file, database, self.number_of_configurations,
+                                number_of_new_configurations, line_length, n_jobs=n_jobs,
+                                first_configuration=first_configuration)
+            database.update_time_series_copies()
+        trajectory_reader.frames = None
+
+        self.number_of_configurations += number_of_new_configurations
+        self.ingested_configurations[file_key] = frame_index.number_of_configurations
+        self._record_timesteps(frame_index.timesteps[new_frames])
+        self.memory_requirements = database.get_memory_information()
+        self.save_class()
+        self.log.info(f"Appended {number_of_new_configurations} configurations from {trajectory_file}")
+
+        return number_of_new_configurations
+
+    def add_array_data(self, data: dict = None, frames: Iterable[dict] = None, box: list = None,
+                       sample_rate: int = 1, batch_size: int = 100):
+        """
+        Add data which is already held in numpy arrays, without writing it to a trajectory file first.
+
+        The datasets are laid out exactly as for a trajectory file, so every calculator and transformation can be
+        used on them. Calling this method on an existing database_path appends the configurations, the species and
+        properties must then match the stored ones.
+
+        Parameters
+        ----------
+        data : dict
+                Arrays of shape (n_atoms, n_configurations, n_dimensions) keyed by species and property, e.g.
+                {'Na': {'Positions': positions, 'Velocities': velocities}, 'Cl': {...}}.
+        frames : Iterable
+                Alternative to data, e.g. a generator, yielding one configuration at a time in the same form, with
+                arrays of shape (n_atoms, n_dimensions).
+        box : list
+                Side lengths of the simulation box, e.g. [10.0, 10.0, 10.0].
+        sample_rate : int
+                Number of timesteps between two configurations.
+        batch_size : int
+                Number of frames which are collected before they are written, only used together with frames.
+        """
+        if box is None:
+            print("The side lengths of the simulation box must be given.")
+            sys.exit(1)
+        self._check_appendable()
+
+        database = Database(name=self.database_file, architecture='simulation',
+                            access_pattern=self.access_pattern, compression=self.compression,
+                            backend=self.storage_backend, time_series_properties=self.time_series_properties, box=box)
+        build_database = not Path(self.database_file).exists()
+        new_database = build_database
+        first_configuration = self.number_of_configurations
+        with handle_pool.session():
+            number_of_new_configurations = 0
+            for batch in iterate_array_batches(data, frames, batch_size=batch_size):
+                number_of_configurations = next(iter(batch.values())).shape[1]
+                species_summary, property_groups = get_array_layout(batch)
+                architecture = TrajectoryFile._build_architecture(species_summary, property_groups,
+                                                                  number_of_configurations)
+                if new_database:
+                    self.species = species_summary
+                    self.property_groups = property_groups
+                    self.number_of_atoms = sum(len(item['indices']) for item in species_summary.values())
+                    database.initialize_database(architecture)
+                    new_database = False
+                else:
+                    self._check_array_layout(species_summary, property_groups)
+                    database.resize_dataset(architecture)
+                database.write_batch(batch, self.number_of_configurations)
+                self.number_of_configurations += number_of_configurations
+                number_of_new_configurations += number_of_configurations
+            if number_of_new_configurations > 0:
+                database.update_time_series_copies()
+
+        if number_of_new_configurations == 0:
+            print("No configurations were given.")
+            sys.exit(1)
+
+        if build_database:
+            self.box_array = list(box)
+            self.dimensions = get_dimensionality(box)
+            self.volume = box[0] * box[1] * box[2]
+            self.sample_rate = sample_rate
+            analysis_database = AnalysisDatabase(name=os.path.join(self.database_path, "analysis_database"))
+            analysis_database.build_database()
+            property_database = PropertiesDatabase(name=os.path.join(self.database_path, "property_database"))
+            property_database.build_database()
+
+        # the arrays carry no timesteps, they continue those of the stored configurations in steps of sample_rate.
+        first_timestep = 0.0
+        if first_configuration > 0 and self.stored_timesteps is not None and len(self.stored_timesteps) > 0:
+            first_timestep = self.stored_timesteps[-1] + sample_rate
+        self._record_timesteps(first_timestep + sample_rate * np.arange(number_of_new_configurations))
+
+        bytes_per_configuration = 8 * self.number_of_atoms * sum(len(item) for item in self.property_groups.values())
+        self.batch_size = optimize_batch_size(None, self.number_of_configurations,
+                                              file_size=bytes_per_configuration * self.number_of_configurations)
+        self.build_species_dictionary()
+        self.memory_requirements = database.get_memory_information()
+        self.save_class()  # Update the class state.
+        self.log.info(f"Added {number_of_new_configurations} configurations from arrays")
+
+    def _check_array_layout(self, species_summary: dict, property_groups: dict):
+        """
+        Check that array data fits the datasets of the existing database_path.
+
+        Parameters
+        ----------
+        species_summary : dict
+                Species of the new data, see get_array_layout.
+        property_groups : dict
+                Properties of the new data, see get_array_layout.
+        """
+        stored_species = {name: len(item['indices']) for name, item in self.species.items()}
+        new_species = {name: len(item['indices']) for name, item in species_summary.items()}
+        stored_properties = {name: len(columns) for name, columns in self.property_groups.items()}
+        new_properties = {name: len(columns) for name, columns in property_groups.items()}
+        if new_species != stored_species or new_properties != stored_properties:
+            print(f"The arrays hold the species {new_species} and properties {new_properties}, but the database "
+                  f"holds {stored_species} and {stored_properties}.")
+            sys.exit(1)
+
+    def stitch_segments(self, segments: list):
+        """
+        Build the database_path of the experiment from those of other experiments, e.g. restarts of one simulation.
+
+        The datasets are hdf5 virtual datasets over the datasets of the segments, so the calculators see one continuous
+        trajectory but nothing is copied, and the segments must not be moved or deleted. Configurations which a
+        segment repeats from the one before, judged by their timesteps, are left out. The species, box, units, time
+        step and sample rate are taken from the first segment.
+
+        Configurations can not be appended to the stitched experiment. Repacking it copies the data of the segments
+        into its own database_path, after which it is independent of them.
+
+        Parameters
+        ----------
+        segments : list
+                Experiments in the order of their configurations. They must hold the same species and properties and
+                be stored with the 'hdf5' backend.
+        """
+        if Path(self.database_file).exists():
+            print("Segments can only be stitched into a new experiment.")
+            sys.exit(1)
+        if len(segments) == 0:
+            print("No segments were given.")
+            sys.exit(1)
+        if self.storage_backend != 'hdf5' or any(item.storage_backend != 'hdf5' for item in segments):
+            print("Only experiments stored with the hdf5 backend can be stitched.")
+            sys.exit(1)
+        first = segments[0]
+        for item in segments[1:]:
+            atoms = {species: len(item.species[species]['indices']) for species in item.species}
+            if atoms != {species: len(first.species[species]['indices']) for species in first.species}:
+                print(f"{item.analysis_name} holds other species than {first.analysis_name}.")
+                sys.exit(1)
+            if item.property_groups != first.property_groups or item.sample_rate != first.sample_rate:
+                print(f"{item.analysis_name} holds other properties or another sample rate than "
+                      f"{first.analysis_name}.")
+                sys.exit(1)
+
+        # configurations at the start of a segment which are not later than the end of the segment before are skipped
+        ranges = []
+        last_timestep = None
+        for item in segments:
+            start = 0
+            if item.stored_timesteps is not None and last_timestep is not None:
+                start = int(np.searchsorted(item.stored_timesteps, last_timestep, side='right'))
+            ranges.append((start, item.number_of_configurations))
+            if item.stored_timesteps is not None and len(item.stored_timesteps) > start:
+                last_timestep = item.stored_timesteps[-1]
+
+        for attribute in ['species', 'molecules', 'number_of_atoms', 'box_array', 'dimensions', 'volume', 'units',
+                          'time_step', 'sample_rate', 'properties', 'property_groups', 'batch_size']:
+            setattr(self, attribute, copy.deepcopy(getattr(first, attribute)))
+        if all(item.stored_timesteps is not None for item in segments):
+            self.stored_timesteps = np.concatenate([item.stored_timesteps[start:stop]
+                                                    for item, (start, stop) in zip(segments, ranges)])
+
+        self.number_of_configurations = stitch_databases(self.database_file,
+                                                         [item.database_file for item in segments],
+                                                         ranges=ranges, box=self.box_array)
+        self.segments = [item.database_file for item in segments]
+        self.log.info(f"Stitched {self.number_of_configurations} configurations from {len(segments)} segments")
+
+        analysis_database = AnalysisDatabase(name=os.path.join(self.database_path, "analysis_database"))
+        analysis_database.build_database()
+        property_database = PropertiesDatabase(name=os.path.join(self.database_path, "property_database"))
+        property_database.build_database()
+
+        if self.property_groups is not None:
+            bytes_per_configuration = 8 * self.number_of_atoms * sum(len(item)
+                                                                     for item in self.property_groups.values())
+            self.batch_size = optimize_batch_size(None, self.number_of_configurations,
+                                                  file_size=bytes_per_configuration * self.number_of_configurations)
+        self.memory_requirements = Database(name=self.database_file).get_memory_information()
+        self.save_class()
+
+    def _check_appendable(self):
+        """
+        Stop if configurations can not be appended to the experiment.
+        """
+        if self.segments:
+            print("Configurations can not be appended to an experiment stitched from segments. Append them to the "
+                  "last segment and stitch the segments again, or repack this experiment first.")
+            sys.exit(1)
+
+    def _record_timesteps(self, timesteps: np.ndarray):
+        """
+        Add the timesteps of newly stored configurations to the experiment.
+
+        The timesteps are only kept while there is one for every stored configuration. Once the timesteps of some
+        configurations are not known, they are dropped, which turns off the features relying on them.
+
+        Parameters
+        ----------
+        timesteps : np.ndarray
+                Timesteps of the configurations which were just written to the end of the database_path.
+        """
+        timesteps = np.asarray(timesteps, dtype=np.float64)
+        previous_configurations = self.number_of_configurations - len(timesteps)
+        stored = 0 if self.stored_timesteps is None else len(self.stored_timesteps)
+        if stored != previous_configurations:
+            if self.stored_timesteps is not None:
+                self.log.warning("The timesteps of some stored configurations are not known, configurations repeated "
+                                 "by later files will not be skipped")
+            self.stored_timesteps = None
+        elif self.stored_timesteps is None:
+            self.stored_timesteps = timesteps
+        else:
+            self.stored_timesteps = np.concatenate((self.stored_timesteps, timesteps))
+
+    def _load_trajectory_reader(self, file_format, trajectory_file, sort: bool = False, topology: str = None,
+                                properties: list = None, frames: slice = None):
         try:
             class_file_io, file_type = dict_file_io[file_format]  # file type is per atoms or flux.
         except KeyError:
@@ -518,7 +1125,20 @@ class Experiment:
             print(f'Available io formats are are:')
             [print(key) for key in dict_file_io.keys()]
             sys.exit(1)
-        return class_file_io(self, file_path=trajectory_file, sort=sort), file_type
+        reader_options = {}
+        if topology is not None:
+            reader_options['topology'] = topology
+        if properties is not None:
+            if file_type == 'flux':
+                print("Selecting properties is not supported for flux files.")
+                sys.exit(1)
+            reader_options['properties'] = properties
+        if frames is not None:
+            if file_type == 'flux':
+                print("Selecting configurations is not supported for flux files.")
+                sys.exit(1)
+            reader_options['frames'] = frames
+        return class_file_io(self, file_path=trajectory_file, sort=sort, **reader_options), file_type
 
     def build_species_dictionary(self):
         """
@@ -615,7 +1235,7 @@ class Experiment:
         property_matrix : np.array, tf.tensor
                 Tensor of the property to be studied. Format depends on kwargs.
         """
-        database = Database(name=os.path.join(self.database_path, 'database.hdf5'))
+        database = Database(name=self.database_file)
 
         if path is not None:
             return database.load_data(path_list=path, select_slice=select_slice)
@@ -685,7 +1305,7 @@ class Experiment:
         if species is None:
             species = list(self.species)
 
-        database = Database(name=os.path.join(self.database_path, "database.hdf5"), architecture='simulation')
+        database = Database(name=self.database_file, architecture='simulation')
 
         path_list = [join_path(s, dump_property) for s in species]
         if len(species) == 1:
@@ -726,7 +1346,7 @@ class Experiment:
         """
         Summarise the properties of the experiment.
         """
-        database = Database(name=os.path.join(self.database_path, 'database.hdf5'))
+        database = Database(name=self.database_file)
         print(f"MDSuite {self.analysis_name} Summary\n")
         print("==================================================================================\n")
         print(f"Name: {self.analysis_name}\n")
@@ -751,9 +1371,23 @@ class Experiment:
                 pass
         print("Database Information\n")
         print("---------------\n")
-        print(f"Database Path: {self.database_path}/database.hdf5\n")
-        print(f"Database Size: {os.path.getsize(os.path.join(self.database_path, 'database.hdf5'))*1e-9: 6.3f}GB\n")
+        if os.path.isdir(self.database_file):
+            database_size = sum(os.path.getsize(os.path.join(directory, item))
+                                for directory, _, files in os.walk(self.database_file) for item in files)
+        else:
+            database_size = os.path.getsize(self.database_file)
+        print(f"Database Path: {self.database_file}\n")
+        print(f"Database Size: {database_size*1e-9: 6.3f}GB\n")
         print(f"Data Groups: {database.get_database_summary()}\n")
+        print("Dataset Statistics\n")
+        print("---------------\n")
+        for path, statistics in database.get_statistics().items():
+            summary = (f"{path}: minimum {np.round(statistics['minimum'], 4)}, "
+                       f"maximum {np.round(statistics['maximum'], 4)}, mean {np.round(statistics['mean'], 4)}, "
+                       f"standard deviation {np.round(np.sqrt(statistics['variance']), 4)}")
+            if 'box_crossings' in statistics:
+                summary += f", box crossings {statistics['box_crossings']}"
+            print(f"{summary}\n")
         print("==================================================================================\n")
 
     def export_property_data(self, parameters: dict):
@@ -0,0 +1,133 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for adding data which is already held in numpy arrays.
+
+Summary
+-------
+Data from other tools or integrators does not have to be written to a trajectory file first. It is given either as a
+dictionary of per-species arrays, e.g. {'Na': {'Positions': array of shape (n_atoms, n_configurations, 3)}}, or as an
+iterable of frames of the same form whose arrays have the shape (n_atoms, 3). Both are cut into batches of the form
+{'Na/Positions': array of shape (n_atoms, n_configurations, 3)}, which is what Database.write_batch expects.
+"""
+
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
+
+import numpy as np
+
+from mdsuite.utils.meta_functions import join_path
+
+
+def _as_batch(data: dict, frame: bool = False) -> dict:
+    """
+    Flatten a dictionary of per-species arrays into database paths.
+
+    Parameters
+    ----------
+    data : dict
+            Arrays keyed by species and property, e.g. {'Na': {'Positions': array}}.
+    frame : bool
+            If true, the arrays hold a single configuration and have the shape (n_atoms, n_dimensions).
+
+    Returns
+    -------
+    batch : dict
+            Arrays of shape (n_atoms, n_configurations, n_dimensions) keyed by database path.
+    """
+    batch = {}
+    for species, properties in data.items():
+        for observable, values in properties.items():
+            values = np.asarray(values, dtype=np.float64)
+            if frame:
+                values = values.reshape(values.shape[0], 1, -1)
+            elif values.ndim == 2:
+                values = values[:, :, None]
+            batch[join_path(species, observable)] = values
+
+    number_of_configurations = {values.shape[1] for values in batch.values()}
+    if len(number_of_configurations) != 1:
+        print("All arrays must hold the same number of configurations.")
+        sys.exit(1)
+
+    return batch
+
+
+def get_array_layout(batch: dict) -> Tuple[dict, dict]:
+    """
+    Build the species summary and property groups of the experiment from a batch.
+
+    The atoms are numbered species by species in the order of the dictionary.
+
+    Parameters
+    ----------
+    batch : dict
+            Arrays of shape (n_atoms, n_configurations, n_dimensions) keyed by database path.
+
+    Returns
+    -------
+    species_summary : dict
+            Species and the indices of their atoms, as built by the trajectory readers.
+    property_groups : dict
+            Properties and their number of dimensions, stored as a list of column indices.
+    """
+    species_summary = {}
+    property_groups = {}
+    number_of_atoms = 0
+    for path, values in batch.items():
+        species, observable = path.split('/')
+        if species not in species_summary:
+            species_summary[species] = {'indices': list(range(number_of_atoms, number_of_atoms + values.shape[0]))}
+            number_of_atoms += values.shape[0]
+        elif len(species_summary[species]['indices']) != values.shape[0]:
+            print(f"The properties of {species} do not all have the same number of atoms.")
+            sys.exit(1)
+        property_groups[observable] = list(range(values.shape[2]))
+
+    return species_summary, property_groups
+
+
+def iterate_array_batches(data: dict = None, frames: Iterable[dict] = None,
+                          batch_size: int = 100) -> Iterator[dict]:
+    """
+    Cut array data into batches which can be written into the database_path.
+
+    Parameters
+    ----------
+    data : dict
+            Arrays of shape (n_atoms, n_configurations, n_dimensions) keyed by species and property. They are already
+            in memory, so they are returned as a single batch.
+    frames : Iterable
+            Frames keyed by species and property, each array of shape (n_atoms, n_dimensions). Only batch_size frames
+            are held in memory at any time.
+    batch_size : int
+            Number of frames to collect before a batch is returned.
+
+    Yields
+    ------
+    batch : dict
+            Arrays of shape (n_atoms, n_configurations, n_dimensions) keyed by database path.
+    """
+    if (data is None) == (frames is None):
+        print("Please give either data or frames.")
+        sys.exit(1)
+
+    if data is not None:
+        yield _as_batch(data)
+        return
+
+    frames = iter(frames)
+    while True:
+        buffered = [_as_batch(frame, frame=True) for frame in islice(frames, batch_size)]
+        if len(buffered) == 0:
+            return
+        yield {path: np.concatenate([frame[path] for frame in buffered], axis=1) for path in buffered[0]}
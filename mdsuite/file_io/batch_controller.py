@@ -0,0 +1,143 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for choosing the size of the batches in which trajectories are read.
+
+Summary
+-------
+The memory needed to parse a configuration and the speed at which it is parsed depend on the format, the number of
+columns and the machine, so they are measured rather than guessed. The first batch is small. After every batch the
+controller records the increase of the resident memory of the process and the number of bytes parsed per second. The
+batches are doubled for as long as the throughput improves and the measured memory per configuration keeps them under
+the memory ceiling. Once the throughput stops improving, the best size found is kept for the rest of the file.
+"""
+
+import logging
+import time
+
+import psutil
+
+log = logging.getLogger(__file__)
+
+
+class BatchSizeController:
+    """
+    Class to adapt the size of the ingest batches to the measured throughput and memory use.
+
+    Attributes
+    ----------
+    batch_size : int
+            Number of configurations to read in the next batch.
+    memory_ceiling : float
+            Number of bytes the configurations of a batch may occupy.
+    memory_per_configuration : float
+            Largest number of bytes per configuration measured so far.
+    throughput : float
+            Best throughput measured so far in bytes of parsed data per second.
+    """
+
+    def __init__(self, batch_size: int, memory_fraction: float = 0.1, probe_size: int = 16,
+                 growth_factor: int = 2, tolerance: float = 0.1):
+        """
+        Constructor for the BatchSizeController.
+
+        Parameters
+        ----------
+        batch_size : int
+                Largest batch size expected to fit into memory, e.g. from optimize_batch_size. The first batch is not
+                larger than this.
+        memory_fraction : float
+                Fraction of the memory available when reading starts which the batches may occupy.
+        probe_size : int
+                Number of configurations in the first batch, which is used to measure the cost of a configuration.
+        growth_factor : int
+                Factor by which the batches grow while the throughput improves.
+        tolerance : float
+                Relative improvement of the throughput required to keep growing the batches.
+        """
+        self.memory_ceiling = memory_fraction * psutil.virtual_memory().available
+        self.batch_size = int(max(1, min(batch_size, probe_size)))
+        self.growth_factor = growth_factor
+        self.tolerance = tolerance
+        self.memory_per_configuration = 0.0
+        self.throughput = 0.0
+        self.settled = False
+
+        self._best_batch_size = self.batch_size
+        self._process = psutil.Process()
+        self._start_time = None
+        self._start_memory = 0
+        self._peak_memory = 0
+
+    def start_batch(self):
+        """
+        Start measuring a batch.
+
+        Returns
+        -------
+        Records the time and the resident memory before the batch is read.
+        """
+        self._start_memory = self._process.memory_info().rss
+        self._peak_memory = self._start_memory
+        self._start_time = time.perf_counter()
+
+    def sample_memory(self):
+        """
+        Record the resident memory while a batch is held, e.g. between parsing and writing it.
+
+        Returns
+        -------
+        Updates the peak memory of the current batch.
+        """
+        self._peak_memory = max(self._peak_memory, self._process.memory_info().rss)
+
+    def finish_batch(self, number_of_configurations: int, data_size: int):
+        """
+        Finish measuring a batch and choose the size of the next one.
+
+        Parameters
+        ----------
+        number_of_configurations : int
+                Number of configurations in the batch.
+        data_size : int
+                Number of bytes of the parsed batch. It bounds the memory from below, as freed memory is often reused
+                without increasing the resident memory of the process.
+
+        Returns
+        -------
+        Updates the batch size.
+        """
+        elapsed = max(time.perf_counter() - self._start_time, 1e-9)
+        self.sample_memory()
+        memory = max(self._peak_memory - self._start_memory, data_size) / number_of_configurations
+        self.memory_per_configuration = max(self.memory_per_configuration, memory)
+        memory_limit = int(max(1, self.memory_ceiling // max(self.memory_per_configuration, 1)))
+
+        throughput = data_size / elapsed
+        if number_of_configurations < self.batch_size:
+            # the last batch of a file is cut short, its throughput is not comparable.
+            pass
+        elif self.settled:
+            pass
+        elif throughput > (1 + self.tolerance) * self.throughput:
+            self.throughput = throughput
+            self._best_batch_size = number_of_configurations
+            self.batch_size = number_of_configurations * self.growth_factor
+        else:
+            self.batch_size = self._best_batch_size
+            self.settled = True
+            log.info(f"Batch size settled at {self.batch_size} configurations, "
+                     f"{self.throughput / 1e6:.1f} MB/s")
+
+        if self.batch_size > memory_limit:
+            self.batch_size = memory_limit
+            self._best_batch_size = min(self._best_batch_size, memory_limit)
+            self.settled = True
@@ -0,0 +1,68 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for opening compressed trajectory files.
+
+Summary
+-------
+Trajectories stored as .gz, .bz2 or .xz are decompressed while they are read, so they never have to be unpacked to
+disk. Positions in a compressed file, e.g. the offsets of the frame index, are positions in the decompressed stream.
+Seeking forwards in such a stream decompresses and discards the data in between, seeking backwards starts again from
+the beginning of the file, so compressed files should be read front to back.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+
+compression_openers = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+
+
+def is_compressed(file_path: str) -> bool:
+    """
+    Check if a file is compressed, judged by its extension.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the file.
+
+    Returns
+    -------
+    compressed : bool
+    """
+    return os.path.splitext(file_path)[1].lower() in compression_openers
+
+
+def open_trajectory(file_path: str, mode: str = 'r'):
+    """
+    Open a trajectory file for reading, decompressing it on the fly if needed.
+
+    Parameters
+    ----------
+    file_path : str
+            Path to the file.
+    mode : str
+            Either 'r' for text or 'rb' for bytes.
+
+    Returns
+    -------
+    file_object : IO
+            A file object which supports reading, tell and seek.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in compression_openers:
+        return open(file_path, mode)
+    if mode == 'r':
+        mode = 'rt'
+
+    return compression_openers[extension](file_path, mode)
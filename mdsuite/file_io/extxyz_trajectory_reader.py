@@ -15,13 +15,14 @@ Summary
 -------
 """
 
-from typing import Union, List, Dict, Tuple
+import sys
+from typing import BinaryIO, Union, List, Dict, Tuple
 
 import numpy as np
 
+from mdsuite.file_io.compression import open_trajectory
 from mdsuite.file_io.trajectory_files import TrajectoryFile
 from mdsuite.utils.meta_functions import get_dimensionality
-from mdsuite.utils.meta_functions import line_counter
 from mdsuite.utils.meta_functions import optimize_batch_size
 
 var_names = {
@@ -52,14 +53,19 @@ class EXTXYZFileReader(TrajectoryFile):
             Path to the trajectory file.
     """
 
-    def __init__(self, obj, header_lines=2, file_path=None, sort: bool = False):
+    def __init__(self, obj, header_lines=2, file_path=None, sort: bool = False, properties: list = None,
+                 frames: slice = None):
         """
         Python class constructor
         """
 
-        super().__init__(obj, header_lines, file_path, sort=sort)  # fill the experiment class
+        super().__init__(obj, header_lines, file_path, sort=sort, properties=properties,
+                         frames=frames)  # fill the experiment class
+        if sort:
+            print("extxyz files hold no atom ids, so they can not be sorted.")
+            sys.exit(1)
 
-        self.f_object = open(self.file_path)  # file object
+        self.f_object = open_trajectory(self.file_path)  # file object
 
     def _get_number_of_atoms(self):
         """
@@ -89,11 +95,29 @@ class EXTXYZFileReader(TrajectoryFile):
                 Number of atoms in each of the trajectories
         Returns
         -------
+        number_of_configurations : int
+                Number of complete configurations in the trajectory, taken from the frame index.
+        """
+        return self._build_frame_index(number_of_atoms).number_of_configurations
+
+    def _read_timestep(self, f: BinaryIO) -> float:
+        """
+        Read the time of the configuration starting at the current position of a binary file object.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned on the atom number line of a configuration.
 
+        Returns
+        -------
+        time : float
+                Time stored in the comment line, NaN if there is none.
         """
-        number_of_lines = line_counter(self.file_path)  # get the number of lines in the file
+        f.readline()
+        time = self._get_time_value(f.readline().decode().split())
 
-        return int(number_of_lines / (number_of_atoms + self.header_lines))
+        return float('nan') if time is None else time
 
     def _get_time_value(self, data: list):
         """
@@ -250,6 +274,8 @@ class EXTXYZFileReader(TrajectoryFile):
         for i in range(number_of_atoms):
             line = self.f_object.readline().split()
             line_length = len(line)
+            if i == 0:
+                self.numeric_columns = self._get_numeric_columns(line)
             if line[element_index] not in species_summary:
                 species_summary[line[element_index]] = {}
                 species_summary[line[element_index]]['indices'] = []
@@ -288,8 +314,14 @@ class EXTXYZFileReader(TrajectoryFile):
         number_of_atoms = self._get_number_of_atoms()  # get the number of atoms
         number_of_configurations = self._get_number_of_configurations(number_of_atoms)  # get number of configurations
         sample_rate = self._get_time_information(number_of_atoms)  # get the sample rate
-        batch_size = optimize_batch_size(self.file_path, number_of_configurations)  # get the batch size
+        batch_size = optimize_batch_size(self.file_path, number_of_configurations,
+                                         file_size=self.frame_index.end_offset)  # get the batch size
+        number_of_configurations, sample_rate = self._select_frames(number_of_configurations, sample_rate,
+                                                                    update_class=update_class)
+        batch_size = min(batch_size, max(number_of_configurations, 1))
         species_summary, box, property_groups, line_length = self._get_species_information(number_of_atoms)
+        property_groups = self._select_properties(property_groups, update_class)
+        self._restrict_columns(property_groups)
 
         if update_class:
             self.experiment.batch_size = batch_size
@@ -304,6 +336,6 @@ class EXTXYZFileReader(TrajectoryFile):
 
         else:
             self.experiment.batch_size = batch_size
-
+            self.experiment.number_of_configurations += number_of_configurations
 
         return self._build_architecture(species_summary, property_groups, number_of_configurations), line_length
@@ -16,11 +16,15 @@ Summary
 """
 
 from mdsuite.file_io.lammps_trajectory_files import LAMMPSTrajectoryFile
+from mdsuite.file_io.lammps_binary_files import LAMMPSBinaryTrajectoryFile
 from mdsuite.file_io.lammps_flux_files import LAMMPSFluxFile
 from mdsuite.file_io.extxyz_trajectory_reader import EXTXYZFileReader
+from mdsuite.file_io.xtc_reader import XTCFileReader
 
 dict_file_io = {
     'lammps_traj': (LAMMPSTrajectoryFile, 'traj'),
+    'lammps_bin': (LAMMPSBinaryTrajectoryFile, 'traj'),
     'lammps_flux': (LAMMPSFluxFile, 'flux'),
-    'extxyz': (EXTXYZFileReader, 'traj')
+    'extxyz': (EXTXYZFileReader, 'traj'),
+    'xtc': (XTCFileReader, 'traj')
 }
@@ -16,8 +16,15 @@ Summary
 """
 
 import abc
+import io
 from typing import TextIO
 
+import numpy as np
+
+from mdsuite.file_io.compression import open_trajectory
+
+from mdsuite.file_io.frame_index import FrameIndex
+
 
 class FileProcessor(metaclass=abc.ABCMeta):
     """
@@ -49,6 +56,8 @@ class FileProcessor(metaclass=abc.ABCMeta):
 
         self.header_lines = header_lines  # Number of header lines in the given file format.
         self.file_path = file_path   # path to the file being read
+        self.frame_index: FrameIndex = None  # byte offsets of the configurations, built by the child class
+        self.frames: np.ndarray = None  # indices of the configurations to read, None to read all of them
 
     @abc.abstractmethod
     def process_trajectory_file(self, rename_cols: dict = None, update_class: bool = True):
@@ -89,6 +98,47 @@ class FileProcessor(metaclass=abc.ABCMeta):
 
         return
 
+    def open_file(self):
+        """
+        Open the trajectory file for reading configurations.
+
+        Returns
+        -------
+        file_object : TextIO
+                File object which is passed to read_configurations and seek_configuration.
+        """
+        return open_trajectory(self.file_path, 'r')
+
+    def open_block(self, block: bytes):
+        """
+        Wrap a block of raw configurations so that it can be passed to read_configurations.
+
+        This is used when the file is decompressed by one process and the configurations are parsed by others.
+
+        Parameters
+        ----------
+        block : bytes
+                Raw bytes of one or more complete configurations.
+
+        Returns
+        -------
+        file_object : TextIO
+        """
+        return io.StringIO(block.decode())
+
+    def seek_configuration(self, file_object: TextIO, configuration: int):
+        """
+        Move a file object to the start of a configuration.
+
+        Parameters
+        ----------
+        file_object : TextIO
+                File object opened on self.file_path.
+        configuration : int
+                Index of the configuration to move to.
+        """
+        file_object.seek(int(self.frame_index.offsets[configuration]))
+
     @staticmethod
     def _extract_properties(database_correspondence_dict, column_dict_properties):
         """
@@ -21,6 +21,7 @@ import h5py as hf
 import numpy as np
 from tqdm import tqdm
 
+from mdsuite.file_io.compression import open_trajectory
 from mdsuite.file_io.file_read import FileProcessor
 
 
@@ -89,7 +90,7 @@ class FluxFile(FileProcessor, metaclass=abc.ABCMeta):
         loop_range = int((self.experiment.number_of_configurations - counter) / self.experiment.batch_size)
         skip_header = 0
         with hf.File(os.path.join(self.experiment.database_path, 'database_path.hdf5'), "r+") as database:
-            with open(self.experiment.trajectory_file) as f:
+            with open_trajectory(self.experiment.trajectory_file) as f:
                 for _ in tqdm(range(loop_range), ncols=70):
                     if skip_header == 0:
                         batch_data = self.read_configurations(self.experiment.batch_size, f,
@@ -0,0 +1,419 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for the byte offset index of trajectory files.
+
+Summary
+-------
+A frame index records the byte offset and the timestep of every complete configuration in a trajectory file. It is
+built in a single pass over the file and stored as a sidecar next to the trajectory so that later reads can seek
+directly to any configuration.
+
+The sidecar keeps a fingerprint of the indexed part of the file, made of its first bytes and the bytes just before the
+end of the last indexed configuration. A sidecar is only reused if the fingerprint and the timestep of the last indexed
+configuration still match, so a trajectory which was overwritten, even by a larger file, is indexed again from the
+start, while a trajectory which has only grown is indexed from where the sidecar ended.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+from typing import BinaryIO, Callable, List, Tuple
+
+import numpy as np
+
+from mdsuite.file_io.compression import open_trajectory
+
+log = logging.getLogger(__file__)
+
+
+def split_into_runs(frames: np.ndarray) -> List[np.ndarray]:
+    """
+    Split increasing configuration indices into runs of consecutive configurations.
+
+    Parameters
+    ----------
+    frames : np.ndarray
+            Increasing indices of configurations.
+
+    Returns
+    -------
+    runs : list
+            Arrays of consecutive configuration indices, e.g. [0, 1, 2, 5, 6] -> [[0, 1, 2], [5, 6]].
+    """
+    return np.split(frames, np.flatnonzero(np.diff(frames) != 1) + 1)
+
+
+class FrameIndex:
+    """
+    Byte offset index of the configurations in a trajectory file.
+
+    Attributes
+    ----------
+    file_path : str
+            Path to the indexed trajectory file.
+    configuration_length : int
+            Number of lines in each configuration, including its header.
+    skip_lines : int
+            Number of lines at the start of the file which do not belong to any configuration.
+    time_parser : Callable
+            Function which reads the timestep of a configuration from a binary file object positioned at the start of
+            the configuration.
+    offsets : np.ndarray
+            Byte offset of the start of each complete configuration.
+    timesteps : np.ndarray
+            Timestep of each complete configuration.
+    end_offset : int
+            Byte offset directly after the last complete configuration. Indexing resumes from here if the file grows.
+    """
+
+    sidecar_extension = '.mdsuite_index.npz'
+    fingerprint_size = 4096  # bytes at the start and before the end of the indexed part which are hashed
+
+    def __init__(self, file_path: str, configuration_length: int, skip_lines: int = 0,
+                 time_parser: Callable[[BinaryIO], float] = None):
+        """
+        Constructor for the FrameIndex class.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the trajectory file.
+        configuration_length : int
+                Number of lines in each configuration, including its header.
+        skip_lines : int
+                Number of lines at the start of the file which do not belong to any configuration.
+        time_parser : Callable
+                Function to read the timestep of a configuration. If None, no timesteps are stored.
+        """
+        self.file_path = file_path
+        self.configuration_length = configuration_length
+        self.skip_lines = skip_lines
+        self.time_parser = time_parser
+
+        self.offsets = np.empty(0, dtype=np.int64)
+        self.timesteps = np.empty(0, dtype=np.float64)
+        self.end_offset = None
+        self.file_size = 0
+        self.modification_time = 0
+
+    def __getstate__(self):
+        """
+        Drop the time parser when the index is sent to another process, it is only needed to build the index.
+        """
+        state = self.__dict__.copy()
+        state['time_parser'] = None
+
+        return state
+
+    @property
+    def sidecar_path(self) -> str:
+        """
+        Path to the index file stored next to the trajectory.
+        """
+        return f"{self.file_path}{self.sidecar_extension}"
+
+    @property
+    def number_of_configurations(self) -> int:
+        """
+        Number of complete configurations in the file.
+        """
+        return len(self.offsets)
+
+    @classmethod
+    def load_or_build(cls, file_path: str, configuration_length: int, skip_lines: int = 0,
+                      time_parser: Callable[[BinaryIO], float] = None) -> 'FrameIndex':
+        """
+        Load the index from the sidecar file, or build it if the sidecar is missing or out of date.
+
+        If the trajectory has only grown since the index was saved, only the new part of the file is scanned.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the trajectory file.
+        configuration_length : int
+                Number of lines in each configuration, including its header.
+        skip_lines : int
+                Number of lines at the start of the file which do not belong to any configuration.
+        time_parser : Callable
+                Function to read the timestep of a configuration.
+
+        Returns
+        -------
+        frame_index : FrameIndex
+                An index which covers every complete configuration currently in the file.
+        """
+        frame_index = cls(file_path, configuration_length, skip_lines=skip_lines, time_parser=time_parser)
+        if not frame_index.load():
+            frame_index.reset()
+        if frame_index.update() > 0:
+            frame_index.save()
+
+        return frame_index
+
+    def reset(self):
+        """
+        Clear the index so that the next update scans the whole file.
+        """
+        self.offsets = np.empty(0, dtype=np.int64)
+        self.timesteps = np.empty(0, dtype=np.float64)
+        self.end_offset = None
+        self.file_size = 0
+        self.modification_time = 0
+
+    def update(self, chunk_size: int = 2 ** 26) -> int:
+        """
+        Index every complete configuration written after the current end of the index.
+
+        Newlines are located in large binary chunks with numpy, so the file is scanned once without per-line work in
+        Python. A configuration which is not yet completely written is not indexed.
+
+        Parameters
+        ----------
+        chunk_size : int
+                Number of bytes to scan at once.
+
+        Returns
+        -------
+        number_of_new_configurations : int
+                Number of configurations added to the index.
+        """
+        with open_trajectory(self.file_path, 'rb') as f:
+            if self.end_offset is None:
+                for _ in range(self.skip_lines):
+                    f.readline()
+                self.end_offset = f.tell()
+
+            f.seek(self.end_offset)
+            position = self.end_offset
+            lines_read = 0  # lines read since the end of the last complete configuration
+            configuration_ends = []
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                line_ends = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord('\n')) + position + 1
+                first_end = self.configuration_length - 1 - lines_read % self.configuration_length
+                configuration_ends.append(line_ends[first_end::self.configuration_length])
+                lines_read += len(line_ends)
+                position += len(chunk)
+
+            if configuration_ends:
+                configuration_ends = np.concatenate(configuration_ends).astype(np.int64)
+            else:
+                configuration_ends = np.empty(0, dtype=np.int64)
+
+            new_offsets = np.concatenate(([self.end_offset], configuration_ends[:-1])).astype(np.int64)
+            new_offsets = new_offsets[:len(configuration_ends)]
+            new_timesteps = np.full(len(new_offsets), np.nan)
+            if self.time_parser is not None:
+                for i, offset in enumerate(new_offsets):
+                    f.seek(offset)
+                    new_timesteps[i] = self._read_timestep(f)
+
+        self.offsets = np.concatenate((self.offsets, new_offsets))
+        self.timesteps = np.concatenate((self.timesteps, new_timesteps))
+        if len(configuration_ends) > 0:
+            self.end_offset = int(configuration_ends[-1])
+        stat = os.stat(self.file_path)
+        self.file_size = stat.st_size
+        self.modification_time = stat.st_mtime_ns
+
+        return len(new_offsets)
+
+    def _get_fingerprint(self) -> str:
+        """
+        Hash the start of the file and the bytes before the end of the indexed part.
+
+        Returns
+        -------
+        fingerprint : str
+                Hex digest of the hashed bytes, empty if nothing is indexed.
+        """
+        if self.end_offset is None:
+            return ''
+        digest = hashlib.sha1()
+        with open_trajectory(self.file_path, 'rb') as f:
+            digest.update(f.read(min(self.fingerprint_size, self.end_offset)))
+            start = max(self.end_offset - self.fingerprint_size, 0)
+            f.seek(start)
+            block = f.read(self.end_offset - start)
+            if len(block) < self.end_offset - start:
+                return ''  # the file is shorter than the index
+            digest.update(block)
+
+        return digest.hexdigest()
+
+    def _read_timestep(self, f: BinaryIO) -> float:
+        """
+        Read the timestep of the configuration at the current position of a file.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned at the start of a configuration.
+
+        Returns
+        -------
+        timestep : float
+                Timestep of the configuration, nan if the index stores no timesteps.
+        """
+        if self.time_parser is None:
+            return np.nan
+
+        return self.time_parser(f)
+
+    def _check_last_timestep(self) -> bool:
+        """
+        Check that the last indexed configuration still starts where the index says and has the same timestep.
+
+        Returns
+        -------
+        unchanged : bool
+                True if the timestep read from the file matches the stored one, or if no timesteps are stored.
+        """
+        if self.number_of_configurations == 0 or np.isnan(self.timesteps[-1]):
+            return True
+        try:
+            with open_trajectory(self.file_path, 'rb') as f:
+                f.seek(int(self.offsets[-1]))
+                timestep = self._read_timestep(f)
+        except (ValueError, IndexError, OSError, EOFError, struct.error):
+            return False
+
+        return timestep == self.timesteps[-1]
+
+    def save(self):
+        """
+        Store the index in the sidecar file.
+
+        A trajectory in a read-only directory is not an error, the index is then simply kept in memory.
+        """
+        try:
+            with open(self.sidecar_path, 'wb') as f:
+                np.savez(f,
+                         configuration_length=self.configuration_length,
+                         skip_lines=self.skip_lines,
+                         file_size=self.file_size,
+                         modification_time=self.modification_time,
+                         fingerprint=self._get_fingerprint(),
+                         **self._get_index_arrays())
+        except OSError:
+            log.warning(f"Could not write the frame index to {self.sidecar_path}, it will be rebuilt next time.")
+
+    def load(self) -> bool:
+        """
+        Load the index from the sidecar file.
+
+        Returns
+        -------
+        loaded : bool
+                True if a sidecar was found which matches the trajectory. An index for a file which has since grown
+                is still valid, it only needs to be updated, as long as the indexed part of the file is unchanged.
+        """
+        if not os.path.exists(self.sidecar_path):
+            return False
+
+        with np.load(self.sidecar_path) as sidecar:
+            if int(sidecar['configuration_length']) != self.configuration_length or \
+                    int(sidecar['skip_lines']) != self.skip_lines or 'fingerprint' not in sidecar:
+                return False
+            stat = os.stat(self.file_path)
+            file_size = int(sidecar['file_size'])
+            if stat.st_size < file_size:
+                return False
+            if stat.st_size == file_size and stat.st_mtime_ns != int(sidecar['modification_time']):
+                return False
+
+            self._set_index_arrays(sidecar)
+            self.file_size = file_size
+            self.modification_time = int(sidecar['modification_time'])
+            fingerprint = str(sidecar['fingerprint'])
+
+        if self._get_fingerprint() != fingerprint or not self._check_last_timestep():
+            log.info(f"{self.file_path} has changed since it was indexed, the frame index is rebuilt")
+            self.reset()
+            return False
+
+        return True
+
+    def _get_index_arrays(self) -> dict:
+        """
+        Collect the contents of the index which are stored in the sidecar file.
+
+        Returns
+        -------
+        arrays : dict
+                Arrays of the index keyed by their name in the sidecar file.
+        """
+        return {'offsets': self.offsets, 'timesteps': self.timesteps, 'end_offset': self.end_offset}
+
+    def _set_index_arrays(self, sidecar):
+        """
+        Fill the index from the contents of a sidecar file.
+
+        Parameters
+        ----------
+        sidecar : np.lib.npyio.NpzFile
+                The loaded sidecar file.
+        """
+        self.offsets = sidecar['offsets']
+        self.timesteps = sidecar['timesteps']
+        self.end_offset = int(sidecar['end_offset'])
+
+    def byte_ranges(self, frames: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Find the byte ranges of the file which hold a list of configurations.
+
+        Parameters
+        ----------
+        frames : np.ndarray
+                Increasing indices of configurations.
+
+        Returns
+        -------
+        ranges : list
+                List of (start, end) byte offsets, one per run of consecutive configurations.
+        """
+        ranges = []
+        for run in split_into_runs(frames):
+            stop = run[-1] + 1
+            end = self.offsets[stop] if stop < self.number_of_configurations else self.end_offset
+            ranges.append((int(self.offsets[run[0]]), int(end)))
+
+        return ranges
+
+    def split(self, number_of_parts: int, start: int = 0, stop: int = None) -> List[Tuple[int, int]]:
+        """
+        Split a range of configurations into contiguous parts of near equal size, e.g. for parallel parsing.
+
+        Parameters
+        ----------
+        number_of_parts : int
+                Number of parts to split the configurations into.
+        start : int
+                First configuration of the range.
+        stop : int
+                End of the range (exclusive). If None, the range ends at the last configuration.
+
+        Returns
+        -------
+        ranges : list
+                List of (start, stop) tuples.
+        """
+        if stop is None:
+            stop = self.number_of_configurations
+        boundaries = np.linspace(start, stop, number_of_parts + 1).astype(int)
+
+        return [(int(boundaries[i]), int(boundaries[i + 1])) for i in range(number_of_parts)
+                if boundaries[i + 1] > boundaries[i]]
@@ -0,0 +1,545 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for reading binary lammps dump files
+
+Summary
+-------
+Binary dumps are written by LAMMPS when the dump file name ends in .bin. Every frame has a binary header followed by
+one chunk of doubles per writing process. The chunks are read straight into the batch array, so the atom data is
+copied once and no text is ever parsed. Only the dump format of LAMMPS
+versions which store the column names in the file (since 2020) can be read.
+"""
+
+import copy
+import io
+import os
+import struct
+import sys
+from typing import BinaryIO
+
+import numpy as np
+
+from mdsuite.file_io.compression import is_compressed, open_trajectory
+from mdsuite.file_io.frame_index import FrameIndex
+from mdsuite.file_io.lammps_trajectory_files import var_names
+from mdsuite.file_io.trajectory_files import TrajectoryFile
+from mdsuite.utils.meta_functions import get_dimensionality
+from mdsuite.utils.meta_functions import optimize_batch_size
+
+
+def read_binary_header(f: BinaryIO) -> dict:
+    """
+    Read the header of a binary dump frame.
+
+    Only forward reads are used, so the header can also be read from a compressed stream.
+
+    Parameters
+    ----------
+    f : BinaryIO
+            File object positioned at the start of a frame. After the call it is positioned at the first chunk.
+
+    Returns
+    -------
+    header : dict
+            Contents of the header with the keys 'timestep', 'number_of_atoms', 'box', 'size_one', 'columns' and
+            'number_of_chunks'. None if the header is not yet completely written.
+    """
+    try:
+        magic_length, = struct.unpack('<q', f.read(8))
+        if magic_length >= 0:
+            print("Binary dumps without column names are not supported, please write the dump with LAMMPS 2020 or "
+                  "newer.")
+            sys.exit(1)
+        f.read(-magic_length)  # skip the magic string
+        endian, revision, timestep, number_of_atoms, triclinic = struct.unpack('<iiqqi', f.read(28))
+        if endian != 1:
+            print("The binary dump was written on a machine with a different byte order.")
+            sys.exit(1)
+        f.read(24)  # skip the boundary flags
+        bounds = struct.unpack('<6d', f.read(48))
+        if triclinic:
+            f.read(24)  # skip the tilt factors
+        size_one, = struct.unpack('<i', f.read(4))
+
+        columns = None
+        if revision > 1:
+            unit_length, = struct.unpack('<i', f.read(4))
+            f.read(unit_length)
+            time_flag, = struct.unpack('<b', f.read(1))
+            f.read(8 * time_flag)
+            column_length, = struct.unpack('<i', f.read(4))
+            columns = f.read(column_length).decode().split()
+        number_of_chunks, = struct.unpack('<i', f.read(4))
+    except struct.error:
+        return None
+
+    return {'timestep': timestep,
+            'number_of_atoms': number_of_atoms,
+            'box': [bounds[1] - bounds[0], bounds[3] - bounds[2], bounds[5] - bounds[4]],
+            'size_one': size_one,
+            'columns': columns,
+            'number_of_chunks': number_of_chunks}
+
+
+class LAMMPSBinaryFrameIndex(FrameIndex):
+    """
+    Byte offset index of the frames in a binary lammps dump.
+
+    The frames are of variable size, so the header and the chunk sizes of every frame are read instead of counting
+    lines. The atom data itself is skipped.
+    """
+
+    def __init__(self, file_path: str, configuration_length: int, skip_lines: int = 0, time_parser=None):
+        """
+        Constructor for the LAMMPSBinaryFrameIndex class.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the binary dump.
+        configuration_length : int
+                Number of atoms in each frame.
+        skip_lines : int
+                Not used, binary dumps have no file header.
+        time_parser : Callable
+                Not used, the timestep is read with the frame header.
+        """
+        super().__init__(file_path, configuration_length, skip_lines=0)
+
+    def update(self, chunk_size: int = None) -> int:
+        """
+        Index every complete frame written after the current end of the index.
+
+        Parameters
+        ----------
+        chunk_size : int
+                Not used, kept for the interface of the parent class.
+
+        Returns
+        -------
+        number_of_new_configurations : int
+                Number of frames added to the index.
+        """
+        if self.end_offset is None:
+            self.end_offset = 0
+
+        offsets, timesteps = [], []
+        offset = self.end_offset
+        # seeking past the end of a plain file does not fail, so the position is checked against its size.
+        file_size = None if is_compressed(self.file_path) else os.path.getsize(self.file_path)
+        with open_trajectory(self.file_path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                header = read_binary_header(f)
+                if header is None or not self._skip_chunks(f, header, file_size):
+                    break  # the frame is still being written
+                offsets.append(offset)
+                timesteps.append(header['timestep'])
+                offset = f.tell()
+
+        self.offsets = np.concatenate((self.offsets, np.array(offsets, dtype=np.int64)))
+        self.timesteps = np.concatenate((self.timesteps, np.array(timesteps, dtype=np.float64)))
+        self.end_offset = offset
+        stat = os.stat(self.file_path)
+        self.file_size = stat.st_size
+        self.modification_time = stat.st_mtime_ns
+
+        return len(offsets)
+
+    def _read_timestep(self, f: BinaryIO) -> float:
+        """
+        Read the timestep of the frame at the current position of the file.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned at the start of a frame.
+
+        Returns
+        -------
+        timestep : float
+                Timestep of the frame.
+        """
+        header = read_binary_header(f)
+        if header is None:
+            raise ValueError(f"No complete frame header at byte {f.tell()} of {self.file_path}")
+
+        return float(header['timestep'])
+
+    @staticmethod
+    def _skip_chunks(f: BinaryIO, header: dict, file_size: int = None) -> bool:
+        """
+        Move past the chunks of a frame without reading the atom data.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned at the first chunk of the frame.
+        header : dict
+                Header of the frame, see read_binary_header.
+        file_size : int
+                Size of the file in bytes, None for a compressed stream, which stops at its end by itself.
+
+        Returns
+        -------
+        complete : bool
+                False if the frame is not completely written.
+        """
+        for _ in range(header['number_of_chunks']):
+            size = f.read(4)
+            if len(size) < 4:
+                return False
+            number_of_values, = struct.unpack('<i', size)
+            position = f.tell() + 8 * number_of_values
+            if f.seek(8 * number_of_values, 1) != position or (file_size is not None and position > file_size):
+                return False
+
+        return True
+
+
+class LAMMPSBinaryTrajectoryFile(TrajectoryFile):
+    """
+    Child class for the binary lammps dump reader.
+
+    Attributes
+    ----------
+    obj : object
+            Experiment class instance to add to
+    header_lines : int
+            Number of header lines in the file format (binary = 0, the headers are not lines).
+    file_path : str
+            Path to the trajectory file.
+    """
+
+    def __init__(self, obj, header_lines=0, file_path=None, sort: bool = False, properties: list = None,
+                 frames: slice = None):
+        """
+        Python class constructor
+        """
+        super().__init__(obj, header_lines, file_path, sort=sort, properties=properties, frames=frames)
+
+    def _read_first_header(self) -> dict:
+        """
+        Read the header of the first frame.
+
+        Returns
+        -------
+        header : dict
+                See read_binary_header.
+        """
+        with open_trajectory(self.file_path, 'rb') as f:
+            return read_binary_header(f)
+
+    def open_file(self):
+        """
+        Open the binary dump for reading configurations.
+
+        Returns
+        -------
+        file_object : BinaryIO
+        """
+        return open_trajectory(self.file_path, 'rb')
+
+    def open_block(self, block: bytes):
+        """
+        Wrap a block of raw frames read from the file, see FileProcessor.open_block.
+
+        Parameters
+        ----------
+        block : bytes
+                Raw bytes of one or more complete frames.
+
+        Returns
+        -------
+        file_object : BinaryIO
+        """
+        return io.BytesIO(block)
+
+    def read_configurations(self, number_of_configurations: int, file_object: BinaryIO, line_length: int):
+        """
+        Read in a number of configurations from the binary dump.
+
+        The chunks of doubles are read straight into an array, so the atom data is never converted. Sorting by atom
+        id moves every row once.
+
+        Parameters
+        ----------
+        number_of_configurations : int
+                Number of configurations to be read in.
+        file_object : BinaryIO
+                File object positioned at the start of a frame.
+        line_length : int
+                Number of values per atom.
+
+        Returns
+        -------
+        configuration tensor_values : np.array
+                Array of shape (n_configurations * n_atoms, line_length). If the reader sorts, the atoms of each
+                configuration are in order of their id.
+        """
+        data = self._read_chunks(number_of_configurations, file_object, line_length)
+        if self.sort:
+            return self._sort_configurations(data)
+
+        return data
+
+    def _read_chunks(self, number_of_configurations: int, file_object: BinaryIO, line_length: int) -> np.ndarray:
+        """
+        Read the chunks of a number of frames into an array, in the order the atoms are stored.
+
+        Parameters
+        ----------
+        number_of_configurations : int
+                Number of configurations to be read in.
+        file_object : BinaryIO
+                File object positioned at the start of a frame.
+        line_length : int
+                Number of values per atom.
+
+        Returns
+        -------
+        configuration tensor_values : np.array
+                Array of shape (n_configurations * n_atoms, line_length).
+        """
+        data = np.empty((number_of_configurations * self.experiment.number_of_atoms, line_length), dtype='<f8')
+        values = data.reshape(-1)
+        value = 0
+        for _ in range(number_of_configurations):
+            header = read_binary_header(file_object)
+            for _ in range(header['number_of_chunks']):
+                number_of_values, = struct.unpack('<i', file_object.read(4))
+                self._read_into(file_object, values[value:value + number_of_values])
+                value += number_of_values
+
+        return data
+
+    def read_frames(self, file_object: BinaryIO, frames: np.ndarray, line_length: int) -> np.ndarray:
+        """
+        Read a sorted list of frames, seeking over the frames in between.
+
+        The raw bytes of the selected frames are gathered first so that they are parsed in one pass.
+
+        Parameters
+        ----------
+        file_object : BinaryIO
+                File object returned by open_file.
+        frames : np.ndarray
+                Increasing indices of the frames to read.
+        line_length : int
+                Number of values per atom.
+
+        Returns
+        -------
+        configuration tensor_values : np.array
+                Array of shape (n_frames * n_atoms, line_length).
+        """
+        block = []
+        for begin, end in self.frame_index.byte_ranges(frames):
+            file_object.seek(begin)
+            block.append(file_object.read(end - begin))
+
+        return self.read_configurations(len(frames), self.open_block(b''.join(block)), line_length)
+
+    def _restrict_columns(self, property_groups: dict):
+        """
+        Keep every column, the chunks of a binary dump are read as a whole.
+
+        Unselected properties are still left out of the database, see TrajectoryFile._select_properties.
+
+        Parameters
+        ----------
+        property_groups : dict
+                The property groups which are read and their columns.
+        """
+
+    @staticmethod
+    def _read_into(file_object: BinaryIO, array: np.ndarray):
+        """
+        Fill a contiguous array with the next bytes of a file.
+
+        Parameters
+        ----------
+        file_object : BinaryIO
+                File object to read from.
+        array : np.ndarray
+                Array to fill.
+        """
+        view = memoryview(array).cast('B')
+        while view.nbytes > 0:
+            number_of_bytes = file_object.readinto(view)
+            if not number_of_bytes:
+                raise EOFError("The binary dump ended inside a frame.")
+            view = view[number_of_bytes:]
+
+    def _build_frame_index(self, number_of_atoms: int) -> FrameIndex:
+        """
+        Load or build the index of the frames in the binary dump.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each frame.
+
+        Returns
+        -------
+        frame_index : LAMMPSBinaryFrameIndex
+        """
+        self.frame_index = LAMMPSBinaryFrameIndex.load_or_build(self.file_path, number_of_atoms)
+
+        return self.frame_index
+
+    def _read_timestep(self, f: BinaryIO) -> float:
+        """
+        Read the timestep of the frame starting at the current position of a binary file object.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned at the start of a frame.
+
+        Returns
+        -------
+        timestep : float
+        """
+        magic_length, = struct.unpack('<q', f.read(8))
+        f.seek(-magic_length + 8, 1)  # skip the magic string, the byte order and the revision
+
+        return float(struct.unpack('<q', f.read(8))[0])
+
+    def _get_number_of_atoms(self):
+        """
+        Get the number of atoms
+
+        Returns
+        -------
+        number_of_atoms : int
+        """
+        return self._read_first_header()['number_of_atoms']
+
+    def _get_number_of_configurations(self, number_of_atoms: int):
+        """
+        Get the number of configurations
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each frame.
+
+        Returns
+        -------
+        number_of_configurations : int
+                Number of complete frames in the dump, taken from the frame index.
+        """
+        return self._build_frame_index(number_of_atoms).number_of_configurations
+
+    def _get_time_information(self, number_of_atoms: int):
+        """
+        Get the number of timesteps between two frames.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each frame.
+
+        Returns
+        -------
+        sample_rate : float
+        """
+        return self.frame_index.timesteps[1] - self.frame_index.timesteps[0]
+
+    def _get_species_information(self, number_of_atoms: int):
+        """
+        Get the initial species information
+
+        Binary dumps can not store element names, so the species are named by the atom type.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each configuration
+        """
+        header = self._read_first_header()
+        columns = header['columns']
+        if 'type' not in columns:
+            print("Insufficient species or type identification available.")
+            sys.exit(1)
+        line_length = header['size_one']
+        self.numeric_columns = list(range(line_length))
+
+        column_dict_properties = self._get_column_properties(columns)
+        property_groups = self._extract_properties(copy.deepcopy(var_names), column_dict_properties)
+
+        with self.open_file() as f:
+            first_configuration = self._read_chunks(1, f, line_length)
+        types = first_configuration[:, columns.index('type')].astype(int)
+        if self.sort:
+            self.id_column = columns.index('id')
+            positions = first_configuration[:, self.id_column].astype(int)
+            self._build_id_slots(positions)
+        else:
+            positions = np.arange(number_of_atoms) + self.header_lines
+
+        species_summary = {}
+        for atom_type in np.unique(types):
+            species_summary[str(atom_type)] = {'indices': positions[types == atom_type].tolist()}
+
+        return species_summary, header['box'], property_groups, line_length
+
+    def process_trajectory_file(self, update_class: bool = True, rename_cols: dict = None):
+        """
+        Get additional information from the trajectory file
+
+        Parameters
+        ----------
+        rename_cols : dict
+                Will map some observable to keys found in the dump file.
+        update_class : bool
+                Boolean decision on whether or not to update the class. If yes, the full saved class instance will be
+                updated with new information. This is necessary on the first run of tensor_values addition to the
+                database_path.
+
+        Returns
+        -------
+        architecture : dict
+                Database architecture to be used by the class to build a new database_path.
+        """
+        if rename_cols is not None:
+            var_names.update(rename_cols)
+        number_of_atoms = self._get_number_of_atoms()  # get the number of atoms
+        number_of_configurations = self._get_number_of_configurations(number_of_atoms)  # get number of configurations
+        sample_rate = self._get_time_information(number_of_atoms)  # get the sample rate
+        batch_size = optimize_batch_size(self.file_path, number_of_configurations,
+                                         file_size=self.frame_index.end_offset)  # get the batch size
+        number_of_configurations, sample_rate = self._select_frames(number_of_configurations, sample_rate,
+                                                                    update_class=update_class)
+        batch_size = min(batch_size, max(number_of_configurations, 1))
+        self.experiment.number_of_atoms = number_of_atoms  # needed to read the first configuration
+        species_summary, box, property_groups, line_length = self._get_species_information(number_of_atoms)
+        property_groups = self._select_properties(property_groups, update_class)
+        self._restrict_columns(property_groups)
+
+        if update_class:
+            self.experiment.batch_size = batch_size
+            self.experiment.dimensions = get_dimensionality(box)
+            self.experiment.box_array = box
+            self.experiment.volume = box[0] * box[1] * box[2]
+            self.experiment.species = species_summary
+            self.experiment.number_of_atoms = number_of_atoms
+            self.experiment.number_of_configurations += number_of_configurations
+            self.experiment.sample_rate = sample_rate
+            self.experiment.property_groups = property_groups
+
+        else:
+            self.experiment.batch_size = batch_size
+            self.experiment.number_of_configurations += number_of_configurations
+
+        return self._build_architecture(species_summary, property_groups, number_of_configurations), line_length
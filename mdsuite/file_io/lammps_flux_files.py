@@ -17,7 +17,9 @@ Summary
 
 import numpy as np
 
+from mdsuite.file_io.compression import open_trajectory
 from mdsuite.file_io.flux_files import FluxFile
+from mdsuite.file_io.frame_index import FrameIndex
 # from .file_io_dict import lammps_flux
 from mdsuite.utils.meta_functions import optimize_batch_size, join_path
 
@@ -61,7 +63,7 @@ class LAMMPSFluxFile(FluxFile):
         -------
 
         """
-        with open(self.file_path) as f:
+        with open_trajectory(self.file_path) as f:
             for i in range(self.header_lines):
                 f.readline()
 
@@ -92,7 +94,7 @@ class LAMMPSFluxFile(FluxFile):
             var_names.update(rename_cols)
 
         n_lines_header = 0  # number of lines of header
-        with open(self.file_path) as f:
+        with open_trajectory(self.file_path) as f:
             header = []
             for line in f:
                 n_lines_header += 1
@@ -104,18 +106,22 @@ class LAMMPSFluxFile(FluxFile):
 
         self.header_lines = n_lines_header
 
-        with open(self.file_path) as f:
-            number_of_configurations = sum(1 for _ in f) - n_lines_header
-
         # Find properties available for analysis
         column_dict_properties = self._get_column_properties(header_line)
+
+        # each line after the header is one configuration
+        self.frame_index = FrameIndex.load_or_build(self.file_path, 1, skip_lines=n_lines_header,
+                                                    time_parser=lambda f: float(
+                                                        f.readline().split()[column_dict_properties['time']]))
+        number_of_configurations = self.frame_index.number_of_configurations
         self.experiment.property_groups = self._extract_properties(var_names, column_dict_properties)
 
 
-        batch_size = optimize_batch_size(self.file_path, number_of_configurations)
+        batch_size = optimize_batch_size(self.file_path, number_of_configurations,
+                                         file_size=self.frame_index.end_offset)
 
         # get time related properties of the experiment
-        with open(self.file_path) as f:
+        with open_trajectory(self.file_path) as f:
             # skip the header
             for _ in range(n_lines_header):
                 next(f)
@@ -156,9 +162,14 @@ class LAMMPSFluxFile(FluxFile):
                                         self.experiment.number_of_atoms,
                                         number_of_configurations), line_length
 
-    def build_file_structure(self):
+    def build_file_structure(self, batch_size: int = None):
         """
         Build a skeleton of the file so that the database_path class can process it correctly.
+
+        Parameters
+        ----------
+        batch_size : int
+                Unused, the structure of a flux file does not depend on the batch size.
         """
 
         structure = {}  # define initial dictionary
@@ -16,11 +16,14 @@ Summary
 """
 
 import sys
+from typing import BinaryIO
 
+import numpy as np
+
+from mdsuite.file_io.compression import open_trajectory
 from mdsuite.file_io.trajectory_files import TrajectoryFile
 from mdsuite.utils.exceptions import *
 from mdsuite.utils.meta_functions import get_dimensionality
-from mdsuite.utils.meta_functions import line_counter
 from mdsuite.utils.meta_functions import optimize_batch_size
 
 var_names = {
@@ -58,14 +61,16 @@ class LAMMPSTrajectoryFile(TrajectoryFile):
             Path to the trajectory file.
     """
 
-    def __init__(self, obj, header_lines=9, file_path=None, sort: bool = False):
+    def __init__(self, obj, header_lines=9, file_path=None, sort: bool = False, properties: list = None,
+                 frames: slice = None):
         """
         Python class constructor
         """
 
-        super().__init__(obj, header_lines, file_path, sort=sort)  # fill the experiment class
+        super().__init__(obj, header_lines, file_path, sort=sort, properties=properties,
+                         frames=frames)  # fill the experiment class
 
-        self.f_object = open(self.file_path)  # file object
+        self.f_object = open_trajectory(self.file_path)  # file object
 
     def _get_number_of_atoms(self):
         """
@@ -95,11 +100,27 @@ class LAMMPSTrajectoryFile(TrajectoryFile):
                 Number of atoms in each of the trajectories
         Returns
         -------
+        number_of_configurations : int
+                Number of complete configurations in the trajectory, taken from the frame index.
+        """
+        return self._build_frame_index(number_of_atoms).number_of_configurations
+
+    def _read_timestep(self, f: BinaryIO) -> float:
+        """
+        Read the timestep of the configuration starting at the current position of a binary file object.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned on the ITEM: TIMESTEP line.
 
+        Returns
+        -------
+        timestep : float
         """
-        number_of_lines = line_counter(self.file_path)  # get the number of lines in the file
+        f.readline()
 
-        return int(number_of_lines / (number_of_atoms + self.header_lines))
+        return float(f.readline())
 
     def _get_time_information(self, number_of_atoms: int):
         """
@@ -136,6 +157,7 @@ class LAMMPSTrajectoryFile(TrajectoryFile):
         header = self._read_header(self.f_object)  # get the header tensor_values
 
         id_index = header[8].index('id') - 2
+        self.id_column = id_index
 
         # Look for the element keyword
         try:
@@ -166,6 +188,8 @@ class LAMMPSTrajectoryFile(TrajectoryFile):
         for i in range(number_of_atoms):
             line = self.f_object.readline().split()
             line_length = len(line)
+            if i == 0:
+                self.numeric_columns = self._get_numeric_columns(line)
             if line[element_index] not in species_summary:
                 species_summary[line[element_index]] = {}
                 species_summary[line[element_index]]['indices'] = []
@@ -176,6 +200,9 @@ class LAMMPSTrajectoryFile(TrajectoryFile):
             else:
                 species_summary[line[element_index]]['indices'].append(i + self.header_lines)
 
+        if self.sort:
+            self._build_id_slots(np.concatenate([species['indices'] for species in species_summary.values()]))
+
         return species_summary, box, property_groups, line_length
 
     def process_trajectory_file(self, update_class: bool = True, rename_cols: dict = None):
@@ -208,8 +235,14 @@ class LAMMPSTrajectoryFile(TrajectoryFile):
         number_of_atoms = self._get_number_of_atoms()  # get the number of atoms
         number_of_configurations = self._get_number_of_configurations(number_of_atoms)  # get number of configurations
         sample_rate = self._get_time_information(number_of_atoms)  # get the sample rate
-        batch_size = optimize_batch_size(self.file_path, number_of_configurations)  # get the batch size
+        batch_size = optimize_batch_size(self.file_path, number_of_configurations,
+                                         file_size=self.frame_index.end_offset)  # get the batch size
+        number_of_configurations, sample_rate = self._select_frames(number_of_configurations, sample_rate,
+                                                                    update_class=update_class)
+        batch_size = min(batch_size, max(number_of_configurations, 1))
         species_summary, box, property_groups, line_length = self._get_species_information(number_of_atoms)
+        property_groups = self._select_properties(property_groups, update_class)
+        self._restrict_columns(property_groups)
 
         if update_class:
             self.experiment.batch_size = batch_size
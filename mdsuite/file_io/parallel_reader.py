@@ -0,0 +1,194 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Module for parsing trajectory files in several processes.
+
+Summary
+-------
+Each worker process is given a copy of the trajectory reader once. It is then sent ranges of configurations, seeks to
+them through the frame index, parses them and returns numeric per-species arrays. The calling process writes them to
+the database, so an hdf5 file has a single writer. If the database is stored with a backend which allows several
+writers, e.g. as a directory of chunk files, the workers write their batches themselves instead of sending them back,
+and only the statistics of the batches are returned so the calling process stores them, see
+mdsuite.database.dataset_statistics.
+
+A compressed stream can not be entered in the middle without decompressing everything before it. For compressed files
+the calling process therefore decompresses the file front to back and sends the raw bytes of each range to the
+workers, which only parse them.
+"""
+
+import concurrent.futures
+from typing import BinaryIO, Iterator, List, Tuple
+
+import numpy as np
+
+from mdsuite.database.simulation_database import Database
+from mdsuite.file_io.compression import is_compressed, open_trajectory
+from mdsuite.file_io.trajectory_files import TrajectoryFile
+
+_worker_state = {}  # state of the reader in a worker process, filled by _initialize_worker
+
+
+def _initialize_worker(trajectory_reader: TrajectoryFile, line_length: int, database_name: str = None,
+                       start_index: int = 0):
+    """
+    Store the reader in the worker process and open the trajectory file.
+
+    Parameters
+    ----------
+    trajectory_reader : TrajectoryFile
+            Reader with the frame index and species information of the trajectory.
+    line_length : int
+            Number of columns in each atom line.
+    database_name : str
+            Database the worker writes its batches to. If None, the batches are returned to the calling process.
+    start_index : int
+            Configuration in the database at which the configurations of the trajectory are written.
+    """
+    _worker_state['reader'] = trajectory_reader
+    _worker_state['file_object'] = trajectory_reader.open_file()
+    _worker_state['line_length'] = line_length
+    _worker_state['database'] = Database() if database_name is None else \
+        Database(name=database_name, box=trajectory_reader.experiment.box_array)
+    _worker_state['write'] = database_name is not None
+    _worker_state['start_index'] = start_index
+
+
+def _read_batch(start: int, number_of_configurations: int, block: bytes = None) -> Tuple[int, dict, dict]:
+    """
+    Read a range of configurations in a worker process and split them into per-species arrays.
+
+    Parameters
+    ----------
+    start : int
+            First configuration of the range in the trajectory file.
+    number_of_configurations : int
+            Number of configurations to read.
+    block : bytes
+            Raw bytes of the configurations, read by the calling process. If None, the worker reads them itself.
+
+    Returns
+    -------
+    start : int
+            The start of the range, returned so results can be written in any order.
+    batch : dict
+            Arrays of shape (n_atoms, number_of_configurations, n_columns) keyed by database path, or None if the
+            worker has written them.
+    statistics : dict
+            DatasetStatistics of the arrays keyed by database path if the worker has written them, else None.
+    """
+    reader = _worker_state['reader']
+    if block is None:
+        data = reader.read_configuration_range(_worker_state['file_object'], start, number_of_configurations,
+                                               _worker_state['line_length'])
+    else:
+        data = reader.read_configurations(number_of_configurations, reader.open_block(block),
+                                          _worker_state['line_length'])
+    structure = reader.build_file_structure(batch_size=number_of_configurations)
+    batch = _worker_state['database'].get_batch(data, structure, number_of_configurations)
+    if _worker_state['write']:
+        statistics = _worker_state['database'].write_batch(batch, _worker_state['start_index'] + start,
+                                                           update_statistics=False)
+        return start, None, statistics
+
+    return start, batch, None
+
+
+def _read_raw_block(stream: BinaryIO, trajectory_reader: TrajectoryFile, start: int,
+                    number_of_configurations: int) -> bytes:
+    """
+    Read the raw bytes of a range of configurations from a decompressed stream.
+
+    Parameters
+    ----------
+    stream : BinaryIO
+            Decompressing file object. It is only moved forwards, so the ranges must be read in order.
+    trajectory_reader : TrajectoryFile
+            Reader of the trajectory, whose frame selection is applied.
+    start : int
+            First configuration of the range, counted in the selected configurations.
+    number_of_configurations : int
+            Number of configurations in the range.
+
+    Returns
+    -------
+    block : bytes
+            Raw bytes of the selected configurations, see FileProcessor.open_block.
+    """
+    if trajectory_reader.frames is None:
+        frames = np.arange(start, start + number_of_configurations)
+    else:
+        frames = trajectory_reader.frames[start:start + number_of_configurations]
+    block = []
+    for begin, end in trajectory_reader.frame_index.byte_ranges(frames):
+        stream.seek(begin)
+        block.append(stream.read(end - begin))
+
+    return b''.join(block)
+
+
+def parallel_read(trajectory_reader: TrajectoryFile, batches: List[Tuple[int, int]], line_length: int,
+                  n_jobs: int = 2, database_name: str = None,
+                  start_index: int = 0) -> Iterator[Tuple[int, dict, dict]]:
+    """
+    Read batches of configurations in several worker processes.
+
+    At most two batches per worker are in flight at any time so that the memory use is bounded. The batches are
+    submitted in order, which lets a compressed file be decompressed in a single pass.
+
+    Parameters
+    ----------
+    trajectory_reader : TrajectoryFile
+            Reader of the trajectory. Its frame index must be built.
+    batches : list
+            List of (start, number_of_configurations) tuples to read. If the reader has a frame selection, the
+            configurations are counted in the selected configurations.
+    line_length : int
+            Number of columns in each atom line.
+    n_jobs : int
+            Number of worker processes.
+    database_name : str
+            Database to which the workers write the batches, which must allow several writers. Its datasets must be
+            large enough for the batches. If None, the batches are yielded to be written by the calling process.
+    start_index : int
+            Configuration in the database at which the batch starting at configuration 0 is written.
+
+    Yields
+    ------
+    start : int
+            First configuration of the batch that was read.
+    batch : dict
+            Arrays of shape (n_atoms, number_of_configurations, n_columns) keyed by database path, or None if a
+            worker has written it.
+    statistics : dict
+            DatasetStatistics of the batch keyed by database path if a worker has written it, else None. They must
+            be stored with Database.merge_statistics.
+    """
+    pending_batches = list(reversed(batches))
+    stream = None
+    if is_compressed(trajectory_reader.file_path):
+        stream = open_trajectory(trajectory_reader.file_path, 'rb')
+    initargs = (trajectory_reader, line_length, database_name, start_index)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs, initializer=_initialize_worker,
+                                                initargs=initargs) as executor:
+        in_flight = set()
+        while pending_batches or in_flight:
+            while pending_batches and len(in_flight) < 2 * n_jobs:
+                start, number_of_configurations = pending_batches.pop()
+                block = None
+                if stream is not None:
+                    block = _read_raw_block(stream, trajectory_reader, start, number_of_configurations)
+                in_flight.add(executor.submit(_read_batch, start, number_of_configurations, block))
+            done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    if stream is not None:
+        stream.close()
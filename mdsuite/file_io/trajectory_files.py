@@ -16,10 +16,19 @@ Summary
 """
 
 import abc
-from typing import TextIO
+import io
+import logging
+import sys
+from itertools import islice
+from types import SimpleNamespace
+from typing import BinaryIO, TextIO, Tuple
 import numpy as np
+import pandas as pd
 from mdsuite.utils.meta_functions import join_path
 from mdsuite.file_io.file_read import FileProcessor
+from mdsuite.file_io.frame_index import FrameIndex, split_into_runs
+
+log = logging.getLogger(__file__)
 
 
 class TrajectoryFile(FileProcessor, metaclass=abc.ABCMeta):
@@ -34,7 +43,8 @@ class TrajectoryFile(FileProcessor, metaclass=abc.ABCMeta):
             Number of header lines in the file format being read.
     """
 
-    def __init__(self, obj, header_lines, file_path, sort: bool = False):
+    def __init__(self, obj, header_lines, file_path, sort: bool = False, properties: list = None,
+                 frames: slice = None):
         """
         Python constructor
 
@@ -48,10 +58,39 @@ class TrajectoryFile(FileProcessor, metaclass=abc.ABCMeta):
 
         sort : bool
                 If true, the tensor_values in the trajectory file must be sorted during the database_path build.
+
+        properties : list
+                Names of the property groups, e.g. ['Positions', 'Velocities'], to read from the file. If None, every
+                property group found in the file is read.
+
+        frames : slice
+                Configurations of the file to read, e.g. slice(100, None, 10) for every 10th configuration from the
+                100th on. If None, every configuration is read.
         """
 
         super().__init__(obj, header_lines, file_path)  # fill the experiment class
         self.sort = sort
+        self.properties = properties
+        self.frame_selection = frames
+        self.id_column = None  # column of the atom ids in the file, set by the child class if the file is sorted
+        self.id_slots = None  # position of each atom id in a sorted configuration, see _build_id_slots
+        self.numeric_columns = None  # columns of the atom lines which hold numbers, set by the child class
+
+    def __getstate__(self):
+        """
+        Prepare the reader to be sent to a worker process.
+
+        The open file object is dropped and the experiment is replaced by the few attributes needed to parse
+        configurations, as the full experiment is neither needed nor cheap to send.
+        """
+        state = self.__dict__.copy()
+        state.pop('f_object', None)
+        state['experiment'] = SimpleNamespace(number_of_atoms=self.experiment.number_of_atoms,
+                                              species=self.experiment.species,
+                                              property_groups=self.experiment.property_groups,
+                                              batch_size=self.experiment.batch_size)
+
+        return state
 
     def _read_header(self, f: TextIO, offset: int = 0) -> list:
         """
@@ -75,10 +114,244 @@ class TrajectoryFile(FileProcessor, metaclass=abc.ABCMeta):
 
         return [next(f).split() for _ in range(self.header_lines)]  # Get the first header
 
+    def _build_frame_index(self, number_of_atoms: int) -> FrameIndex:
+        """
+        Load or build the byte offset index of the configurations in the trajectory.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each configuration.
+
+        Returns
+        -------
+        frame_index : FrameIndex
+                Index of the complete configurations in the file.
+        """
+        self.frame_index = FrameIndex.load_or_build(self.file_path,
+                                                    number_of_atoms + self.header_lines,
+                                                    time_parser=self._read_timestep)
+
+        return self.frame_index
+
+    def prepare_reading(self) -> int:
+        """
+        Prepare the reader for a file whose layout is already stored in the experiment.
+
+        Only the first configuration is inspected and the frame index is loaded, so that new configurations of a
+        file which was read before can be appended without processing the whole trajectory again.
+
+        Returns
+        -------
+        line_length : int
+                Number of columns in each atom line.
+        """
+        self._build_frame_index(self.experiment.number_of_atoms)
+        _, _, _, line_length = self._get_species_information(self.experiment.number_of_atoms)
+        self._restrict_columns(self.experiment.property_groups)
+
+        return line_length
+
+    def _select_frames(self, number_of_configurations: int, sample_rate: float,
+                       update_class: bool = True) -> Tuple[int, float]:
+        """
+        Apply the frame selection of the reader to the configurations in the file.
+
+        When data is added to an existing database_path, configurations whose timestep is already stored are skipped
+        as well, e.g. the repeated configurations at the start of a restarted simulation.
+
+        Parameters
+        ----------
+        number_of_configurations : int
+                Number of configurations in the file.
+        sample_rate : float
+                Number of timesteps between two configurations in the file.
+        update_class : bool
+                If false, the data is added to an existing database_path.
+
+        Returns
+        -------
+        number_of_configurations : int
+                Number of selected configurations.
+        sample_rate : float
+                Number of timesteps between two selected configurations.
+        """
+        frames = np.arange(number_of_configurations)
+        if self.frame_selection is not None:
+            stride = self.frame_selection.step or 1
+            if stride < 1:
+                print("The stride must be a positive number of configurations.")
+                sys.exit(1)
+            frames = frames[self.frame_selection]
+            sample_rate *= stride
+            if len(frames) == 0:
+                print(f"No configurations of {self.file_path} are selected, the file holds "
+                      f"{number_of_configurations}.")
+                sys.exit(1)
+        if not update_class:
+            frames = self.skip_stored_configurations(frames)
+
+        if self.frame_selection is not None or len(frames) != number_of_configurations:
+            self.frames = frames
+
+        return len(frames), sample_rate
+
+    def skip_stored_configurations(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Remove the configurations whose timestep is already stored in the experiment.
+
+        Only the timesteps of the frame index are compared, the stored data is not read.
+
+        Parameters
+        ----------
+        frames : np.ndarray
+                Indices of configurations in the file.
+
+        Returns
+        -------
+        frames : np.ndarray
+                The configurations which are not yet stored.
+        """
+        stored_timesteps = self.experiment.stored_timesteps
+        if stored_timesteps is None or len(frames) == 0:
+            return frames
+
+        new = ~np.isin(self.frame_index.timesteps[frames], stored_timesteps)
+        if not new.all():
+            log.info(f"Skipping {np.count_nonzero(~new)} configurations of {self.file_path} whose timesteps are "
+                     f"already stored")
+
+        return frames[new]
+
+    def selected_timesteps(self) -> np.ndarray:
+        """
+        Timesteps of the configurations which are read from the file.
+
+        Returns
+        -------
+        timesteps : np.ndarray
+        """
+        if self.frames is None:
+            return self.frame_index.timesteps
+
+        return self.frame_index.timesteps[self.frames]
+
+    def _select_properties(self, property_groups: dict, update_class: bool = True) -> dict:
+        """
+        Keep only the property groups which should be stored in the database.
+
+        Parameters
+        ----------
+        property_groups : dict
+                All property groups found in the file and their columns.
+        update_class : bool
+                If false, the data is added to an existing database. Unless other properties were requested, the
+                properties already in the database are then read so that the new data fits the existing datasets.
+
+        Returns
+        -------
+        property_groups : dict
+                The property groups to read and store.
+        """
+        properties = self.properties
+        if properties is None and not update_class:
+            properties = list(self.experiment.property_groups)
+        if properties is None:
+            return property_groups
+
+        missing = [item for item in properties if item not in property_groups]
+        if len(missing) > 0:
+            print(f"The properties {missing} were not found in {self.file_path}, available properties are "
+                  f"{list(property_groups)}")
+            sys.exit(1)
+
+        return {item: columns for item, columns in property_groups.items() if item in properties}
+
+    def _restrict_columns(self, property_groups: dict):
+        """
+        Only parse the columns which belong to the stored property groups.
+
+        The atom ids are kept if the configurations have to be sorted.
+
+        Parameters
+        ----------
+        property_groups : dict
+                The property groups which are read and their columns.
+
+        Returns
+        -------
+        Updates the numeric_columns attribute of the class.
+        """
+        used_columns = {column for columns in property_groups.values() for column in columns}
+        if self.sort:
+            used_columns.add(self.id_column)
+        self.numeric_columns = [column for column in self.numeric_columns if column in used_columns]
+
+    def read_configuration_range(self, file_object: TextIO, start: int, number_of_configurations: int,
+                                 line_length: int):
+        """
+        Read a number of configurations starting from any configuration in the file.
+
+        If a frame selection is set, start and number_of_configurations count the selected configurations.
+
+        Parameters
+        ----------
+        file_object : TextIO
+                File object to read from.
+        start : int
+                Index of the first configuration to read.
+        number_of_configurations : int
+                Number of configurations to read.
+        line_length : int
+                Length of each line of tensor_values to be read in.
+
+        Returns
+        -------
+        configuration tensor_values : np.array
+                Data read in from the file object, see read_configurations.
+        """
+        if self.frames is not None:
+            return self.read_frames(file_object, self.frames[start:start + number_of_configurations], line_length)
+        self.seek_configuration(file_object, start)
+
+        return self.read_configurations(number_of_configurations, file_object, line_length)
+
+    def read_frames(self, file_object: TextIO, frames: np.ndarray, line_length: int) -> np.ndarray:
+        """
+        Read a sorted list of configurations, skipping every configuration in between.
+
+        The lines of the selected configurations are collected with a seek per contiguous run of configurations and
+        parsed in a single call.
+
+        Parameters
+        ----------
+        file_object : TextIO
+                File object to read from.
+        frames : np.ndarray
+                Increasing indices of the configurations to read.
+        line_length : int
+                Length of each line of tensor_values to be read in.
+
+        Returns
+        -------
+        configuration tensor_values : np.array
+                Data of the configurations, see read_configurations.
+        """
+        configuration_length = self.experiment.number_of_atoms + self.header_lines
+        lines = []
+        for run in split_into_runs(frames):
+            self.seek_configuration(file_object, run[0])
+            lines.extend(islice(file_object, len(run) * configuration_length))
+
+        return self.read_configurations(len(frames), iter(lines), line_length)
+
     def read_configurations(self, number_of_configurations: int, file_object: TextIO, line_length: int):
         """
         Read in a number of configurations from a file
 
+        The whole block of configurations is handed to the pandas C parser in a single call. The header lines of
+        each configuration are skipped by row number so that no per-line work is done in Python.
+
         Parameters
         ----------
         line_length : int
@@ -91,46 +364,163 @@ class TrajectoryFile(FileProcessor, metaclass=abc.ABCMeta):
         Returns
         -------
         configuration tensor_values : np.array
-                Data read in from the file object.
+                Data read in from the file object as a float64 array of shape (n_configurations * n_atoms,
+                len(numeric_columns)). Only the columns in numeric_columns are parsed, in the order of the file. If
+                the reader sorts, the atoms of each configuration are in order of their id.
+        """
+        configuration_length = self.experiment.number_of_atoms + self.header_lines
+        block = ''.join(islice(file_object, number_of_configurations * configuration_length))
+        header_rows = (np.arange(number_of_configurations)[:, None] * configuration_length +
+                       np.arange(self.header_lines)[None, :]).flatten()
+
+        data = self._parse_block(block, header_rows, line_length, self.numeric_columns)
+        if self.sort:
+            return self._sort_configurations(data)
+
+        return data
+
+    def _build_id_slots(self, ids: np.ndarray):
+        """
+        Precompute the position of every atom id in a configuration sorted by id.
+
+        Parameters
+        ----------
+        ids : np.ndarray
+                Atom ids of one configuration, in any order.
+
+        Returns
+        -------
+        Updates the id_slots attribute of the class, an array which maps an atom id onto its row in a sorted
+        configuration.
+        """
+        ids = np.sort(np.asarray(ids, dtype=np.int64))
+        self.id_slots = np.full(ids[-1] + 1, -1, dtype=np.int64)
+        self.id_slots[ids] = np.arange(len(ids))
+
+    def _sort_configurations(self, data: np.ndarray) -> np.ndarray:
         """
+        Sort the atoms of each configuration by their id.
 
-        # Define the empty tensor_values array
-        configurations_data = np.empty((number_of_configurations * self.experiment.number_of_atoms, line_length),
+        The rows are moved to their slots with a single scatter, so no configuration is sorted. Data which is
+        already in order is returned as it is. The ids of every configuration must be those of the first, from which
+        the slots are built.
 
-                                       dtype='<U15')
+        Parameters
+        ----------
+        data : np.ndarray
+                Configurations as returned by read_configurations, each n_atoms rows long.
 
-        counter = 0
-        for i in range(number_of_configurations):
+        Returns
+        -------
+        data : np.ndarray
+                The configurations with the atoms of each in order of their id.
+        """
+        number_of_atoms = self.experiment.number_of_atoms
+        ids = data[:, self.numeric_columns.index(self.id_column)].astype(np.int64)
+        known = (ids >= 0) & (ids < len(self.id_slots))
+        slots = np.where(known, self.id_slots[np.where(known, ids, 0)], -1)
+        if np.any(slots < 0):
+            self._report_changed_ids(ids[slots < 0])
+        slots += np.repeat(np.arange(len(data) // number_of_atoms) * number_of_atoms, number_of_atoms)
+        if np.all(slots[1:] > slots[:-1]):
+            return data
+        repeated = np.flatnonzero(np.bincount(slots, minlength=len(data)) > 1)
+        if len(repeated) > 0:
+            self._report_changed_ids(ids[np.isin(slots, repeated)])
+        sorted_data = np.empty_like(data)
+        sorted_data[slots] = data
+
+        return sorted_data
+
+    def _report_changed_ids(self, ids: np.ndarray):
+        """
+        Stop the ingest of configurations whose atom ids differ from those of the first configuration.
 
-            for j in range(self.header_lines):
-                file_object.readline()
+        Parameters
+        ----------
+        ids : np.ndarray
+                Ids which are not in the first configuration or are repeated, of which the first few are reported.
+        """
+        print(f"The atom ids in {self.file_path} differ from the first configuration, e.g. "
+              f"{np.unique(ids)[:5].tolist()}. Sorting by id needs the same atoms in every configuration.")
+        sys.exit(1)
 
-            # Read the tensor_values into the arrays.
-            for k in range(self.experiment.number_of_atoms):
+    @staticmethod
+    def _parse_block(block: str, skip_rows: np.ndarray, line_length: int, columns: list = None) -> np.ndarray:
+        """
+        Parse a block of whitespace separated text into a float64 array.
 
-                configurations_data[counter] = np.array(list(file_object.readline().split()))
-                counter += 1  # update the counter
-        return configurations_data
+        Parameters
+        ----------
+        block : str
+                Text to parse.
+        skip_rows : np.ndarray
+                Row numbers in the block which should be skipped, e.g. configuration headers.
+        line_length : int
+                Number of columns in each of the rows which are kept.
+        columns : list
+                Columns to parse. If None, every column is parsed.
+
+        Returns
+        -------
+        data : np.ndarray
+                Array of shape (n_rows, len(columns)) holding the parsed columns.
+        """
+        frame = pd.read_csv(io.StringIO(block), sep=r'\s+', header=None, names=range(line_length), usecols=columns,
+                            skiprows=skip_rows, dtype=np.float64, engine='c')
+
+        return frame.to_numpy()
+
+    @staticmethod
+    def _get_numeric_columns(line: list) -> list:
+        """
+        Find the columns of an atom line which hold numbers.
+
+        Parameters
+        ----------
+        line : list
+                A split line of atom tensor_values.
+
+        Returns
+        -------
+        numeric_columns : list
+                Indices of the columns which can be converted to floats.
+        """
+        numeric_columns = []
+        for idx, item in enumerate(line):
+            try:
+                float(item)
+                numeric_columns.append(idx)
+            except ValueError:
+                continue
+
+        return numeric_columns
 
     def build_file_structure(self, batch_size: int = None):
         """
         Build a skeleton of the file so that the database_path class can process it correctly.
+
+        The columns of the structure refer to the arrays returned by read_configurations, which only hold the
+        numeric_columns of the file. If the reader sorts, the atom ids of each species are mapped onto their rows in
+        the sorted configurations.
         """
 
         structure = {}  # define initial dictionary
         if batch_size is None:
             batch_size = self.experiment.batch_size
+        column_positions = {column: i for i, column in enumerate(self.numeric_columns)}
 
         for item in self.experiment.species:
+            indices = np.asarray(self.experiment.species[item]['indices'])
             if self.sort:
-                positions = np.array(self.experiment.species[item]['indices'])
+                rows = self.id_slots[indices]
             else:
-                positions = np.array([np.array(self.experiment.species[item]['indices']) + i * self.experiment.number_of_atoms -
-                                      self.header_lines for i in range(batch_size)]).flatten()
+                rows = indices - self.header_lines
+            positions = (rows[None, :] + self.experiment.number_of_atoms * np.arange(batch_size)[:, None]).flatten()
             length = len(self.experiment.species[item]['indices'])
             for observable in self.experiment.property_groups:
                 path = join_path(item, observable)
-                columns = self.experiment.property_groups[observable]
+                columns = [column_positions[column] for column in self.experiment.property_groups[observable]]
 
                 structure[path] = {'indices': positions, 'columns': columns, 'length': length}
 
@@ -161,6 +551,10 @@ class TrajectoryFile(FileProcessor, metaclass=abc.ABCMeta):
 
         return architecture
 
+    @abc.abstractmethod
+    def _read_timestep(self, f: BinaryIO) -> float:
+        pass
+
     @abc.abstractmethod
     def _get_species_information(self):
         pass
@@ -10,5 +10,471 @@ Copyright Contributors to the MDSuite Project.
 
 """
 Python module to read xtc files for mdsuite
+
+Summary
+-------
+GROMACS xtc files store compressed coordinates in nm along with the step, time and box of every frame. The frame
+headers are indexed directly from the binary file, the coordinates are decompressed in bulk by the xtc library of
+mdtraj. As xtc files hold no species information, the atom names are taken from a gro topology file.
 """
 
+import logging
+import os
+import struct
+import sys
+from typing import BinaryIO
+
+import numpy as np
+from mdtraj.formats import XTCTrajectoryFile
+
+from mdsuite.file_io.compression import is_compressed
+from mdsuite.file_io.frame_index import FrameIndex, split_into_runs
+from mdsuite.file_io.trajectory_files import TrajectoryFile
+from mdsuite.utils.meta_functions import get_dimensionality
+from mdsuite.utils.meta_functions import optimize_batch_size
+
+log = logging.getLogger(__file__)
+
+xtc_magic = 1995  # magic number at the start of every xtc frame
+xtc_header_size = 92  # bytes up to and including the size of the compressed coordinates
+xtc_small_header_size = 56  # bytes before the coordinates of frames with at most 9 atoms, which are not compressed
+
+
+class XTCFrameIndex(FrameIndex):
+    """
+    Byte offset index of the frames in a GROMACS xtc file.
+
+    xtc frames are binary and of variable length, so instead of counting lines the size of each frame is read from its
+    header. The step and the box of every frame are stored along with its offset.
+
+    Attributes
+    ----------
+    boxes : np.ndarray
+            Box vectors of each frame with shape (n_frames, 3, 3).
+    """
+
+    def __init__(self, file_path: str, configuration_length: int, skip_lines: int = 0, time_parser=None):
+        """
+        Constructor for the XTCFrameIndex class.
+
+        Parameters
+        ----------
+        file_path : str
+                Path to the xtc file.
+        configuration_length : int
+                Number of atoms in each frame.
+        skip_lines : int
+                Not used, xtc files have no file header.
+        time_parser : Callable
+                Not used, the step is read with the frame header.
+        """
+        super().__init__(file_path, configuration_length, skip_lines=0)
+        self.boxes = np.empty((0, 3, 3), dtype=np.float32)
+
+    def reset(self):
+        """
+        Clear the index so that the next update scans the whole file.
+        """
+        super().reset()
+        self.boxes = np.empty((0, 3, 3), dtype=np.float32)
+
+    def update(self, chunk_size: int = None) -> int:
+        """
+        Index every complete frame written after the current end of the index.
+
+        Only the header of each frame is read, the compressed coordinates are skipped.
+
+        Parameters
+        ----------
+        chunk_size : int
+                Not used, kept for the interface of the parent class.
+
+        Returns
+        -------
+        number_of_new_configurations : int
+                Number of frames added to the index.
+        """
+        if self.end_offset is None:
+            self.end_offset = 0
+
+        offsets, steps, boxes = [], [], []
+        with open(self.file_path, 'rb') as f:
+            file_size = f.seek(0, 2)
+            offset = self.end_offset
+            while offset + xtc_small_header_size <= file_size:
+                f.seek(offset)
+                header = f.read(xtc_header_size)
+                magic, number_of_atoms, step = struct.unpack('>iii', header[:12])
+                if magic != xtc_magic or number_of_atoms != self.configuration_length:
+                    print(f"{self.file_path} is not a valid xtc file with {self.configuration_length} atoms at byte "
+                          f"{offset}.")
+                    sys.exit(1)
+                if number_of_atoms <= 9:
+                    frame_size = xtc_small_header_size + 12 * number_of_atoms
+                elif len(header) < xtc_header_size:
+                    break
+                else:
+                    number_of_bytes = struct.unpack('>i', header[88:92])[0]
+                    frame_size = xtc_header_size + 4 * int(np.ceil(number_of_bytes / 4))
+                if offset + frame_size > file_size:
+                    break  # the frame is still being written
+
+                offsets.append(offset)
+                steps.append(step)
+                boxes.append(np.frombuffer(header[16:52], dtype='>f4').reshape(3, 3))
+                offset += frame_size
+
+        self.offsets = np.concatenate((self.offsets, np.array(offsets, dtype=np.int64)))
+        self.timesteps = np.concatenate((self.timesteps, np.array(steps, dtype=np.float64)))
+        if boxes:
+            self.boxes = np.concatenate((self.boxes, np.array(boxes, dtype=np.float32)))
+        self.end_offset = offset
+        self.file_size = file_size
+        self.modification_time = os.stat(self.file_path).st_mtime_ns
+
+        return len(offsets)
+
+    def _read_timestep(self, f: BinaryIO) -> float:
+        """
+        Read the step of the frame at the current position of the file.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned at the start of a frame.
+
+        Returns
+        -------
+        timestep : float
+                Step of the frame.
+        """
+        magic, _, step = struct.unpack('>iii', f.read(12))
+        if magic != xtc_magic:
+            raise ValueError(f"No xtc frame starts at byte {f.tell() - 12} of {self.file_path}")
+
+        return float(step)
+
+    def _get_index_arrays(self) -> dict:
+        """
+        Collect the contents of the index which are stored in the sidecar file.
+        """
+        arrays = super()._get_index_arrays()
+        arrays['boxes'] = self.boxes
+
+        return arrays
+
+    def _set_index_arrays(self, sidecar):
+        """
+        Fill the index from the contents of a sidecar file.
+        """
+        super()._set_index_arrays(sidecar)
+        self.boxes = sidecar['boxes']
+
+
+class XTCFileReader(TrajectoryFile):
+    """
+    Child class for the GROMACS xtc file reader.
+
+    Attributes
+    ----------
+    obj : object
+            Experiment class instance to add to
+    header_lines : int
+            Number of header lines in the file format (xtc = 0, the headers are binary).
+    file_path : str
+            Path to the trajectory file.
+    topology : str
+            Path to a gro file with the atom names of the trajectory.
+    """
+
+    def __init__(self, obj, header_lines=0, file_path=None, sort: bool = False, topology: str = None,
+                 properties: list = None, frames: slice = None):
+        """
+        Python class constructor
+
+        Parameters
+        ----------
+        obj : object
+                Experiment class instance to add to.
+        header_lines : int
+                Number of header lines, always 0 for xtc files.
+        file_path : str
+                Path to the trajectory file.
+        sort : bool
+                Not used, the atoms of an xtc file are always stored in the same order.
+        topology : str
+                Path to a gro file with the atom names of the trajectory.
+        properties : list
+                Property groups to read, xtc files only hold 'Positions'.
+        frames : slice
+                Frames of the file to read. If None, every frame is read.
+        """
+        super().__init__(obj, header_lines, file_path, sort=False, properties=properties, frames=frames)
+        self.topology = topology
+        self.numeric_columns = [0, 1, 2]
+
+        if is_compressed(self.file_path):
+            print("Compressed xtc files can not be read, xtc files are already compressed.")
+            sys.exit(1)
+        if self.topology is None:
+            print("xtc files do not store the atom names, please pass a gro file as the topology.")
+            sys.exit(1)
+
+    def open_file(self):
+        """
+        Open the xtc file for reading configurations.
+
+        The offsets of the frame index are handed to the xtc file so it does not scan the file again.
+
+        Returns
+        -------
+        file_object : XTCTrajectoryFile
+        """
+        file_object = XTCTrajectoryFile(self.file_path, 'r')
+        file_object.offsets = self.frame_index.offsets
+
+        return file_object
+
+    def seek_configuration(self, file_object, configuration: int):
+        """
+        Move the xtc file to the start of a frame.
+
+        Parameters
+        ----------
+        file_object : XTCTrajectoryFile
+                File object returned by open_file.
+        configuration : int
+                Index of the frame to move to.
+        """
+        file_object.seek(configuration)
+
+    def read_configurations(self, number_of_configurations: int, file_object, line_length: int):
+        """
+        Decompress a number of frames in a single call.
+
+        Parameters
+        ----------
+        number_of_configurations : int
+                Number of frames to be read in.
+        file_object : XTCTrajectoryFile
+                File object returned by open_file.
+        line_length : int
+                Number of columns per atom, always 3 for xtc files.
+
+        Returns
+        -------
+        configuration tensor_values : np.array
+                Positions of shape (n_configurations * n_atoms, 3) in nm.
+        """
+        xyz, _, _, _ = file_object.read(n_frames=number_of_configurations)
+
+        return xyz.reshape(-1, 3)
+
+    def read_frames(self, file_object, frames: np.ndarray, line_length: int) -> np.ndarray:
+        """
+        Read a sorted list of frames, seeking over the frames in between.
+
+        Parameters
+        ----------
+        file_object : XTCTrajectoryFile
+                File object returned by open_file.
+        frames : np.ndarray
+                Increasing indices of the frames to read.
+        line_length : int
+                Number of columns per atom, always 3 for xtc files.
+
+        Returns
+        -------
+        configuration tensor_values : np.array
+                Positions of shape (n_frames * n_atoms, 3) in nm.
+        """
+        data = []
+        for run in split_into_runs(frames):
+            self.seek_configuration(file_object, run[0])
+            data.append(self.read_configurations(len(run), file_object, line_length))
+
+        return np.concatenate(data)
+
+    def _build_frame_index(self, number_of_atoms: int) -> FrameIndex:
+        """
+        Load or build the index of the frame headers.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each frame.
+
+        Returns
+        -------
+        frame_index : XTCFrameIndex
+        """
+        self.frame_index = XTCFrameIndex.load_or_build(self.file_path, number_of_atoms)
+
+        return self.frame_index
+
+    def _read_timestep(self, f: BinaryIO) -> float:
+        """
+        Read the step of the frame starting at the current position of a binary file object.
+
+        Parameters
+        ----------
+        f : BinaryIO
+                File object positioned at the start of a frame.
+
+        Returns
+        -------
+        timestep : float
+        """
+        return float(struct.unpack('>iii', f.read(12))[2])
+
+    def _get_number_of_atoms(self):
+        """
+        Get the number of atoms from the header of the first frame.
+
+        Returns
+        -------
+        number_of_atoms : int
+        """
+        with open(self.file_path, 'rb') as f:
+            magic, number_of_atoms = struct.unpack('>ii', f.read(8))
+        if magic != xtc_magic:
+            print(f"{self.file_path} is not an xtc file.")
+            sys.exit(1)
+
+        return number_of_atoms
+
+    def _get_number_of_configurations(self, number_of_atoms: int):
+        """
+        Get the number of complete frames in the file.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each frame.
+
+        Returns
+        -------
+        number_of_configurations : int
+        """
+        return self._build_frame_index(number_of_atoms).number_of_configurations
+
+    def _get_time_information(self, number_of_atoms: int):
+        """
+        Get the number of steps between two frames.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each frame.
+
+        Returns
+        -------
+        sample_rate : float
+        """
+        return self.frame_index.timesteps[1] - self.frame_index.timesteps[0]
+
+    def _read_topology(self, number_of_atoms: int) -> list:
+        """
+        Read the atom names from the gro topology file.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in the trajectory.
+
+        Returns
+        -------
+        atom_names : list
+        """
+        with open(self.topology, 'r') as f:
+            f.readline()  # title
+            if int(f.readline()) != number_of_atoms:
+                print(f"The topology {self.topology} does not have the {number_of_atoms} atoms of the trajectory.")
+                sys.exit(1)
+            # gro files have fixed columns, the atom name is in characters 11 to 15.
+            return [f.readline()[10:15].strip() for _ in range(number_of_atoms)]
+
+    def _get_species_information(self, number_of_atoms: int):
+        """
+        Get the species, the box and the properties of the trajectory.
+
+        Parameters
+        ----------
+        number_of_atoms : int
+                Number of atoms in each frame.
+        """
+        species_summary = {}
+        for i, name in enumerate(self._read_topology(number_of_atoms)):
+            if name not in species_summary:
+                species_summary[name] = {'indices': []}
+            species_summary[name]['indices'].append(i)
+
+        box = [float(item) for item in np.diag(self.frame_index.boxes[0])]
+        property_groups = {'Positions': [0, 1, 2]}
+
+        return species_summary, box, property_groups, 3
+
+    def _get_volume(self) -> float:
+        """
+        Get the mean volume of the indexed frames.
+
+        The box of every frame is stored in the frame index, so the volume of a simulation at constant pressure is
+        averaged rather than taken from the first frame.
+
+        Returns
+        -------
+        volume : float
+        """
+        volumes = np.abs(np.linalg.det(self.frame_index.boxes.astype(np.float64)))
+        if not np.allclose(volumes, volumes[0]):
+            log.info(f"The box of {self.file_path} changes between frames, the mean volume is used.")
+
+        return float(np.mean(volumes))
+
+    def process_trajectory_file(self, update_class: bool = True, rename_cols: dict = None):
+        """
+        Get additional information from the trajectory file
+
+        Parameters
+        ----------
+        rename_cols : dict
+                Not used, xtc files only hold positions.
+        update_class : bool
+                Boolean decision on whether or not to update the class. If yes, the full saved class instance will be
+                updated with new information. This is necessary on the first run of tensor_values addition to the
+                database_path.
+
+        Returns
+        -------
+        architecture : dict
+                Database architecture to be used by the class to build a new database_path.
+        """
+        number_of_atoms = self._get_number_of_atoms()  # get the number of atoms
+        number_of_configurations = self._get_number_of_configurations(number_of_atoms)  # get number of configurations
+        sample_rate = self._get_time_information(number_of_atoms)  # get the sample rate
+        # the coordinates are compressed on disk, the batch size is bounded by their size once decoded.
+        batch_size = optimize_batch_size(self.file_path, number_of_configurations,
+                                         file_size=number_of_configurations * number_of_atoms * 3 * 8)
+        number_of_configurations, sample_rate = self._select_frames(number_of_configurations, sample_rate,
+                                                                    update_class=update_class)
+        batch_size = min(batch_size, max(number_of_configurations, 1))
+        species_summary, box, property_groups, line_length = self._get_species_information(number_of_atoms)
+        property_groups = self._select_properties(property_groups, update_class)
+        self._restrict_columns(property_groups)
+
+        if update_class:
+            self.experiment.batch_size = batch_size
+            self.experiment.dimensions = get_dimensionality(box)
+            self.experiment.box_array = box
+            self.experiment.volume = self._get_volume()
+            self.experiment.species = species_summary
+            self.experiment.number_of_atoms = number_of_atoms
+            self.experiment.number_of_configurations += number_of_configurations
+            self.experiment.sample_rate = sample_rate
+            self.experiment.property_groups = property_groups
+
+        else:
+            self.experiment.batch_size = batch_size
+            self.experiment.number_of_configurations += number_of_configurations
+
+        return self._build_architecture(species_summary, property_groups, number_of_configurations), line_length
@@ -50,7 +50,7 @@ class MolecularGraph:
         self.smiles_string = smiles_string
         self.species = species
 
-        self.database = Database(name=os.path.join(self.experiment.database_path, "database.hdf5"),
+        self.database = Database(name=self.experiment.database_file,
                                  architecture='simulation')
 
     def _perform_checks(self):
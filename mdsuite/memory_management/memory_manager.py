@@ -10,16 +10,27 @@ Copyright Contributors to the MDSuite Project.
 
 """
 Class for memory management in MDSuite operations.
+
+Summary
+-------
+The batch size of an operation is bounded by the memory available for the loaded configurations. If the operation
+passes the function it applies to each window of data_range configurations, the batch size is then planned from
+measurements: a probe of a few configurations is read to measure the fixed and per-configuration cost of a read, and
+the function is timed on a window of the probe. As the batches are not overlapping, every batch boundary loses the
+windows which would cross it, and as the next batch is read while the windows of the current one are computed, the
+runtime of a plan is about the larger of the two costs per batch. Among the batch sizes which keep nearly all windows,
+the one with the lowest estimated runtime is chosen.
 """
 
 import logging
+import time
 
 from mdsuite.utils.meta_functions import get_machine_properties
 from mdsuite.database.simulation_database import Database
 from mdsuite.utils.scale_functions import *
 import numpy as np
 import sys
-from typing import Tuple
+from typing import Tuple, Callable
 import tensorflow as tf
 
 log = logging.getLogger(__file__)
@@ -43,10 +54,14 @@ class MemoryManager:
     memory_fraction : float
     scale_function : dict
     gpu : bool
+    plan : dict
+            Measurements and estimates behind the planned batch size, None if it was not planned.
     """
 
     def __init__(self, data_path: list = None, database: Database = None, parallel: bool = False,
-                 memory_fraction: float = 0.2, scale_function: dict = None, gpu: bool = False, offset: int = 0):
+                 memory_fraction: float = 0.2, scale_function: dict = None, gpu: bool = False, offset: int = 0,
+                 dtype: tf.DType = tf.float64, data_range: int = None, correlation_time: int = 1,
+                 window_operation: Callable = None, window_tolerance: float = 0.05):
         """
         Constructor for the memory manager.
 
@@ -59,6 +74,18 @@ class MemoryManager:
         scale_function : dict
         gpu : bool
         offset : int
+        dtype : tf.DType
+                Type in which the data is loaded, it sets the memory of a loaded element.
+        data_range : int
+                Number of configurations in a window of the operation.
+        correlation_time : int
+                Number of configurations between the starts of two windows.
+        window_operation : Callable
+                Function applying the operation to the first windows of a batch as it does in the computation, called
+                as window_operation(batch, n_windows) to time it. It must not change the state of the operation. If
+                None, the batch size is the largest which fits into memory.
+        window_tolerance : float
+                Fraction of the windows of the largest batch size which a plan may leave out to run faster.
         """
         if scale_function is None:
             scale_function = {'linear': {'scale_factor': 10}}
@@ -67,6 +94,12 @@ class MemoryManager:
         self.database = database
         self.memory_fraction = memory_fraction
         self.offset = offset
+        self.dtype = dtype
+        self.data_range = data_range
+        self.correlation_time = correlation_time
+        self.window_operation = window_operation
+        self.window_tolerance = window_tolerance
+        self.plan = None
 
         self.machine_properties = get_machine_properties()
         if gpu:
@@ -157,53 +190,175 @@ class MemoryManager:
 
         per_configuration_memory: float = 0
         for item in self.data_path:
-            n_rows, n_columns, n_bytes = self.database.get_data_size(item, system=system)
+            n_rows, n_columns, n_bytes = self.database.get_data_size(item, system=system, itemsize=self.dtype.size)
             per_configuration_memory += (n_bytes / n_columns)
         per_configuration_memory = self.scale_function(per_configuration_memory, **self.scale_function_parameters)
         maximum_loaded_configurations = int(np.clip((self.memory_fraction * self.machine_properties['memory']) /
                                                     per_configuration_memory, 1, n_columns - self.offset))
-        batch_size = self._get_optimal_batch_size(maximum_loaded_configurations)
+        batch_size = self._get_optimal_batch_size(maximum_loaded_configurations, n_columns - self.offset, system)
         number_of_batches = int((n_columns - self.offset) / batch_size)
-        remainder = int(n_columns % batch_size)
+        remainder = int((n_columns - self.offset) % batch_size)
         self.batch_size = batch_size
         self.n_batches = number_of_batches
         self.remainder = remainder
 
         return batch_size, number_of_batches, remainder
 
-    def hdf5_load_time(self, N):
+    def _time_reads(self, n_configurations: int, system: bool) -> Tuple[float, float, tf.Tensor]:
         """
-        Describes the load time of a hdf5 database i.e. O(log N)
+        Measure the cost of reading the data of the operation.
+
+        Two probes at the start of the data are read, the second four times larger than the first, and a line is
+        fitted through their read times.
 
         Parameters
         ----------
-        N : int
-                Amount of data to be loaded
+        n_configurations : int
+                Number of configurations in the larger probe.
+        system : bool
+                If true, the data is a system property.
 
         Returns
         -------
-
+        overhead : float
+                Time in seconds of a read, apart from the configurations read.
+        configuration_time : float
+                Time in seconds to read one configuration.
+        probe : tf.Tensor
+                Data of the larger probe, as loaded for the operation.
+        """
+        times = []
+        probe = None
+        for size in (max(1, n_configurations // 4), n_configurations):
+            configurations = np.s_[self.offset:self.offset + size]
+            select_slice = configurations if system else np.s_[:, configurations]
+            layouts = {} if system else self.database.get_layouts(self.data_path, select_slice)
+            start = time.perf_counter()
+            probe = self.database.load_data(self.data_path, select_slice=select_slice, dtype=self.dtype,
+                                            layouts=layouts)
+            times.append(time.perf_counter() - start)
+
+        small = max(1, n_configurations // 4)
+        configuration_time = (times[1] - times[0]) / (n_configurations - small) if n_configurations > small else 0.0
+        if configuration_time <= 0:
+            # the difference drowned in noise, the whole read time is put on the configurations.
+            return 0.0, times[1] / n_configurations, probe
+
+        return max(times[1] - configuration_time * n_configurations, 0.0), configuration_time, probe
+
+    def _time_windows(self, probe: tf.Tensor, system: bool, repeats: int = 2) -> Tuple[float, float]:
         """
-        yield np.log(N)
+        Measure the time the operation takes for a batch and for each of its windows.
+
+        The operation is applied to one window and to several windows of the probe, the difference of the times
+        being the cost of the additional windows. The first call warms up and is not counted. As other work on the
+        machine only ever adds to a time, the shortest of the repeated calls is taken.
 
-    def _get_optimal_batch_size(self, naive_size):
+        Parameters
+        ----------
+        probe : tf.Tensor
+                Data holding at least one window.
+        system : bool
+                If true, the data is a system property.
+        repeats : int
+                Number of timed calls for each number of windows.
+
+        Returns
+        -------
+        overhead : float
+                Time in seconds spent on a batch apart from its windows.
+        window_time : float
+                Time in seconds spent on a window.
+        """
+        n_configurations = probe.shape[0] if system else probe.shape[1]
+        n_windows = int(np.clip((n_configurations - self.data_range) // self.correlation_time, 1, 32))
+        self.window_operation(probe, 1)
+        times = []
+        for windows in (1, n_windows):
+            calls = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                self.window_operation(probe, windows)
+                calls.append(time.perf_counter() - start)
+            times.append(min(calls))
+
+        if n_windows == 1 or times[1] <= times[0]:
+            return 0.0, times[-1] / n_windows
+        window_time = (times[1] - times[0]) / (n_windows - 1)
+
+        return max(times[0] - window_time, 0.0), window_time
+
+    def _get_optimal_batch_size(self, naive_size: int, n_configurations: int, system: bool = False) -> int:
         """
-        Use the open/close and read speeds of the hdf5 database_path as well as the operation being performed to get an
-        optimal batch size.
+        Plan the batch size from the measured read and compute costs of the operation.
+
+        For every number of batches, the largest batch size which fits into memory is considered. The runtime of a
+        plan is estimated as the read of the first batch and the windows of the last one, plus the larger of the read
+        and compute times for the batches in between, as the next batch is read while the current one is computed.
+        The results are averages over the windows, so among the plans which keep all but window_tolerance of the
+        windows of the largest batch, the one with the lowest runtime per window is chosen.
 
         Parameters
         ----------
         naive_size : int
-                Naive batch size to be optimized
+                Largest batch size which fits into memory.
+        n_configurations : int
+                Number of configurations of the data after the offset.
+        system : bool
+                If true, the data is a system property.
 
         Returns
         -------
         batch_size : int
-                An optimized batch size
+                Planned batch size, naive_size if no window operation is given or a window does not fit into a
+                batch.
         """
-        db_io_time = self.database.get_load_time()
-
-        return naive_size
+        self.plan = None
+        if self.window_operation is None or self.data_range is None:
+            return naive_size
+        largest = min(naive_size, n_configurations)
+        if largest <= self.data_range:
+            return naive_size
+
+        n_batches = np.arange(1, n_configurations // self.data_range + 1)
+        batch_sizes = np.unique(np.minimum(n_configurations // n_batches, largest))
+        batch_sizes = batch_sizes[batch_sizes >= self.data_range]
+        n_batches = n_configurations // batch_sizes
+        ensemble_loops = np.clip((batch_sizes - self.data_range) // self.correlation_time, 1, None)
+        windows = n_batches * ensemble_loops
+        feasible = windows >= (1 - self.window_tolerance) * windows.max()
+
+        read_overhead = configuration_time = batch_overhead = window_time = None
+        runtimes = np.full(len(batch_sizes), np.nan)
+        if np.count_nonzero(feasible) == 1:
+            # there is nothing to choose, so nothing is measured.
+            choice = int(np.argmax(feasible))
+        else:
+            probe_size = min(largest, 2 * self.data_range)
+            read_overhead, configuration_time, probe = self._time_reads(probe_size, system)
+            batch_overhead, window_time = self._time_windows(probe, system)
+            del probe
+
+            read_times = read_overhead + configuration_time * batch_sizes
+            compute_times = batch_overhead + window_time * ensemble_loops
+            runtimes = read_times + compute_times + (n_batches - 1) * np.maximum(read_times, compute_times)
+            costs = np.where(feasible, runtimes / windows, np.inf)
+            choice = int(np.argmin(costs))
+
+        batch_size = int(batch_sizes[choice])
+        self.plan = {'batch_size': batch_size,
+                     'n_batches': int(n_batches[choice]),
+                     'ensemble_loop': int(ensemble_loops[choice]),
+                     'windows': int(windows[choice]),
+                     'candidates': int(np.count_nonzero(feasible)),
+                     'estimated_runtime': float(runtimes[choice]),
+                     'memory_bound_batch_size': int(naive_size),
+                     'read_overhead': read_overhead,
+                     'configuration_read_time': configuration_time,
+                     'batch_overhead': batch_overhead,
+                     'window_time': window_time}
+
+        return batch_size
 
     def _compute_atomwise_minibatch(self, data_range: int):
         """
@@ -216,7 +371,7 @@ class MemoryManager:
         per_configuration_memory = 0  # per configuration memory usage
         total_rows = 0
         for item in self.data_path:
-            n_rows, n_columns, n_bytes = self.database.get_data_size(item, system=False)
+            n_rows, n_columns, n_bytes = self.database.get_data_size(item, system=False, itemsize=self.dtype.size)
             per_configuration_memory += n_bytes / n_columns
             per_atom_memory += per_configuration_memory / n_rows
             total_rows += n_rows
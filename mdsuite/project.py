@@ -20,19 +20,57 @@ compare the results of the analysis on that experiment.
 
 import logging
 
+import concurrent.futures
 import os
 import pickle
+import traceback
 from datetime import datetime
 from pathlib import Path
 
-from typing import Union
+from typing import Optional, Tuple, Union
 import shutil
+from tqdm import tqdm
 from mdsuite.experiment.experiment import Experiment
 from mdsuite.utils.meta_functions import simple_file_read, find_item
 
 log = logging.getLogger(__file__)
 
 
+def _add_experiment_data(experiment_name: str, storage_path: str, trajectory_file: str, file_format: str,
+                         kwargs: dict) -> Tuple[str, Optional[str]]:
+    """
+    Add data to an experiment in a worker process.
+
+    The experiment is loaded from its saved state and saves its new state itself.
+
+    Parameters
+    ----------
+    experiment_name : str
+            Name of the experiment.
+    storage_path : str
+            Directory the experiment is stored in.
+    trajectory_file : str
+            Path to the data to add.
+    file_format : str
+            Format of the data.
+    kwargs : dict
+            Further arguments of Experiment.add_data.
+
+    Returns
+    -------
+    experiment_name : str
+    error : str
+            The traceback of the failure, or None if the data was added.
+    """
+    try:
+        experiment = Experiment(experiment_name, storage_path=storage_path)
+        experiment.add_data(trajectory_file, file_format=file_format, **kwargs)
+    except (Exception, SystemExit):  # the readers report bad input with sys.exit
+        return experiment_name, traceback.format_exc()
+
+    return experiment_name, None
+
+
 class Project:
     """
     Class for the main container of all experiments.
@@ -219,11 +257,51 @@ class Project:
 
         self._save_class()  # Save the class state
 
-    def add_data(self, data_sets: dict, file_format='lammps_traj'):
+    def stitch_experiments(self, experiment: str, segments: list):
+        """
+        Add an experiment which reads the configurations of other experiments of the project as one trajectory.
+
+        Nothing is copied, see Experiment.stitch_segments. The segments can not be removed while the stitched
+        experiment exists.
+
+        Parameters
+        ----------
+        experiment : str
+                Name of the new experiment.
+        segments : list
+                Names of the experiments to stitch, in the order of their configurations, e.g. the restarts of a
+                simulation.
+        """
+        if Path(f"{self.storage_path}/{self.name}/{experiment}").exists():
+            print("This experiment already exists")
+            return
+        missing = [item for item in segments if item not in self.experiments]
+        if missing:
+            print(f"The experiments {missing} do not exist")
+            return
+
+        first = self.experiments[segments[0]]
+        new_experiment = Experiment(experiment,
+                                    storage_path=f"{self.storage_path}/{self.name}",
+                                    time_step=first.time_step,
+                                    units=first.units,
+                                    temperature=first.temperature,
+                                    cluster_mode=first.cluster_mode,
+                                    access_pattern=first.access_pattern,
+                                    compression=first.compression,
+                                    precision=first.precision)
+        new_experiment.stitch_segments([self.experiments[item] for item in segments])
+        self.experiments[new_experiment.analysis_name] = new_experiment
+        self._save_class()
+
+    def add_data(self, data_sets: dict, file_format='lammps_traj', n_jobs: int = 1, **kwargs) -> dict:
         """
         Add data to an experiment. This is a method so that parallelization is possible amongst data addition to
         different experiments at the same time.
 
+        With n_jobs > 1 each experiment is filled in its own worker process, at most n_jobs at a time. A failure in
+        one experiment does not stop the others, the errors are collected and returned.
+
         Parameters
         ----------
         data_sets: dict
@@ -231,22 +309,44 @@ class Project:
         file_format: dict or str
             Dictionary containing the name of the experiment as key and the file_format as value.
             Alternativly only a string of the file_format if all files have the same format.
+        n_jobs : int
+            Number of experiments to fill at the same time.
+        kwargs
+            Further arguments passed on to Experiment.add_data of every experiment, e.g. sort=True.
 
         Returns
         -------
-        Updates the experiment classes.
+        errors : dict
+            Error message of every experiment whose data could not be added, keyed by the experiment name.
+            Updates the experiment classes.
         """
         if isinstance(file_format, dict):
             try:
                 assert file_format.keys() == data_sets.keys()
             except AssertionError:
                 log.error("Keys of the data_sets do not match keys of the file_format")
-
-            for item in data_sets:
-                self.experiments[item].add_data(data_sets[item], file_format=file_format[item])
         else:
+            file_format = {item: file_format for item in data_sets}
+
+        if n_jobs == 1:
             for item in data_sets:
-                self.experiments[item].add_data(data_sets[item], file_format=file_format)
+                self.experiments[item].add_data(data_sets[item], file_format=file_format[item], **kwargs)
+            return {}
+
+        errors = {}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_add_experiment_data, item, self.experiments[item].storage_path,
+                                       data_sets[item], file_format[item], kwargs) for item in data_sets]
+            for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), ncols=70):
+                item, error = future.result()
+                if error is None:
+                    self.experiments[item].load_class()  # the worker saved the new state of the experiment
+                    log.info(f"Added {data_sets[item]} to {item}")
+                else:
+                    errors[item] = error
+                    log.error(f"Could not add {data_sets[item]} to {item}:\n{error}")
+
+        return errors
 
     def get_results(self, key_to_find):
         """
@@ -345,6 +445,12 @@ class Project:
         if experiment_name not in list(self.experiments):
             print("Experiment does not exist")
             return
+        database_file = self.experiments[experiment_name].database_file
+        stitched = [name for name, item in self.experiments.items()
+                    if database_file in (getattr(item, 'segments', None) or [])]
+        if stitched:
+            print(f"The experiments {stitched} are stitched from {experiment_name}, remove or repack them first")
+            return
         else:
             try:
                 dir_path = os.path.join(self.storage_path, self.name, experiment_name)
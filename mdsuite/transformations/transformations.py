@@ -63,8 +63,9 @@ class Transformations:
                 Experiment class object to update
         """
         self.experiment = experiment
-        self.database = Database(name=os.path.join(self.experiment.database_path, "database.hdf5"),
-                                 architecture='simulation')
+        self.database = Database(name=self.experiment.database_file,
+                                 architecture='simulation',
+                                 box=self.experiment.box_array)
         self.batch_size: int
         self.n_batches: int
         self.remainder: int
@@ -133,8 +133,8 @@ class UnwrapViaIndices(Transformations):
         if existing:
             old_shape = self.database.get_data_size(path)
             species_length = len(self.experiment.species[species]['indices'])
-            resize_structure = {path: (species_length, self.experiment.number_of_configurations - old_shape[0], 3)}
-            self.offset = old_shape[0]
+            resize_structure = {path: (species_length, self.experiment.number_of_configurations - old_shape[1], 3)}
+            self.offset = old_shape[1]
             self.database.resize_dataset(resize_structure)  # add a new dataset to the database_path
             data_structure = {path: {'indices': np.s_[:], 'columns': [0, 1, 2], 'length': species_length}}
         else:
@@ -157,11 +157,11 @@ class UnwrapViaIndices(Transformations):
             data_structure = self._prepare_database_entry(species)
             data_path = [join_path(species, 'Positions'), join_path(species, 'Box_Images')]
             self._prepare_monitors(data_path)
-            batch_generator, batch_generator_args = self.data_manager.batch_generator()
+            batch_generator, batch_generator_args = self.data_manager.batch_generator(remainder=True)
             data_set = tf.data.Dataset.from_generator(batch_generator,
                                                       args=batch_generator_args,
                                                       output_signature=tf.TensorSpec(shape=(2, None,
-                                                                                            self.batch_size, 3),
+                                                                                            None, 3),
                                                                                      dtype=tf.float64)
                                                       )
             data_set = data_set.prefetch(tf.data.experimental.AUTOTUNE)
@@ -169,8 +169,8 @@ class UnwrapViaIndices(Transformations):
                 data = self._transformation(batch)
                 self._save_coordinates(data=data,
                                        data_structure=data_structure,
-                                       index=index,
-                                       batch_size=self.batch_size,
+                                       index=index * self.batch_size,
+                                       batch_size=int(data.shape[1]),
                                        system_tensor=False,
                                        tensor=True)
 
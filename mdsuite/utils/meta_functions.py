@@ -138,12 +138,13 @@ def line_counter(filename: str) -> int:
     return sum(1 for _ in open(filename, 'rb'))
 
 
-def optimize_batch_size(filepath: str, number_of_configurations: int) -> int:
+def optimize_batch_size(filepath: str, number_of_configurations: int, file_size: int = None) -> int:
     """
-    Optimize the size of batches during initial processing
+    Estimate the size of batches during initial processing
 
     During the database_path construction a batch size must be chosen in order to process the trajectories with the
-    least RAM but reasonable performance.
+    least RAM but reasonable performance. This estimate only bounds the first batch, the serial reader then adapts the
+    batch size to the measured throughput and memory use, see mdsuite.file_io.batch_controller.
 
     Parameters
     ----------
@@ -154,18 +155,23 @@ def optimize_batch_size(filepath: str, number_of_configurations: int) -> int:
     number_of_configurations : int
             Number of configurations in the trajectory.
 
+    file_size : int
+            Uncompressed size of the file in bytes, e.g. the end of its frame index. If None, the size of the file on
+            disk is used, which underestimates the memory needed for a compressed file.
+
     Returns
     -------
     batch size : int
             Number of configurations to load in each batch
     """
 
-    computer_statistics = get_machine_properties()  # Get computer statistics
+    available_memory = psutil.virtual_memory().available  # the GPUs queried by get_machine_properties are not needed
 
-    file_size = os.path.getsize(filepath)  # Get the size of the file
+    if file_size is None:
+        file_size = os.path.getsize(filepath)  # Get the size of the file
     memory_per_configuration = file_size / number_of_configurations  # get the memory per configuration
-    database_memory = 0.1 * computer_statistics['memory']  # We take 50% of the available memory
-    initial_batch_number = int(database_memory / (5 * memory_per_configuration))  # trivial batch allocation
+    database_memory = 0.1 * available_memory  # We take 10% of the available memory
+    initial_batch_number = max(1, int(database_memory / (5 * memory_per_configuration)))  # trivial batch allocation
 
     # The database_path generation expands memory ~5x
     if 10 * file_size < database_memory:
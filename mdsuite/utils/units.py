@@ -51,6 +51,14 @@ def units_SI():
     return units
 
 
+def units_gromacs():
+    units = {'time': 1e-12, 'length': 1e-9, 'energy': 1000 / 6.02214076e23,
+             'NkTV2p': 16.6054,
+             'boltzman': 0.0083144626, 'temperature': 1, 'pressure': 100000}
+    return units
+
+
 units_dict = {'real': units_real,
               'metal': units_metal,
-              'SI': units_SI}
+              'SI': units_SI,
+              'gromacs': units_gromacs}
@@ -0,0 +1,87 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of timing the operation of a calculator for the batch planner.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import tensorflow as tf
+
+from mdsuite.calculators.calculator import Calculator
+from package_tests.trajectories import ExperimentTestCase
+
+
+class AccumulatingCalculator(Calculator):
+    """
+    Calculator which accumulates the windows it is given into attributes of every kind.
+    """
+
+    def __init__(self, experiment):
+        super().__init__(experiment, data_range=5)
+        self.histograms = {'1': np.zeros(3)}
+        self.total = tf.Variable(tf.zeros(3, dtype=tf.float64))
+        self.values = np.zeros(3)
+        self.windows = []
+        self.count = 0
+        self.recorder = mock.Mock()  # shared with the probe, to see that the operation was applied
+
+    def _update_output_signatures(self):
+        self.ensemble_output_signature = tf.TensorSpec(shape=(None, None, 3), dtype=tf.float64)
+
+    def _apply_operation(self, data, index):
+        window_sum = tf.reduce_sum(data, axis=[0, 1])
+        self.histograms['1'] += window_sum.numpy()
+        self.total.assign_add(window_sum)
+        self.values += window_sum.numpy()
+        self.windows.append(index)
+        self.count += 1
+        self.recorder(index)
+
+    def _calculate_prefactor(self, species=None):
+        pass
+
+    def _apply_averaging_factor(self):
+        pass
+
+    def _post_operation_processes(self, species=None):
+        pass
+
+
+class TestProbeOperation(ExperimentTestCase, unittest.TestCase):
+    """
+    Time the operation of a calculator without changing its accumulators.
+    """
+
+    def test_state(self):
+        """
+        Accumulators which are changed in place or replaced keep their values, the operation is still applied.
+        """
+        experiment = self.new_experiment()
+        experiment.add_array_data({'1': {'Positions': np.ones((4, 20, 3))}}, box=[1.0, 1.0, 1.0])
+        calculator = AccumulatingCalculator(experiment)
+        batch = tf.ones((4, 20, 3), dtype=tf.float64)
+
+        calculator._probe_operation(batch, 3)
+
+        self.assertEqual([call.args[0] for call in calculator.recorder.call_args_list], [0, 1, 2])
+        np.testing.assert_array_equal(calculator.histograms['1'], np.zeros(3))
+        np.testing.assert_array_equal(calculator.total.numpy(), np.zeros(3))
+        np.testing.assert_array_equal(calculator.values, np.zeros(3))
+        self.assertEqual((calculator.windows, calculator.count), ([], 0))
+        self.assertIs(calculator.experiment, experiment)
+        self.assertIsNone(calculator.ensemble_output_signature)
+
+
+if __name__ == '__main__':
+    unittest.main()
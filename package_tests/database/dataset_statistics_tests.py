@@ -0,0 +1,140 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the statistics of datasets which are updated while they are written.
+"""
+
+import unittest
+
+import numpy as np
+
+from mdsuite.database.dataset_statistics import DatasetStatistics, count_box_crossings
+from mdsuite.database.simulation_database import Database
+from package_tests.trajectories import ExperimentTestCase, expected_property, make_trajectory, write_lammps_dump
+
+
+class TestDatasetStatistics(unittest.TestCase):
+    """
+    Compare the merged statistics of batches with those of all the data at once.
+    """
+
+    def setUp(self):
+        """
+        Build wrapped positions of 9 atoms over 40 configurations which cross the box.
+        """
+        self.box = [10.0, 10.0, 10.0]
+        self.data = make_trajectory(n_atoms=9, n_configurations=40, box=10.0)['positions'].transpose(1, 0, 2)
+
+    def assert_equal_statistics(self, statistics: DatasetStatistics, reference: DatasetStatistics):
+        """
+        Check that two statistics agree up to rounding.
+        """
+        self.assertEqual((statistics.start, statistics.stop, statistics.count),
+                         (reference.start, reference.stop, reference.count))
+        np.testing.assert_array_equal(statistics.minimum, reference.minimum)
+        np.testing.assert_array_equal(statistics.maximum, reference.maximum)
+        np.testing.assert_allclose(statistics.mean, reference.mean, rtol=1e-12)
+        np.testing.assert_allclose(statistics.m2, reference.m2, rtol=1e-9)
+        self.assertEqual(statistics.box_crossings, reference.box_crossings)
+
+    def test_from_data(self):
+        """
+        The statistics of a batch are those of numpy.
+        """
+        statistics = DatasetStatistics.from_data(self.data, 0, box=self.box)
+        values = self.data.reshape(-1, 3)
+
+        self.assertEqual(statistics.count, 9 * 40)
+        np.testing.assert_array_equal(statistics.minimum, values.min(axis=0))
+        np.testing.assert_array_equal(statistics.maximum, values.max(axis=0))
+        np.testing.assert_allclose(statistics.mean, values.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(statistics.m2 / statistics.count, values.var(axis=0), rtol=1e-9)
+        self.assertGreater(statistics.box_crossings, 0)
+        self.assertEqual(statistics.box_crossings, count_box_crossings(self.data, self.box))
+
+    def test_merge(self):
+        """
+        Merging the statistics of consecutive batches, including the crossings between them, gives those of all data.
+        """
+        reference = DatasetStatistics.from_data(self.data, 0, box=self.box)
+        for boundaries in ([0, 1, 40], [0, 13, 14, 27, 40], list(range(0, 41, 5))):
+            with self.subTest(boundaries=boundaries):
+                statistics = None
+                for start, stop in zip(boundaries[:-1], boundaries[1:]):
+                    batch = DatasetStatistics.from_data(self.data[:, start:stop], start, box=self.box)
+                    statistics = batch if statistics is None else statistics.merge(batch, box=self.box)
+                self.assert_equal_statistics(statistics, reference)
+
+    def test_attributes(self):
+        """
+        Statistics read from the attributes they are stored as continue to merge.
+        """
+        first = DatasetStatistics.from_data(self.data[:, :25], 0, box=self.box)
+        stored = DatasetStatistics.from_attributes(first.to_attributes())
+        merged = stored.merge(DatasetStatistics.from_data(self.data[:, 25:], 25, box=self.box))
+
+        reference = DatasetStatistics.from_data(self.data, 0, box=self.box)
+        self.assertEqual(merged.count, reference.count)
+        np.testing.assert_allclose(merged.mean, reference.mean, rtol=1e-12)
+        np.testing.assert_allclose(merged.m2, reference.m2, rtol=1e-9)
+        self.assertIsNone(DatasetStatistics.from_attributes({}))
+
+
+class TestStoredStatistics(ExperimentTestCase, unittest.TestCase):
+    """
+    Compare the statistics stored at ingest with those of the written arrays.
+    """
+
+    def assert_statistics(self, experiment, trajectory: dict):
+        """
+        Check the stored statistics of the positions and velocities of every species.
+        """
+        statistics = Database(name=experiment.database_file).get_statistics()
+        for species in ('1', '2'):
+            for name in ('Positions', 'Velocities'):
+                values = expected_property(trajectory, species, name)
+                stored = statistics[f"{species}/{name}"]
+                self.assertEqual(stored['configurations'], values.shape[1])
+                self.assertEqual(stored['count'], values.shape[0] * values.shape[1])
+                np.testing.assert_allclose(stored['minimum'], values.reshape(-1, 3).min(axis=0), atol=1e-6)
+                np.testing.assert_allclose(stored['maximum'], values.reshape(-1, 3).max(axis=0), atol=1e-6)
+                np.testing.assert_allclose(stored['mean'], values.reshape(-1, 3).mean(axis=0), atol=1e-6)
+                np.testing.assert_allclose(stored['variance'], values.reshape(-1, 3).var(axis=0), atol=1e-6)
+                if name == 'Positions':
+                    self.assertEqual(stored['box_crossings'], count_box_crossings(values, [10.0, 10.0, 10.0]))
+
+    def test_serial(self):
+        """
+        The statistics of the batches of a serial read and of an appended file are merged in order.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=40)
+        write_lammps_dump(self.path('first.lammpstraj'), trajectory, frames=range(25))
+        write_lammps_dump(self.path('second.lammpstraj'), trajectory, frames=range(25, 40))
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'))
+        experiment.add_data(self.path('second.lammpstraj'))
+
+        self.assert_statistics(experiment, trajectory)
+
+    def test_parallel(self):
+        """
+        The statistics of batches which are written out of order by the workers are merged in order.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=40)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'), n_jobs=3)
+
+        self.assert_statistics(experiment, trajectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
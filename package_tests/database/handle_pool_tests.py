@@ -0,0 +1,119 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of reusing open hdf5 files within sessions.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import h5py
+import numpy as np
+
+from mdsuite.database.handle_pool import HDF5HandlePool
+
+
+class TestHDF5HandlePool(unittest.TestCase):
+    """
+    Open a small hdf5 file through a pool of its own.
+    """
+
+    def setUp(self):
+        """
+        Write a file with one dataset.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'database.hdf5')
+        with h5py.File(self.file_path, 'w', libver=('v110', 'latest')) as database:
+            database.create_dataset('data', data=np.arange(10.0))
+        self.pool = HDF5HandlePool()
+
+    def tearDown(self):
+        """
+        Close the handles left by a test and remove the file.
+        """
+        self.pool.close_all()
+        for database in self.pool._inherited:
+            database.close()
+        self.directory.cleanup()
+
+    def test_without_session(self):
+        """
+        Outside of a session, every file is closed again when its context ends.
+        """
+        with self.pool.open_file(self.file_path) as database:
+            np.testing.assert_array_equal(database['data'][()], np.arange(10.0))
+        self.assertFalse(database.id.valid)
+        self.assertEqual(self.pool.handles, {})
+
+    def test_nested_sessions(self):
+        """
+        The handle is reused within nested sessions and closed when the outermost one ends.
+        """
+        with self.pool.session():
+            with self.pool.open_file(self.file_path) as first:
+                pass
+            with self.pool.session():
+                with self.pool.open_file(self.file_path) as second:
+                    self.assertIs(second, first)
+            self.assertTrue(first.id.valid)
+            self.assertEqual(self.pool.depth, 1)
+        self.assertFalse(first.id.valid)
+        self.assertEqual((self.pool.depth, self.pool.handles), (0, {}))
+
+    def test_upgrade(self):
+        """
+        A read handle which is no longer held is reopened for writing, and the write handle serves later reads.
+        """
+        with self.pool.session():
+            with self.pool.open_file(self.file_path, 'r') as reader:
+                self.assertEqual(reader.mode, 'r')
+            with self.pool.open_file(self.file_path, 'r+') as writer:
+                self.assertEqual(writer.mode, 'r+')
+                writer['data'][0] = -1.0
+            self.assertFalse(reader.id.valid)
+            with self.pool.open_file(self.file_path, 'r') as database:
+                self.assertIs(database, writer)
+        with h5py.File(self.file_path, 'r') as database:
+            self.assertEqual(database['data'][0], -1.0)
+
+    def test_upgrade_held(self):
+        """
+        A read handle is not closed under a caller which still holds it.
+        """
+        with self.pool.session():
+            with self.pool.open_file(self.file_path, 'r') as reader:
+                with self.assertRaises(RuntimeError):
+                    with self.pool.open_file(self.file_path, 'r+'):
+                        pass
+                self.assertTrue(reader.id.valid)
+                np.testing.assert_array_equal(reader['data'][()], np.arange(10.0))
+
+    def test_fork(self):
+        """
+        In a forked child the handles of the parent are forgotten without being closed.
+        """
+        with self.pool.session():
+            with self.pool.open_file(self.file_path) as parent:
+                with mock.patch('mdsuite.database.handle_pool.os.getpid', return_value=os.getpid() + 1):
+                    with self.pool.open_file(self.file_path) as child:
+                        self.assertIsNot(child, parent)
+                        self.assertEqual(self.pool.depth, 0)
+                    self.assertEqual(self.pool.handles, {})
+                    self.assertFalse(child.id.valid)
+                self.assertTrue(parent.id.valid)
+                self.assertIn(parent, self.pool._inherited)
+
+
+if __name__ == '__main__':
+    unittest.main()
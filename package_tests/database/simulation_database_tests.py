@@ -0,0 +1,259 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of reading and writing the simulation database.
+"""
+
+import os
+import unittest
+
+import numpy as np
+import tensorflow as tf
+
+from mdsuite.database.simulation_database import Database
+from mdsuite.database.storage_backends import DirectoryBackend
+from mdsuite.database.storage_layout import get_time_series_path
+from package_tests.trajectories import ExperimentTestCase, expected_property, make_trajectory, write_lammps_dump
+
+
+class TestPartitionBatch(unittest.TestCase):
+    """
+    Split raw batches into the rows of each species.
+    """
+
+    def setUp(self):
+        """
+        Build a batch of 3 configurations of 4 atoms, two of each species, with the columns id, x, y, z, vx, vy, vz.
+        """
+        self.database = Database(name='unused.hdf5')
+        self.data = np.arange(3 * 4 * 7, dtype=float).reshape(12, 7)
+        self.structure = {}
+        for name, atoms in (('Na', [0, 2]), ('Cl', [1, 3])):
+            rows = [4 * configuration + atom for configuration in range(3) for atom in atoms]
+            # every property gets its own copy of the indices, as built from a species summary.
+            self.structure[f"{name}/Positions"] = {'indices': list(rows), 'columns': [1, 2, 3], 'length': 2}
+            self.structure[f"{name}/Velocities"] = {'indices': list(rows), 'columns': [4, 5, 6], 'length': 2}
+
+    def test_partition(self):
+        """
+        The rows of a species are gathered once for all of its properties.
+        """
+        partitions = [(buffer.copy(), items) for buffer, items in self.database._partition_batch(self.data,
+                                                                                                  self.structure, 3)]
+        self.assertEqual([[item for item, _ in items] for _, items in partitions],
+                         [['Na/Positions', 'Na/Velocities'], ['Cl/Positions', 'Cl/Velocities']])
+        for (buffer, items), atoms in zip(partitions, ([0, 2], [1, 3])):
+            expected = self.data.reshape(3, 4, 7)[:, atoms].transpose(1, 0, 2)
+            np.testing.assert_array_equal(buffer, expected)
+            self.assertEqual(items[1][1], slice(4, 7))
+
+    def test_out_of_range(self):
+        """
+        Indices beyond the rows of the batch are an error instead of being clipped.
+        """
+        self.structure['Cl/Positions']['indices'][-1] = 12
+        with self.assertRaises(IndexError):
+            list(self.database._partition_batch(self.data, self.structure, 3))
+
+
+class TestPrecision(ExperimentTestCase, unittest.TestCase):
+    """
+    Store a trajectory in single precision and load it in both precisions.
+    """
+
+    def setUp(self):
+        """
+        Ingest a lammps dump into an experiment which loads its data in single precision.
+        """
+        super().setUp()
+        self.trajectory = make_trajectory(n_atoms=12, n_configurations=15)
+        write_lammps_dump(self.path('dump.lammpstraj'), self.trajectory)
+        self.experiment = self.new_experiment(precision='float32')
+        self.experiment.add_data(self.path('dump.lammpstraj'))
+        self.database = Database(name=self.experiment.database_file)
+
+    def test_stored(self):
+        """
+        The datasets are stored in single precision.
+        """
+        self.assert_stored(self.experiment, self.trajectory)
+        self.assertEqual(self.database.read_frames('1/Positions').dtype, np.float32)
+
+    def test_load(self):
+        """
+        The data is loaded in the requested precision.
+        """
+        for dtype in (tf.float32, tf.float64):
+            with self.subTest(dtype=dtype.name):
+                data = self.database.load_data(['2/Velocities'], select_slice=np.s_[:, 3:9], dtype=dtype)
+                self.assertEqual(data.dtype, dtype)
+                np.testing.assert_allclose(data.numpy(), expected_property(self.trajectory, '2', 'Velocities',
+                                                                           np.arange(3, 9)), atol=1e-5)
+
+    def test_data_size(self):
+        """
+        The memory of loaded data is counted with the size of the loaded values.
+        """
+        n_atoms, n_configurations, n_bytes = self.database.get_data_size('1/Positions', itemsize=4)
+        self.assertEqual((n_atoms, n_configurations, n_bytes), (6, 15, 6 * 15 * 3 * 4))
+        self.assertEqual(self.database.get_data_size('1/Positions', itemsize=8)[2], 2 * n_bytes)
+
+
+class TestMemoryMap(ExperimentTestCase, unittest.TestCase):
+    """
+    Read contiguous datasets through memory maps.
+    """
+
+    def setUp(self):
+        """
+        Ingest a lammps dump and repack it contiguously.
+        """
+        super().setUp()
+        self.trajectory = make_trajectory(n_atoms=12, n_configurations=20)
+        write_lammps_dump(self.path('first.lammpstraj'), self.trajectory, frames=range(12))
+        write_lammps_dump(self.path('second.lammpstraj'), self.trajectory, frames=range(12, 20))
+        self.experiment = self.new_experiment()
+        self.experiment.add_data(self.path('first.lammpstraj'))
+        self.experiment.repack(contiguous=True)
+        self.database = Database(name=self.experiment.database_file)
+
+    def test_read(self):
+        """
+        Selections of a contiguous dataset are views of the file.
+        """
+        data = self.database.read_frames('1/Positions', np.s_[:, 2:7])
+        self.assertIsInstance(data, np.memmap)
+        np.testing.assert_allclose(data, expected_property(self.trajectory, '1', frames=np.arange(2, 7)), atol=1e-5)
+        loaded = self.database.load_data(['1/Positions'], select_slice=np.s_[[0, 3], :])
+        expected = expected_property(self.trajectory, '1', frames=np.arange(12))[[0, 3]]
+        np.testing.assert_allclose(loaded.numpy(), expected, atol=1e-5)
+
+    def test_rechunked(self):
+        """
+        A map is not used once the dataset is chunked again by appending configurations.
+        """
+        self.database.read_frames('1/Positions')
+        self.experiment.add_data(self.path('second.lammpstraj'))
+
+        data = self.database.read_frames('1/Positions')
+        self.assertNotIsInstance(data, np.memmap)
+        np.testing.assert_allclose(data, expected_property(self.trajectory, '1'), atol=1e-5)
+
+
+class TestDirectoryBackend(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest lammps dumps into a database stored as a directory of chunk files.
+    """
+
+    def test_ingest(self):
+        """
+        Configurations written by this process and appended by several workers are stored in the directory.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=30)
+        write_lammps_dump(self.path('first.lammpstraj'), trajectory, frames=range(12))
+        write_lammps_dump(self.path('second.lammpstraj'), trajectory, frames=range(12, 30))
+        experiment = self.new_experiment(storage_backend='directory')
+        experiment.add_data(self.path('first.lammpstraj'))
+        experiment.add_data(self.path('second.lammpstraj'), n_jobs=2)
+
+        self.assertTrue(os.path.isdir(experiment.database_file))
+        self.assertIsInstance(Database(name=experiment.database_file).backend, DirectoryBackend)
+        self.assert_stored(experiment, trajectory)
+
+    def test_open(self):
+        """
+        Opening the database goes through the backend instead of creating an hdf5 file.
+        """
+        write_lammps_dump(self.path('dump.lammpstraj'), make_trajectory(n_atoms=12, n_configurations=5))
+        experiment = self.new_experiment(storage_backend='directory')
+        experiment.add_data(self.path('dump.lammpstraj'))
+        files = set(os.listdir(os.path.dirname(experiment.database_file)))
+
+        with Database(name=experiment.database_file).open('r') as database:
+            self.assertEqual(database['1/Positions'].shape, (6, 5, 3))
+        self.assertEqual(set(os.listdir(os.path.dirname(experiment.database_file))), files)
+
+    def test_repack(self):
+        """
+        Directory databases can not be repacked.
+        """
+        write_lammps_dump(self.path('dump.lammpstraj'), make_trajectory(n_atoms=12, n_configurations=5))
+        experiment = self.new_experiment(storage_backend='directory')
+        experiment.add_data(self.path('dump.lammpstraj'))
+
+        with self.assertRaises(SystemExit):
+            experiment.repack('time_series')
+
+
+class TestTimeSeriesCopies(ExperimentTestCase, unittest.TestCase):
+    """
+    Keep copies of datasets with the 'time_series' layout and choose between them and the datasets.
+    """
+
+    def assert_copies(self, experiment, names: tuple):
+        """
+        Check that the copies of the given properties, and only those, hold the data of their datasets.
+        """
+        database = Database(name=experiment.database_file)
+        for species in ('1', '2'):
+            for name in ('Positions', 'Velocities'):
+                copy_path = get_time_series_path(f"{species}/{name}")
+                self.assertEqual(database.check_existence(copy_path), name in names)
+                if name in names:
+                    np.testing.assert_array_equal(database.read_frames(copy_path),
+                                                  database.read_frames(f"{species}/{name}"))
+
+    def test_ingest(self):
+        """
+        The copies are created at ingest and extended by appended configurations.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=30)
+        write_lammps_dump(self.path('first.lammpstraj'), trajectory, frames=range(18))
+        write_lammps_dump(self.path('second.lammpstraj'), trajectory, frames=range(18, 30))
+        experiment = self.new_experiment(time_series_properties=['Velocities'])
+        experiment.add_data(self.path('first.lammpstraj'))
+        self.assert_copies(experiment, ('Velocities',))
+        experiment.add_data(self.path('second.lammpstraj'), n_jobs=2)
+
+        self.assert_stored(experiment, trajectory)
+        self.assert_copies(experiment, ('Velocities',))
+
+    def test_set_properties(self):
+        """
+        Copies are built for newly chosen properties and removed for those no longer chosen.
+        """
+        write_lammps_dump(self.path('dump.lammpstraj'), make_trajectory(n_atoms=12, n_configurations=10))
+        experiment = self.new_experiment(time_series_properties=['Velocities'])
+        experiment.add_data(self.path('dump.lammpstraj'))
+        experiment.set_time_series_properties(['Positions'])
+
+        self.assert_copies(experiment, ('Positions',))
+
+    def test_layouts(self):
+        """
+        The copy is read for a few atoms over all configurations, the dataset for all atoms over a few.
+        """
+        rng = np.random.default_rng(0)
+        data = {species: {'Positions': rng.random((500, 1000, 3))} for species in ('1', '2')}
+        experiment = self.new_experiment(time_series_properties=['Positions'])
+        experiment.add_array_data(data, box=[1.0, 1.0, 1.0])
+        database = Database(name=experiment.database_file)
+
+        self.assertEqual(database.get_layouts(['1/Positions'], np.s_[0:2, :]),
+                         {'1/Positions': get_time_series_path('1/Positions')})
+        self.assertEqual(database.get_layouts(['1/Positions'], np.s_[:, 0:10]), {})
+        loaded = database.load_data(['1/Positions'], select_slice=np.s_[0:2, :],
+                                    layouts=database.get_layouts(['1/Positions'], np.s_[0:2, :]))
+        np.testing.assert_allclose(loaded.numpy(), data['1']['Positions'][0:2], atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
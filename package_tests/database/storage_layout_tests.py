@@ -0,0 +1,158 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the chunk layouts of the database and of repacking it.
+"""
+
+import unittest
+
+import h5py
+import numpy as np
+
+from mdsuite.database.storage_layout import get_chunk_shape
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_dump
+
+
+class TestChunkShape(unittest.TestCase):
+    """
+    Check the chunk shapes chosen for the access patterns.
+    """
+
+    def test_batch(self):
+        """
+        Batch chunks hold every atom for as many configurations as fit into a chunk.
+        """
+        self.assertEqual(get_chunk_shape((100, 5000, 3), 'batch', itemsize=4, chunk_size=2 ** 16), (100, 54, 3))
+
+    def test_time_series(self):
+        """
+        Time series chunks hold long runs of configurations of few atoms.
+        """
+        atoms, length, dimensions = get_chunk_shape((100, 5000, 3), 'time_series', itemsize=4, chunk_size=2 ** 16)
+        self.assertEqual((atoms, length, dimensions), (1, 5461, 3))
+
+    def test_frame(self):
+        """
+        Frame chunks hold fewer configurations than batch chunks.
+        """
+        frame = get_chunk_shape((100, 5000, 3), 'frame', itemsize=4, chunk_size=2 ** 16)
+        batch = get_chunk_shape((100, 5000, 3), 'batch', itemsize=4, chunk_size=2 ** 16)
+        self.assertEqual(frame[0], 100)
+        self.assertLess(frame[1], batch[1])
+
+    def test_system_property(self):
+        """
+        Properties of the whole system are chunked along the configurations.
+        """
+        self.assertEqual(get_chunk_shape((10, 6), 'batch'), (16, 6))
+
+    def test_unknown_pattern(self):
+        """
+        Unknown access patterns are rejected.
+        """
+        with self.assertRaises(ValueError):
+            get_chunk_shape((10, 10, 3), 'random')
+
+
+class TestRepack(ExperimentTestCase, unittest.TestCase):
+    """
+    Repack the database of an experiment and check that its data is unchanged.
+    """
+
+    def setUp(self):
+        """
+        Ingest a lammps dump of 20 configurations.
+        """
+        super().setUp()
+        self.trajectory = make_trajectory(n_atoms=12, n_configurations=30)
+        write_lammps_dump(self.path('first.lammpstraj'), self.trajectory, frames=range(20))
+        write_lammps_dump(self.path('second.lammpstraj'), self.trajectory, frames=range(20, 30))
+        self.experiment = self.new_experiment()
+        self.experiment.add_data(self.path('first.lammpstraj'))
+
+    def test_access_pattern(self):
+        """
+        The datasets get the chunks of the new access pattern.
+        """
+        throughput = self.experiment.repack('time_series', compression='gzip:4')
+
+        self.assert_stored(self.experiment, self.trajectory, frames=range(20))
+        self.assertEqual(set(throughput), {'before', 'after'})
+        self.assertEqual(self.experiment.access_pattern, 'time_series')
+        self.assertEqual(self.experiment.compression, 'gzip:4')
+        with h5py.File(self.experiment.database_file, 'r') as database:
+            dataset = database['1/Positions']
+            self.assertEqual(dataset.chunks, get_chunk_shape(dataset.shape, 'time_series', dataset.dtype.itemsize))
+            self.assertEqual(dataset.compression, 'gzip')
+
+    def test_contiguous(self):
+        """
+        Contiguous datasets are chunked again when configurations are appended.
+        """
+        self.experiment.repack(contiguous=True)
+        with h5py.File(self.experiment.database_file, 'r') as database:
+            self.assertIsNone(database['1/Positions'].chunks)
+        self.assert_stored(self.experiment, self.trajectory, frames=range(20))
+
+        self.experiment.add_data(self.path('second.lammpstraj'))
+        self.assert_stored(self.experiment, self.trajectory)
+        with h5py.File(self.experiment.database_file, 'r') as database:
+            self.assertIsNotNone(database['1/Positions'].chunks)
+
+    def test_unknown_pattern(self):
+        """
+        Unknown access patterns and compressions leave the database untouched.
+        """
+        with self.assertRaises(SystemExit):
+            self.experiment.repack('random')
+        with self.assertRaises(SystemExit):
+            self.experiment.repack(compression='zstd')
+        self.assert_stored(self.experiment, self.trajectory, frames=np.arange(20))
+
+
+class TestCompression(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest a lammps dump with every compression policy and compare the stored datasets with the written arrays.
+    """
+
+    def test_policies(self):
+        """
+        The lossless policies store the data exactly, scaleoffset to 5 decimals.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=15)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        filters = {'none': None, 'lzf': 'lzf', 'gzip:6': 'gzip', 'scaleoffset': None}
+        for compression, name in filters.items():
+            with self.subTest(compression=compression):
+                experiment = self.new_experiment(f"Test_{compression.replace(':', '_')}", compression=compression)
+                experiment.add_data(self.path('dump.lammpstraj'))
+                self.assert_stored(experiment, trajectory)
+                with h5py.File(experiment.database_file, 'r') as database:
+                    dataset = database['1/Positions']
+                    self.assertEqual(dataset.compression, name)
+                    self.assertEqual(dataset.scaleoffset is not None, compression == 'scaleoffset')
+
+    def test_benchmark(self):
+        """
+        The benchmark reports one row for every policy it compares.
+        """
+        write_lammps_dump(self.path('dump.lammpstraj'), make_trajectory(n_atoms=12, n_configurations=15))
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'))
+        results = experiment.benchmark_compression(policies=['none', 'gzip:4', 'scaleoffset'])
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(list(results['max error'][:2]), [0.0, 0.0])
+        self.assertLess(results['max error'][2], 1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of adding data held in numpy arrays to an experiment.
+"""
+
+import unittest
+
+import numpy as np
+
+from package_tests.trajectories import ExperimentTestCase, expected_property, make_trajectory, write_lammps_dump
+
+
+def array_data(trajectory: dict, frames: np.ndarray = None) -> dict:
+    """
+    Arrange the configurations of a trajectory in the form taken by add_array_data.
+    """
+    return {species: {name: expected_property(trajectory, species, name, frames)
+                      for name in ('Positions', 'Velocities')}
+            for species in ('1', '2')}
+
+
+class TestAddArrayData(ExperimentTestCase, unittest.TestCase):
+    """
+    Add arrays to experiments and compare the stored datasets with them.
+    """
+
+    def test_data(self):
+        """
+        Arrays of all configurations are stored as if they were read from a trajectory file.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=15)
+        experiment = self.new_experiment()
+        experiment.add_array_data(array_data(trajectory), box=[10.0, 10.0, 10.0], sample_rate=10)
+
+        self.assert_stored(experiment, trajectory)
+        self.assertEqual(experiment.number_of_atoms, 12)
+        self.assertEqual(experiment.sample_rate, 10)
+        self.assertEqual(list(experiment.box_array), [10.0, 10.0, 10.0])
+        self.assertEqual(list(experiment.stored_timesteps), list(range(0, 150, 10)))
+
+    def test_frames(self):
+        """
+        Configurations yielded one at a time are collected into batches.
+        """
+        trajectory = make_trajectory(n_atoms=10, n_configurations=11)
+        frames = ({species: {name: values[:, 0] for name, values in item.items()}
+                   for species, item in array_data(trajectory, [frame]).items()}
+                  for frame in range(11))
+        experiment = self.new_experiment()
+        experiment.add_array_data(frames=frames, box=[10.0, 10.0, 10.0], batch_size=4)
+
+        self.assert_stored(experiment, trajectory)
+        self.assertEqual(list(experiment.stored_timesteps), list(range(11)))
+
+    def test_append_to_file(self):
+        """
+        Arrays appended to the configurations of a file continue its timesteps.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=8)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory, frames=range(5))
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'))
+        experiment.add_array_data(array_data(trajectory, np.arange(5, 8)), box=[10.0, 10.0, 10.0], sample_rate=10)
+
+        self.assert_stored(experiment, trajectory)
+        self.assertEqual(list(experiment.stored_timesteps), list(range(0, 80, 10)))
+
+    def test_layout_mismatch(self):
+        """
+        Arrays whose species do not match the stored ones are rejected.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=4)
+        experiment = self.new_experiment()
+        experiment.add_array_data(array_data(trajectory), box=[10.0, 10.0, 10.0])
+        data = array_data(trajectory)
+        del data['2']
+
+        with self.assertRaises(SystemExit):
+            experiment.add_array_data(data, box=[10.0, 10.0, 10.0])
+        self.assertEqual(experiment.number_of_configurations, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of following trajectory files which are still being written.
+"""
+
+import unittest
+
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_dump
+
+
+class TestFollowData(ExperimentTestCase, unittest.TestCase):
+    """
+    Follow a lammps dump which is written in several steps and compare the stored datasets with the written arrays.
+    """
+
+    def setUp(self):
+        """
+        Write a dump of 10 configurations and keep its contents to write it to the followed file piece by piece.
+        """
+        super().setUp()
+        self.trajectory = make_trajectory(n_atoms=12, n_configurations=10)
+        self.file_path = self.path('dump.lammpstraj')
+        write_lammps_dump(self.file_path, self.trajectory)
+        with open(self.file_path, 'rb') as f:
+            self.contents = f.read()
+        self.offsets = [position for position in range(len(self.contents))
+                        if self.contents.startswith(b'ITEM: TIMESTEP', position)] + [len(self.contents)]
+
+    def write_until(self, n_configurations: int, extra_bytes: int = 0):
+        """
+        Write the contents of the dump up to the end of a configuration, appending to what is already in the file.
+
+        Parameters
+        ----------
+        n_configurations : int
+                Number of configurations in the file afterwards.
+        extra_bytes : int
+                Number of bytes of the next configuration to write as well.
+        """
+        with open(self.file_path, 'ab') as f:
+            f.write(self.contents[f.tell():self.offsets[n_configurations] + extra_bytes])
+
+    def test_follow(self):
+        """
+        Complete configurations are appended, a configuration which is still being written only once it is complete.
+        """
+        open(self.file_path, 'wb').close()
+        self.write_until(6, extra_bytes=100)
+        experiment = self.new_experiment()
+        experiment.follow_data(self.file_path, max_idle_time=0)
+        self.assert_stored(experiment, self.trajectory, frames=range(6))
+
+        self.write_until(10)
+        experiment.follow_data(self.file_path, max_idle_time=0)
+        self.assert_stored(experiment, self.trajectory)
+        self.assertEqual(list(experiment.stored_timesteps), list(range(0, 100, 10)))
+
+    def test_resume(self):
+        """
+        Following is resumed by a new experiment object after the configurations which were already read.
+        """
+        open(self.file_path, 'wb').close()
+        self.write_until(4)
+        self.new_experiment().follow_data(self.file_path, max_idle_time=0)
+        self.write_until(10)
+        experiment = self.new_experiment()
+        experiment.follow_data(self.file_path, max_idle_time=0)
+
+        self.assert_stored(experiment, self.trajectory)
+
+    def test_minimum_configurations(self):
+        """
+        New configurations wait until enough of them have been written.
+        """
+        open(self.file_path, 'wb').close()
+        self.write_until(5)
+        experiment = self.new_experiment()
+        experiment.follow_data(self.file_path, max_idle_time=0)
+        self.write_until(7)
+        experiment.follow_data(self.file_path, max_idle_time=0, minimum_configurations=3)
+        self.assertEqual(experiment.number_of_configurations, 5)
+
+        self.write_until(8)
+        experiment.follow_data(self.file_path, max_idle_time=0, minimum_configurations=3)
+        self.assert_stored(experiment, self.trajectory, frames=range(8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of appending restart trajectories whose timesteps overlap the stored ones.
+"""
+
+import unittest
+
+import numpy as np
+
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_dump
+
+
+class TestRestartAppend(ExperimentTestCase, unittest.TestCase):
+    """
+    Append a restart file which repeats the last configurations of the first file.
+
+    The restart repeats the timesteps 200 to 240 with different values, which must not replace the stored ones.
+    """
+
+    def setUp(self):
+        """
+        Write the first file with the configurations 0 to 24 and the restart with 20 to 37.
+        """
+        super().setUp()
+        self.trajectory = make_trajectory(n_atoms=12, n_configurations=38)
+        restart = make_trajectory(n_atoms=12, n_configurations=38, seed=1)
+        restart['positions'][25:] = self.trajectory['positions'][25:]
+        restart['velocities'][25:] = self.trajectory['velocities'][25:]
+        write_lammps_dump(self.path('first.lammpstraj'), self.trajectory, frames=range(25))
+        write_lammps_dump(self.path('restart.lammpstraj'), restart, frames=range(20, 38))
+
+    def check(self, experiment):
+        """
+        Check that every timestep is stored once, with the values of the file in which it came first.
+        """
+        self.assert_stored(experiment, self.trajectory)
+        self.assertEqual(list(experiment.stored_timesteps), list(range(0, 380, 10)))
+
+    def test_add_data(self):
+        """
+        The repeated configurations of the restart are skipped.
+        """
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'))
+        experiment.add_data(self.path('restart.lammpstraj'))
+
+        self.check(experiment)
+
+    def test_parallel(self):
+        """
+        The repeated configurations are skipped before the batches are given to the workers.
+        """
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'), n_jobs=2)
+        experiment.add_data(self.path('restart.lammpstraj'), n_jobs=2)
+
+        self.check(experiment)
+
+    def test_follow_data(self):
+        """
+        A followed restart only appends its new configurations.
+        """
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'))
+        experiment.follow_data(self.path('restart.lammpstraj'), max_idle_time=0)
+
+        self.check(experiment)
+
+    def test_add_again(self):
+        """
+        Adding a file whose configurations are all stored changes nothing.
+        """
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'))
+        experiment.add_data(self.path('restart.lammpstraj'))
+        experiment.add_data(self.path('first.lammpstraj'))
+
+        self.check(experiment)
+        self.assertEqual(np.unique(experiment.stored_timesteps).size, 38)
+
+
+if __name__ == '__main__':
+    unittest.main()
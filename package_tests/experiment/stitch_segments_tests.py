@@ -0,0 +1,107 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of stitching the databases of several experiments into virtual datasets.
+"""
+
+import os
+import shutil
+import unittest
+
+import h5py
+import numpy as np
+
+from mdsuite.database.simulation_database import Database
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, read_property, write_lammps_dump
+
+
+class TestStitchSegments(ExperimentTestCase, unittest.TestCase):
+    """
+    Stitch three segments of a trajectory, of which the second repeats the last configurations of the first.
+    """
+
+    def setUp(self):
+        """
+        Ingest the configurations 0 to 24, 20 to 37 with other values for the repeated ones, and 38 to 45.
+        """
+        super().setUp()
+        self.trajectory = make_trajectory(n_atoms=12, n_configurations=46)
+        restart = make_trajectory(n_atoms=12, n_configurations=46, seed=1)
+        write_lammps_dump(self.path('a.lammpstraj'), self.trajectory, frames=range(25))
+        write_lammps_dump(self.path('b.lammpstraj'), restart, frames=range(20, 25))
+        write_lammps_dump(self.path('b.lammpstraj'), self.trajectory, frames=range(25, 38), mode='a')
+        write_lammps_dump(self.path('c.lammpstraj'), self.trajectory, frames=range(38, 46))
+        self.segments = []
+        for name in ('a', 'b', 'c'):
+            segment = self.new_experiment(f"Segment_{name}")
+            segment.add_data(self.path(f"{name}.lammpstraj"))
+            self.segments.append(segment)
+
+    def test_stitch(self):
+        """
+        The stitched experiment holds every timestep once, with the values of the segment in which it came first.
+        """
+        experiment = self.new_experiment('Stitched')
+        experiment.stitch_segments(self.segments)
+
+        self.assert_stored(experiment, self.trajectory)
+        self.assertEqual(list(experiment.stored_timesteps), list(range(0, 460, 10)))
+        with h5py.File(experiment.database_file, 'r') as database:
+            self.assertTrue(database['1/Positions'].is_virtual)
+
+    def test_same_as_appended(self):
+        """
+        The stitched datasets equal those of the files appended to one experiment, their statistics up to rounding.
+        """
+        experiment = self.new_experiment('Stitched')
+        experiment.stitch_segments(self.segments)
+        reference = self.new_experiment('Appended')
+        for name in ('a', 'b', 'c'):
+            reference.add_data(self.path(f"{name}.lammpstraj"))
+
+        for path in ('1/Positions', '2/Velocities'):
+            np.testing.assert_array_equal(read_property(experiment, path), read_property(reference, path))
+        statistics = Database(name=experiment.database_file).get_statistics('1/Positions')['1/Positions']
+        expected = Database(name=reference.database_file).get_statistics('1/Positions')['1/Positions']
+        self.assertEqual(statistics['box_crossings'], expected['box_crossings'])
+        np.testing.assert_allclose(statistics['mean'], expected['mean'], rtol=1e-6)
+        np.testing.assert_allclose(statistics['variance'], expected['variance'], rtol=1e-6)
+
+    def test_append(self):
+        """
+        Configurations can not be appended to a stitched experiment until it is repacked.
+        """
+        experiment = self.new_experiment('Stitched')
+        experiment.stitch_segments(self.segments)
+        with self.assertRaises(SystemExit):
+            experiment.add_data(self.path('c.lammpstraj'))
+
+        experiment.repack()
+        for segment in self.segments:
+            shutil.rmtree(os.path.dirname(segment.database_file))
+        self.assert_stored(experiment, self.trajectory)
+
+    def test_mismatch(self):
+        """
+        Segments with other species are rejected.
+        """
+        write_lammps_dump(self.path('other.lammpstraj'), make_trajectory(n_atoms=10, n_configurations=5))
+        other = self.new_experiment('Other')
+        other.add_data(self.path('other.lammpstraj'))
+        experiment = self.new_experiment('Stitched')
+
+        with self.assertRaises(SystemExit):
+            experiment.stitch_segments([self.segments[0], other])
+        self.assertFalse(os.path.exists(experiment.database_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
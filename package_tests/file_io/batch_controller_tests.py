@@ -0,0 +1,138 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the adaptive size of the ingest batches.
+"""
+
+import types
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from mdsuite.file_io.batch_controller import BatchSizeController
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_dump
+
+
+class TestBatchSizeController(unittest.TestCase):
+    """
+    Drive the controller with fixed batch timings and memory, 1 GB of which is available.
+    """
+
+    def setUp(self):
+        """
+        Replace the clock and the memory of the process.
+        """
+        self.clock = mock.patch('mdsuite.file_io.batch_controller.time.perf_counter').start()
+        memory = types.SimpleNamespace(available=1e9)
+        mock.patch('mdsuite.file_io.batch_controller.psutil.virtual_memory', return_value=memory).start()
+        process = mock.patch('mdsuite.file_io.batch_controller.psutil.Process').start()
+        process.return_value.memory_info.return_value = types.SimpleNamespace(rss=0)
+        self.addCleanup(mock.patch.stopall)
+
+    def run_batch(self, controller: BatchSizeController, number_of_configurations: int, elapsed: float,
+                  configuration_size: int = 1000):
+        """
+        Measure a batch which takes the given time to read.
+        """
+        self.clock.side_effect = [0.0, elapsed]
+        controller.start_batch()
+        controller.finish_batch(number_of_configurations, number_of_configurations * configuration_size)
+
+    def test_growth(self):
+        """
+        The batches grow from the probe size while the throughput improves.
+        """
+        controller = BatchSizeController(1000)
+        self.assertEqual(controller.batch_size, 16)
+        self.run_batch(controller, 16, elapsed=1.0)
+        self.run_batch(controller, 32, elapsed=1.0)
+
+        self.assertEqual(controller.batch_size, 64)
+        self.assertEqual(controller.throughput, 32000.0)
+        self.assertFalse(controller.settled)
+
+    def test_settled(self):
+        """
+        Once the throughput stops improving, the best size is kept, even if later batches are faster.
+        """
+        controller = BatchSizeController(1000)
+        self.run_batch(controller, 16, elapsed=1.0)
+        self.run_batch(controller, 32, elapsed=2.0)
+
+        self.assertTrue(controller.settled)
+        self.assertEqual(controller.batch_size, 16)
+        self.run_batch(controller, 16, elapsed=0.1)
+        self.assertEqual(controller.batch_size, 16)
+        self.assertEqual(controller.throughput, 16000.0)
+
+    def test_short_batch(self):
+        """
+        A batch cut short at the end of a file changes neither the size nor the throughput.
+        """
+        controller = BatchSizeController(1000)
+        self.run_batch(controller, 16, elapsed=1.0)
+        self.run_batch(controller, 5, elapsed=1e-3)
+
+        self.assertEqual(controller.batch_size, 32)
+        self.assertEqual(controller.throughput, 16000.0)
+        self.assertFalse(controller.settled)
+
+    def test_memory_limit(self):
+        """
+        The batches are clamped to the number of configurations which fit under the memory ceiling of 100 MB.
+        """
+        controller = BatchSizeController(1000)
+        self.run_batch(controller, 16, elapsed=1.0, configuration_size=10 ** 6)
+        self.run_batch(controller, 32, elapsed=1.0, configuration_size=10 ** 6)
+        self.run_batch(controller, 64, elapsed=1.0, configuration_size=10 ** 6)
+
+        self.assertEqual(controller.batch_size, 100)
+        self.assertTrue(controller.settled)
+        self.run_batch(controller, 100, elapsed=0.1, configuration_size=2 * 10 ** 6)
+        self.assertEqual(controller.batch_size, 50)
+
+
+class TestSmallCeiling(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest a lammps dump with a memory ceiling which only allows batches of a single configuration.
+    """
+
+    def test_ingest(self):
+        """
+        The stored data does not depend on the size of the batches.
+        """
+        batch_sizes = []
+
+        class SmallController(BatchSizeController):
+            """
+            Controller with a ceiling of a few bytes which records the size of every batch.
+            """
+
+            def __init__(self, batch_size: int):
+                super().__init__(batch_size, memory_fraction=1e-12)
+
+            def finish_batch(self, number_of_configurations: int, data_size: int):
+                batch_sizes.append(number_of_configurations)
+                super().finish_batch(number_of_configurations, data_size)
+
+        trajectory = make_trajectory(n_atoms=12, n_configurations=40)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        with mock.patch('mdsuite.experiment.experiment.BatchSizeController', SmallController):
+            experiment.add_data(self.path('dump.lammpstraj'), stride=2)
+
+        self.assertEqual(batch_sizes, [16] + [1] * 4)
+        self.assert_stored(experiment, trajectory, frames=np.arange(0, 40, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
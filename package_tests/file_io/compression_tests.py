@@ -0,0 +1,108 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the ingestion of compressed trajectory files.
+"""
+
+import unittest
+
+import numpy as np
+
+from mdsuite.file_io.compression import compression_openers, is_compressed, open_trajectory
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_binary, write_lammps_dump
+
+
+class TestCompressedIngest(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest compressed lammps dumps and compare the stored datasets with the written arrays.
+    """
+
+    def compress(self, file_path: str, suffix: str) -> str:
+        """
+        Write a compressed copy of a file.
+
+        Parameters
+        ----------
+        file_path : str
+                File to compress.
+        suffix : str
+                Suffix of the compression, e.g. '.gz'.
+
+        Returns
+        -------
+        compressed_path : str
+        """
+        with open(file_path, 'rb') as f:
+            contents = f.read()
+        with compression_openers[suffix](file_path + suffix, 'wb') as f:
+            f.write(contents)
+
+        return file_path + suffix
+
+    def test_open_trajectory(self):
+        """
+        Compressed files are recognised by their suffix and read decompressed.
+        """
+        write_lammps_dump(self.path('dump.lammpstraj'), make_trajectory(n_configurations=3))
+        compressed_path = self.compress(self.path('dump.lammpstraj'), '.gz')
+        self.assertTrue(is_compressed(compressed_path))
+        self.assertFalse(is_compressed(self.path('dump.lammpstraj')))
+        with open_trajectory(compressed_path, 'rb') as f, open(self.path('dump.lammpstraj'), 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_ingest(self):
+        """
+        Every compression is streamed into the same datasets as the uncompressed file.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=15)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        for suffix in compression_openers:
+            with self.subTest(suffix=suffix):
+                experiment = self.new_experiment(f"Test{suffix.replace('.', '_')}")
+                experiment.add_data(self.compress(self.path('dump.lammpstraj'), suffix))
+                self.assert_stored(experiment, trajectory)
+
+    def test_parallel(self):
+        """
+        The workers read their configurations from the decompressed stream.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=20)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.compress(self.path('dump.lammpstraj'), '.gz'), n_jobs=2)
+
+        self.assert_stored(experiment, trajectory)
+
+    def test_frame_selection(self):
+        """
+        Configurations of a compressed file are selected by seeking in the decompressed stream.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=20)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.compress(self.path('dump.lammpstraj'), '.bz2'), start=3, stride=5)
+
+        self.assert_stored(experiment, trajectory, frames=np.arange(3, 20, 5))
+
+    def test_binary(self):
+        """
+        Binary dumps are decompressed in the same way as text dumps.
+        """
+        trajectory = make_trajectory(n_atoms=10, n_configurations=12)
+        write_lammps_binary(self.path('dump.bin'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.compress(self.path('dump.bin'), '.xz'), file_format='lammps_bin')
+
+        self.assert_stored(experiment, trajectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the byte offset index of trajectory files and its sidecar.
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+from mdsuite.file_io.frame_index import FrameIndex
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_dump
+
+
+def read_timestep(f) -> float:
+    """
+    Read the timestep of a lammps configuration, see LAMMPSTrajectoryFile._read_timestep.
+    """
+    f.readline()
+
+    return float(f.readline())
+
+
+class TestFrameIndex(ExperimentTestCase, unittest.TestCase):
+    """
+    Index lammps dumps and check the offsets against the file contents.
+    """
+
+    n_atoms = 6
+
+    def build(self, file_path: str) -> FrameIndex:
+        """
+        Load or build the index of a dump of n_atoms atoms.
+        """
+        return FrameIndex.load_or_build(file_path, 9 + self.n_atoms, time_parser=read_timestep)
+
+    def expected_offsets(self, file_path: str) -> list:
+        """
+        Find the start of every configuration in a dump by searching for its header.
+        """
+        with open(file_path, 'rb') as f:
+            contents = f.read()
+        offsets = []
+        position = contents.find(b'ITEM: TIMESTEP')
+        while position >= 0:
+            offsets.append(position)
+            position = contents.find(b'ITEM: TIMESTEP', position + 1)
+
+        return offsets
+
+    def assert_index(self, frame_index: FrameIndex, file_path: str, timesteps: np.ndarray):
+        """
+        Check the offsets and timesteps of an index of a complete dump.
+        """
+        np.testing.assert_array_equal(frame_index.offsets, self.expected_offsets(file_path))
+        np.testing.assert_array_equal(frame_index.timesteps, timesteps)
+        self.assertEqual(frame_index.end_offset, os.path.getsize(file_path))
+
+    def test_build(self):
+        """
+        The index holds the offset and timestep of every configuration and is stored in a sidecar.
+        """
+        file_path = self.path('dump.lammpstraj')
+        write_lammps_dump(file_path, make_trajectory(self.n_atoms, 10))
+        frame_index = self.build(file_path)
+
+        self.assert_index(frame_index, file_path, 10 * np.arange(10))
+        self.assertTrue(os.path.exists(frame_index.sidecar_path))
+        np.testing.assert_array_equal(frame_index.split(3, start=1), [(1, 4), (4, 7), (7, 10)])
+
+    def test_incomplete_configuration(self):
+        """
+        A configuration which is still being written is only indexed once it is complete.
+        """
+        file_path = self.path('dump.lammpstraj')
+        trajectory = make_trajectory(self.n_atoms, 6)
+        write_lammps_dump(file_path, trajectory, frames=range(5))
+        with open(file_path, 'a') as f:
+            f.write("ITEM: TIMESTEP\n50\nITEM: NUMBER OF ATOMS\n")
+        self.assertEqual(self.build(file_path).number_of_configurations, 5)
+
+        write_lammps_dump(file_path, trajectory, frames=range(6))
+        self.assert_index(self.build(file_path), file_path, 10 * np.arange(6))
+
+    def test_grown_file(self):
+        """
+        The sidecar of a file which has only grown is reused and extended by the new configurations.
+        """
+        file_path = self.path('dump.lammpstraj')
+        trajectory = make_trajectory(self.n_atoms, 12)
+        write_lammps_dump(file_path, trajectory, frames=range(8))
+        self.build(file_path)
+        write_lammps_dump(file_path, trajectory, frames=range(8, 12), mode='a')
+
+        frame_index = FrameIndex(file_path, 9 + self.n_atoms, time_parser=read_timestep)
+        self.assertTrue(frame_index.load())
+        self.assertEqual(frame_index.number_of_configurations, 8)
+        self.assert_index(self.build(file_path), file_path, 10 * np.arange(12))
+
+    def test_overwritten_file(self):
+        """
+        The sidecar of a file which was overwritten by a larger one is not reused.
+        """
+        file_path = self.path('dump.lammpstraj')
+        write_lammps_dump(file_path, make_trajectory(self.n_atoms, 10, seed=0))
+        self.build(file_path)
+        write_lammps_dump(file_path, make_trajectory(self.n_atoms, 13, seed=1), timesteps=5 * np.arange(13))
+
+        frame_index = FrameIndex(file_path, 9 + self.n_atoms, time_parser=read_timestep)
+        self.assertFalse(frame_index.load())
+        self.assert_index(self.build(file_path), file_path, 5 * np.arange(13))
+
+    def test_overwritten_file_with_same_start(self):
+        """
+        A file which keeps the start of the indexed one but differs before the end of the index is indexed again.
+        """
+        file_path = self.path('dump.lammpstraj')
+        first = make_trajectory(self.n_atoms, 10, seed=0)
+        write_lammps_dump(file_path, first)
+        self.build(file_path)
+        second = make_trajectory(self.n_atoms, 14, seed=1)
+        second['positions'][:2] = first['positions'][:2]
+        second['velocities'][:2] = first['velocities'][:2]
+        write_lammps_dump(file_path, second)
+
+        self.assert_index(self.build(file_path), file_path, 10 * np.arange(14))
+
+    def test_reingest_overwritten_file(self):
+        """
+        A trajectory which was overwritten by a larger one is ingested from its new contents.
+        """
+        file_path = self.path('dump.lammpstraj')
+        write_lammps_dump(file_path, make_trajectory(12, 10, seed=0))
+        self.new_experiment('First').add_data(file_path)
+        trajectory = make_trajectory(12, 13, seed=1)
+        write_lammps_dump(file_path, trajectory, timesteps=5 * np.arange(13))
+        experiment = self.new_experiment('Second')
+        experiment.add_data(file_path)
+
+        self.assert_stored(experiment, trajectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
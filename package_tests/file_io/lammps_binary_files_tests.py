@@ -0,0 +1,65 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the ingestion of binary lammps dumps.
+"""
+
+import unittest
+
+import numpy as np
+
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_binary
+
+
+class TestLAMMPSBinaryIngest(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest small binary lammps dumps and compare the stored datasets with the written arrays.
+    """
+
+    def test_ingest(self):
+        """
+        The chunks of every configuration are joined and stored in the datasets of their species.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=17)
+        write_lammps_binary(self.path('dump.bin'), trajectory, chunks=3)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.bin'), file_format='lammps_bin')
+
+        self.assert_stored(experiment, trajectory)
+        self.assertEqual(experiment.sample_rate, 10)
+        np.testing.assert_allclose(experiment.box_array, [10.0, 10.0, 10.0])
+
+    def test_parallel(self):
+        """
+        Configurations read by several processes are stored at their position.
+        """
+        trajectory = make_trajectory(n_atoms=10, n_configurations=22)
+        write_lammps_binary(self.path('dump.bin'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.bin'), file_format='lammps_bin', n_jobs=2)
+
+        self.assert_stored(experiment, trajectory)
+
+    def test_frame_selection(self):
+        """
+        Selected configurations are read through the frame index of the binary file.
+        """
+        trajectory = make_trajectory(n_atoms=10, n_configurations=20)
+        write_lammps_binary(self.path('dump.bin'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.bin'), file_format='lammps_bin', start=2, stop=18, stride=3)
+
+        self.assert_stored(experiment, trajectory, frames=np.arange(2, 18, 3))
+        self.assertEqual(list(experiment.stored_timesteps), list(10 * np.arange(2, 18, 3)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the ingestion of text lammps dumps.
+"""
+
+import unittest
+
+import h5py
+import numpy as np
+
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_dump
+
+
+class TestLAMMPSTrajectoryIngest(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest small lammps dumps and compare the stored datasets with the written arrays.
+    """
+
+    def test_ingest(self):
+        """
+        Every configuration is parsed in bulk into the datasets of its species.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=25)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'))
+
+        self.assert_stored(experiment, trajectory)
+        self.assertEqual(experiment.sample_rate, 10)
+        self.assertEqual(sorted(experiment.species), ['1', '2'])
+
+    def test_element_names(self):
+        """
+        Species named by an element column are stored under their names.
+        """
+        trajectory = make_trajectory(n_atoms=10, n_configurations=8)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory, element=True)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'))
+
+        self.assert_stored(experiment, trajectory, species=('Na', 'Cl'))
+
+    def test_append(self):
+        """
+        A second file is appended after the configurations of the first.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=20)
+        write_lammps_dump(self.path('first.lammpstraj'), trajectory, frames=range(12))
+        write_lammps_dump(self.path('second.lammpstraj'), trajectory, frames=range(12, 20))
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'))
+        experiment.add_data(self.path('second.lammpstraj'))
+
+        self.assert_stored(experiment, trajectory)
+
+    def test_properties(self):
+        """
+        Only the selected properties are stored, also for files appended later.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=14)
+        write_lammps_dump(self.path('first.lammpstraj'), trajectory, frames=range(8))
+        write_lammps_dump(self.path('second.lammpstraj'), trajectory, frames=range(8, 14))
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'), properties=['Positions'])
+        experiment.add_data(self.path('second.lammpstraj'))
+
+        self.assert_stored(experiment, trajectory, names=('Positions',))
+        self.assertEqual(list(experiment.property_groups), ['Positions'])
+        with h5py.File(experiment.database_file, 'r') as database:
+            self.assertNotIn('Velocities', database['1'])
+
+    def test_frame_selection(self):
+        """
+        Only the configurations from start to stop with the given stride are stored, with the sample rate scaled.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=30)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'), start=4, stop=26, stride=3)
+
+        self.assert_stored(experiment, trajectory, frames=np.arange(4, 26, 3))
+        self.assertEqual(experiment.sample_rate, 30)
+        self.assertEqual(list(experiment.stored_timesteps), list(10 * np.arange(4, 26, 3)))
+
+    def test_sort(self):
+        """
+        The atoms of shuffled configurations are moved into the order of their ids, also in appended files.
+        """
+        trajectory = make_trajectory(n_atoms=14, n_configurations=18)
+        write_lammps_dump(self.path('first.lammpstraj'), trajectory, frames=range(10), shuffle=True)
+        write_lammps_dump(self.path('second.lammpstraj'), trajectory, frames=range(10, 18), shuffle=True)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'), sort=True)
+        experiment.add_data(self.path('second.lammpstraj'), sort=True)
+
+        self.assert_stored_by_id(experiment, trajectory)
+
+    def test_sort_ids(self):
+        """
+        Atoms with ids which do not count from 1 are sorted by their ids.
+        """
+        trajectory = make_trajectory(n_atoms=14, n_configurations=12)
+        ids = 3 * np.arange(14)[::-1] + 7
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory, shuffle=True, ids=ids)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'), sort=True)
+
+        self.assert_stored_by_id(experiment, trajectory, ids=ids)
+
+    def test_sort_changed_ids(self):
+        """
+        Configurations with ids which are not in the first configuration, or repeat one, are rejected instead of
+        being misplaced.
+        """
+        trajectory = make_trajectory(n_atoms=14, n_configurations=12)
+        ids = 3 * np.arange(14) + 7
+        for changed_id in (8, 100, -1, ids[4]):
+            with self.subTest(changed_id=changed_id):
+                changed_ids = ids.copy()
+                changed_ids[5] = changed_id
+                name = self.path(f"dump_{changed_id}.lammpstraj")
+                write_lammps_dump(name, trajectory, frames=range(6), shuffle=True, ids=ids)
+                write_lammps_dump(name, trajectory, frames=range(6, 12), shuffle=True, ids=changed_ids, mode='a')
+                experiment = self.new_experiment(f"Test_{changed_id}")
+                with self.assertRaises(SystemExit):
+                    experiment.add_data(name, sort=True)
+
+    def test_sort_ordered(self):
+        """
+        Configurations which are already in order are stored unchanged.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=10)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'), sort=True)
+
+        self.assert_stored(experiment, trajectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the ingestion of trajectories with several processes.
+"""
+
+import unittest
+
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_lammps_dump
+
+
+class TestParallelIngest(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest lammps dumps with several processes and compare the stored datasets with the written arrays.
+    """
+
+    def test_ingest(self):
+        """
+        The batches read by the workers are written at the position of their configurations.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=31)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'), n_jobs=2)
+
+        self.assert_stored(experiment, trajectory)
+
+    def test_sort(self):
+        """
+        The workers sort the atoms of shuffled configurations by their id.
+        """
+        trajectory = make_trajectory(n_atoms=14, n_configurations=20)
+        write_lammps_dump(self.path('dump.lammpstraj'), trajectory, shuffle=True)
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('dump.lammpstraj'), sort=True, n_jobs=3)
+
+        self.assert_stored_by_id(experiment, trajectory)
+
+    def test_append(self):
+        """
+        A file read in parallel is appended after the configurations of a file read in serial.
+        """
+        trajectory = make_trajectory(n_atoms=12, n_configurations=24)
+        write_lammps_dump(self.path('first.lammpstraj'), trajectory, frames=range(10))
+        write_lammps_dump(self.path('second.lammpstraj'), trajectory, frames=range(10, 24))
+        experiment = self.new_experiment()
+        experiment.add_data(self.path('first.lammpstraj'))
+        experiment.add_data(self.path('second.lammpstraj'), n_jobs=2)
+
+        self.assert_stored(experiment, trajectory)
+
+
+if __name__ == '__main__':
+    unittest.main()
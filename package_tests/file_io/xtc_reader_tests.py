@@ -0,0 +1,78 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the ingestion of GROMACS xtc files.
+"""
+
+import unittest
+
+import numpy as np
+
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, write_xtc
+
+
+class TestXTCIngest(ExperimentTestCase, unittest.TestCase):
+    """
+    Ingest small xtc files and compare the stored positions with the written arrays.
+
+    xtc files store the positions with a precision of 1e-3 nm, which bounds the tolerance of the comparisons.
+    """
+
+    def setUp(self):
+        """
+        Write an xtc file of 21 configurations and its gro topology.
+        """
+        super().setUp()
+        self.trajectory = make_trajectory(n_atoms=15, n_configurations=21, box=3.0)
+        self.file_path = self.path('trajectory.xtc')
+        self.topology = self.path('topology.gro')
+        write_xtc(self.file_path, self.topology, self.trajectory)
+
+    def add_data(self, experiment, **kwargs):
+        """
+        Add the xtc file to an experiment.
+        """
+        experiment.add_data(self.file_path, file_format='xtc', topology=self.topology, **kwargs)
+
+    def test_ingest(self):
+        """
+        The decoded positions are stored under the atom names of the topology.
+        """
+        experiment = self.new_experiment(units='gromacs')
+        self.add_data(experiment)
+
+        self.assert_stored(experiment, self.trajectory, species=('Na', 'Cl'), names=('Positions',), atol=2e-3)
+        self.assertEqual(experiment.sample_rate, 10)
+        np.testing.assert_allclose(experiment.box_array, [3.0, 3.0, 3.0], atol=1e-5)
+
+    def test_parallel(self):
+        """
+        The configurations decoded by several processes are stored at their position.
+        """
+        experiment = self.new_experiment(units='gromacs')
+        self.add_data(experiment, n_jobs=2)
+
+        self.assert_stored(experiment, self.trajectory, species=('Na', 'Cl'), names=('Positions',), atol=2e-3)
+
+    def test_stride(self):
+        """
+        Configurations between the selected ones are skipped through the frame index.
+        """
+        experiment = self.new_experiment(units='gromacs')
+        self.add_data(experiment, start=1, stride=4)
+
+        self.assert_stored(experiment, self.trajectory, frames=np.arange(1, 21, 4), species=('Na', 'Cl'),
+                           names=('Positions',), atol=2e-3)
+        self.assertEqual(experiment.sample_rate, 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+Tests of mdsuite.memory_management.
+"""
@@ -0,0 +1,99 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of the batch sizes planned by the memory manager.
+"""
+
+import unittest
+
+import numpy as np
+
+from mdsuite.database.simulation_database import Database
+from mdsuite.memory_management.memory_manager import MemoryManager
+from package_tests.trajectories import ExperimentTestCase
+
+
+class TestBatchPlanning(ExperimentTestCase, unittest.TestCase):
+    """
+    Plan the batches of an operation on 400 configurations of 10 atoms.
+    """
+
+    def setUp(self):
+        """
+        Store the positions of 10 atoms in 400 configurations.
+        """
+        super().setUp()
+        experiment = self.new_experiment()
+        positions = np.random.default_rng(0).random((10, 400, 3))
+        experiment.add_array_data({'1': {'Positions': positions}}, box=[1.0, 1.0, 1.0])
+        self.database = Database(name=experiment.database_file)
+        self.calls = []
+
+    def window_operation(self, batch, n_windows: int):
+        """
+        Record the calls of the planner instead of computing anything.
+        """
+        self.calls.append((tuple(batch.shape), n_windows))
+
+    def get_manager(self, data_range: int = None, correlation_time: int = 1, window_operation=None):
+        """
+        Build a memory manager for the stored positions.
+        """
+        return MemoryManager(data_path=['1/Positions'], database=self.database, data_range=data_range,
+                             correlation_time=correlation_time, window_operation=window_operation)
+
+    def test_without_operation(self):
+        """
+        Without an operation to time, the batch size is the largest which fits into memory.
+        """
+        manager = self.get_manager(data_range=10)
+        batch_size, n_batches, remainder = manager.get_batch_size()
+
+        self.assertEqual((batch_size, n_batches, remainder), (400, 1, 0))
+        self.assertIsNone(manager.plan)
+
+    def test_single_candidate(self):
+        """
+        If only the largest batch keeps enough windows, it is chosen without measuring anything.
+        """
+        manager = self.get_manager(data_range=50, window_operation=self.window_operation)
+        batch_size, _, _ = manager.get_batch_size()
+
+        self.assertEqual(batch_size, 400)
+        self.assertEqual(manager.plan['candidates'], 1)
+        self.assertIsNone(manager.plan['window_time'])
+        self.assertEqual(self.calls, [])
+
+    def test_plan(self):
+        """
+        Among several candidates, the plan keeps enough windows and is based on timing the operation.
+
+        With windows of 10 configurations every 10 configurations, a batch of 400 configurations holds 39 windows,
+        two of 200 hold 38 and forty of 10 hold one each, the other batch sizes hold less than 95 % of the most.
+        """
+        manager = self.get_manager(data_range=10, correlation_time=10, window_operation=self.window_operation)
+        batch_size, n_batches, remainder = manager.get_batch_size()
+        plan = manager.plan
+
+        self.assertIn(batch_size, (10, 200, 400))
+        self.assertEqual(plan['candidates'], 3)
+        self.assertEqual((plan['batch_size'], plan['n_batches']), (batch_size, n_batches))
+        self.assertEqual(n_batches * batch_size + remainder, 400)
+        self.assertEqual(plan['ensemble_loop'], max((batch_size - 10) // 10, 1))
+        self.assertGreaterEqual(plan['windows'], 0.95 * 40)
+        self.assertEqual(plan['memory_bound_batch_size'], 400)
+        self.assertTrue(np.isfinite(plan['estimated_runtime']))
+        self.assertGreater(len(self.calls), 0)
+        self.assertTrue(all(shape == (10, 20, 3) and 1 <= windows <= 32 for shape, windows in self.calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Tests of adding data to the experiments of a project.
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+import mdsuite as mds
+from package_tests.trajectories import ExperimentTestCase, make_trajectory, read_property, write_lammps_dump
+
+
+class TestProjectAddData(ExperimentTestCase, unittest.TestCase):
+    """
+    Fill two experiments of a project, one after the other and in worker processes.
+    """
+
+    def setUp(self):
+        """
+        Write a lammps dump for each of the experiments A and B.
+        """
+        super().setUp()
+        self.trajectories = {'A': make_trajectory(n_atoms=12, n_configurations=20),
+                             'B': make_trajectory(n_atoms=16, n_configurations=15, seed=1)}
+        for name, trajectory in self.trajectories.items():
+            write_lammps_dump(self.path(f"{name}.lammpstraj"), trajectory)
+        self.data_sets = {name: self.path(f"{name}.lammpstraj") for name in self.trajectories}
+
+    def new_project(self, name: str, experiments: tuple = ('A', 'B')) -> mds.Project:
+        """
+        Create a project with empty experiments in the temporary directory.
+        """
+        project = mds.Project(name, storage_path=self.directory)
+        project.add_experiment({item: {'time_step': 0.002, 'temperature': 300.0, 'units': 'metal'}
+                                for item in experiments})
+
+        return project
+
+    def test_parallel(self):
+        """
+        The experiments filled by worker processes hold the data and the saved state of a serial run.
+        """
+        serial = self.new_project('Serial')
+        self.assertEqual(serial.add_data(self.data_sets), {})
+        parallel = self.new_project('Parallel')
+        self.assertEqual(parallel.add_data(self.data_sets, n_jobs=2), {})
+
+        for name, trajectory in self.trajectories.items():
+            reloaded = mds.Experiment(name, storage_path=os.path.join(self.directory, parallel.name))
+            for experiment in (parallel.experiments[name], reloaded):
+                self.assert_stored(experiment, trajectory)
+                self.assertEqual(experiment.number_of_configurations, serial.experiments[name].number_of_configurations)
+                self.assertEqual(experiment.number_of_atoms, serial.experiments[name].number_of_atoms)
+                self.assertEqual(experiment.species, serial.experiments[name].species)
+            for path in ('1/Positions', '2/Velocities'):
+                np.testing.assert_array_equal(read_property(parallel.experiments[name], path),
+                                              read_property(serial.experiments[name], path))
+
+    def test_errors(self):
+        """
+        A file which can not be read is reported without stopping the other experiments.
+        """
+        project = self.new_project('Parallel', experiments=('A', 'B', 'C'))
+        data_sets = dict(self.data_sets, C=self.path('missing.lammpstraj'))
+        errors = project.add_data(data_sets, n_jobs=2)
+
+        self.assertEqual(list(errors), ['C'])
+        self.assertIn('missing.lammpstraj', errors['C'])
+        for name, trajectory in self.trajectories.items():
+            self.assert_stored(project.experiments[name], trajectory)
+        self.assertEqual(project.experiments['C'].number_of_configurations, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
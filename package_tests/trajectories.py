@@ -0,0 +1,331 @@
+"""
+This program and the accompanying materials are made available under the terms of the
+Eclipse Public License v2.0 which accompanies this distribution, and is available at
+https://www.eclipse.org/legal/epl-v20.html
+
+SPDX-License-Identifier: EPL-2.0
+
+Copyright Contributors to the MDSuite Project.
+"""
+
+"""
+Small trajectories with known contents for the package tests.
+
+Summary
+-------
+A trajectory is a dictionary of arrays of shape (n_configurations, n_atoms, 3) for the positions and velocities, the
+type of every atom and the side length of the box. The writers put it into the file formats MDSuite reads, so a test
+can ingest the file and compare the stored datasets with the arrays it was written from.
+"""
+
+import os
+import struct
+import tempfile
+
+import numpy as np
+from mdtraj.formats import XTCTrajectoryFile
+
+import mdsuite as mds
+from mdsuite.database.simulation_database import Database
+
+
+def make_trajectory(n_atoms: int = 12, n_configurations: int = 10, seed: int = 0, box: float = 10.0) -> dict:
+    """
+    Build a random walk of atoms in a periodic box.
+
+    Parameters
+    ----------
+    n_atoms : int
+            Number of atoms, alternately of type 1 and 2.
+    n_configurations : int
+            Number of configurations.
+    seed : int
+            Seed of the random numbers.
+    box : float
+            Side length of the cubic box.
+
+    Returns
+    -------
+    trajectory : dict
+            'positions' and 'velocities' of shape (n_configurations, n_atoms, 3), rounded to the 6 decimals which are
+            written to text files, 'types' of shape (n_atoms,) and 'box'.
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.3, (n_configurations, n_atoms, 3))
+    positions = (rng.random((n_atoms, 3)) * box + np.cumsum(steps, axis=0)) % box
+
+    return {'positions': np.round(positions, 6),
+            'velocities': np.round(rng.normal(0.0, 1.0, (n_configurations, n_atoms, 3)), 6),
+            'types': np.where(np.arange(n_atoms) % 2 == 0, 1, 2),
+            'box': box}
+
+
+def write_lammps_dump(path: str, trajectory: dict, timesteps: np.ndarray = None, frames: np.ndarray = None,
+                      shuffle: bool = False, element: bool = False, mode: str = 'w', ids: np.ndarray = None):
+    """
+    Write a trajectory as a text lammps dump with the columns id, type, x, y, z, vx, vy and vz.
+
+    Parameters
+    ----------
+    path : str
+            Path to the file.
+    trajectory : dict
+            See make_trajectory.
+    timesteps : np.ndarray
+            Timestep of every configuration of the trajectory. If None, 10 times the configuration index.
+    frames : np.ndarray
+            Configurations to write. If None, all of them.
+    shuffle : bool
+            If true, the atoms of every configuration are written in a random order.
+    element : bool
+            If true, the atoms are named Na and Cl in an element column instead of having a type column.
+    mode : str
+            Mode in which the file is opened, 'a' appends to it.
+    ids : np.ndarray
+            Id of every atom. If None, the atoms are numbered from 1.
+    """
+    n_configurations, n_atoms, _ = trajectory['positions'].shape
+    if ids is None:
+        ids = np.arange(1, n_atoms + 1)
+    if timesteps is None:
+        timesteps = 10 * np.arange(n_configurations)
+    if frames is None:
+        frames = np.arange(n_configurations)
+    rng = np.random.default_rng(1)
+    box = trajectory['box']
+    type_column = 'element' if element else 'type'
+    with open(path, mode) as f:
+        for frame in frames:
+            f.write(f"ITEM: TIMESTEP\n{int(timesteps[frame])}\nITEM: NUMBER OF ATOMS\n{n_atoms}\n"
+                    f"ITEM: BOX BOUNDS pp pp pp\n0 {box}\n0 {box}\n0 {box}\n"
+                    f"ITEM: ATOMS id {type_column} x y z vx vy vz\n")
+            order = rng.permutation(n_atoms) if shuffle else np.arange(n_atoms)
+            for atom in order:
+                name = ('Na' if trajectory['types'][atom] == 1 else 'Cl') if element else trajectory['types'][atom]
+                values = np.concatenate((trajectory['positions'][frame, atom], trajectory['velocities'][frame, atom]))
+                f.write(f"{ids[atom]} {name} " + " ".join(f"{value:.6f}" for value in values) + "\n")
+
+
+def write_lammps_binary(path: str, trajectory: dict, timesteps: np.ndarray = None, chunks: int = 2):
+    """
+    Write a trajectory as a binary lammps dump of format revision 2 with the columns id, type, x, y, z, vx, vy, vz.
+
+    Parameters
+    ----------
+    path : str
+            Path to the file.
+    trajectory : dict
+            See make_trajectory.
+    timesteps : np.ndarray
+            Timestep of every configuration. If None, 10 times the configuration index.
+    chunks : int
+            Number of chunks the atoms of a configuration are split into, as written by several processors.
+    """
+    n_configurations, n_atoms, _ = trajectory['positions'].shape
+    if timesteps is None:
+        timesteps = 10 * np.arange(n_configurations)
+    box = trajectory['box']
+    columns = b'id type x y z vx vy vz'
+    magic = b'DUMPCUSTOM'
+    with open(path, 'wb') as f:
+        for frame in range(n_configurations):
+            f.write(struct.pack('<q', -len(magic)) + magic)
+            f.write(struct.pack('<iiqqi', 1, 2, int(timesteps[frame]), n_atoms, 0))
+            f.write(struct.pack('<6i', 0, 0, 0, 0, 0, 0))
+            f.write(struct.pack('<6d', 0.0, box, 0.0, box, 0.0, box))
+            f.write(struct.pack('<i', 8))
+            unit = b'metal' if frame == 0 else b''
+            f.write(struct.pack('<i', len(unit)) + unit)
+            f.write(struct.pack('<b', 1) + struct.pack('<d', 0.002 * timesteps[frame]))
+            f.write(struct.pack('<i', len(columns)) + columns)
+            data = np.column_stack((np.arange(1, n_atoms + 1), trajectory['types'], trajectory['positions'][frame],
+                                    trajectory['velocities'][frame]))
+            f.write(struct.pack('<i', chunks))
+            for part in np.array_split(data, chunks):
+                f.write(struct.pack('<i', part.size) + part.astype('<f8').tobytes())
+
+
+def write_xtc(path: str, topology: str, trajectory: dict, timesteps: np.ndarray = None):
+    """
+    Write a trajectory as a GROMACS xtc file and the atom names as a gro file.
+
+    Parameters
+    ----------
+    path : str
+            Path to the xtc file.
+    topology : str
+            Path to the gro file, whose atoms are named Na and Cl for the types 1 and 2.
+    trajectory : dict
+            See make_trajectory, the lengths are written in nm.
+    timesteps : np.ndarray
+            Timestep of every configuration. If None, 10 times the configuration index.
+    """
+    n_configurations, n_atoms, _ = trajectory['positions'].shape
+    if timesteps is None:
+        timesteps = 10 * np.arange(n_configurations)
+    box = np.tile(np.eye(3, dtype=np.float32) * trajectory['box'], (n_configurations, 1, 1))
+    with XTCTrajectoryFile(path, 'w') as f:
+        f.write(trajectory['positions'].astype(np.float32), time=0.002 * np.asarray(timesteps), step=timesteps,
+                box=box)
+    with open(topology, 'w') as f:
+        f.write(f"test\n{n_atoms:5d}\n")
+        for atom in range(n_atoms):
+            name = 'Na' if trajectory['types'][atom] == 1 else 'Cl'
+            f.write(f"{atom + 1:5d}{'ION':<5s}{name:>5s}{atom + 1:5d}"
+                    + "".join(f"{value:8.3f}" for value in trajectory['positions'][0, atom]) + "\n")
+        f.write(f"{trajectory['box']:10.5f}{trajectory['box']:10.5f}{trajectory['box']:10.5f}\n")
+
+
+def expected_property(trajectory: dict, species: str, name: str = 'Positions', frames: np.ndarray = None):
+    """
+    Arrange a property of the atoms of a species as it is stored in the database.
+
+    Parameters
+    ----------
+    trajectory : dict
+            See make_trajectory.
+    species : str
+            Type of the atoms, '1' or '2', or their element, 'Na' or 'Cl'.
+    name : str
+            'Positions' or 'Velocities'.
+    frames : np.ndarray
+            Configurations to select. If None, all of them.
+
+    Returns
+    -------
+    values : np.ndarray
+            Array of shape (n_atoms, n_configurations, 3) ordered by atom id.
+    """
+    atom_type = {'Na': 1, 'Cl': 2}.get(species, None) or int(species)
+    values = trajectory[name.lower()][:, trajectory['types'] == atom_type]
+    if frames is not None:
+        values = values[frames]
+
+    return values.transpose(1, 0, 2)
+
+
+def read_property(experiment, path: str) -> np.ndarray:
+    """
+    Read a stored dataset of an experiment.
+
+    Parameters
+    ----------
+    experiment : mds.Experiment
+            Experiment whose database is read.
+    path : str
+            Path to the dataset, e.g. '1/Positions'.
+
+    Returns
+    -------
+    values : np.ndarray
+    """
+    return Database(name=experiment.database_file).read_frames(path)
+
+
+class ExperimentTestCase:
+    """
+    Mixin which gives every test a fresh directory to store its experiments in.
+
+    Attributes
+    ----------
+    directory : str
+            Path to the temporary directory of the test.
+    """
+
+    def setUp(self):
+        """
+        Create the temporary directory.
+        """
+        self._directory = tempfile.TemporaryDirectory()
+        self.directory = self._directory.name
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self._directory.cleanup()
+
+    def path(self, name: str) -> str:
+        """
+        Path to a file in the temporary directory.
+        """
+        return os.path.join(self.directory, name)
+
+    def new_experiment(self, name: str = 'Test', **kwargs):
+        """
+        Create an experiment in the temporary directory.
+
+        Parameters
+        ----------
+        name : str
+                Name of the experiment.
+        kwargs
+                Further arguments of mds.Experiment, which replace the metal units, time step and temperature used by
+                default.
+
+        Returns
+        -------
+        experiment : mds.Experiment
+        """
+        settings = {'time_step': 0.002, 'temperature': 300.0, 'units': 'metal'}
+        settings.update(kwargs)
+
+        return mds.Experiment(name, storage_path=self.directory, **settings)
+
+    def assert_stored(self, experiment, trajectory: dict, frames: np.ndarray = None, species: tuple = ('1', '2'),
+                      names: tuple = ('Positions', 'Velocities'), atol: float = 1e-5):
+        """
+        Check that the experiment stores the given configurations of the trajectory.
+
+        Parameters
+        ----------
+        experiment : mds.Experiment
+        trajectory : dict
+                See make_trajectory.
+        frames : np.ndarray
+                Configurations which should be stored. If None, all of them.
+        species : tuple
+                Species to check.
+        names : tuple
+                Properties to check.
+        atol : float
+                Absolute tolerance of the comparison, the default covers the 6 decimals written to text files.
+        """
+        n_configurations = len(trajectory['positions']) if frames is None else len(frames)
+        self.assertEqual(experiment.number_of_configurations, n_configurations)
+        for item in species:
+            for name in names:
+                np.testing.assert_allclose(read_property(experiment, f"{item}/{name}"),
+                                           expected_property(trajectory, item, name, frames), atol=atol)
+
+    def assert_stored_by_id(self, experiment, trajectory: dict, species: tuple = ('1', '2'),
+                            names: tuple = ('Positions', 'Velocities'), ids: np.ndarray = None):
+        """
+        Check that an experiment ingested with sort=True stores every atom of the trajectory under its id.
+
+        The atoms of a species are stored in the order of their ids in the first configuration of the file, which
+        need not be ascending, so the rows are compared with the atoms named by the species indices.
+
+        Parameters
+        ----------
+        experiment : mds.Experiment
+        trajectory : dict
+                See make_trajectory.
+        species : tuple
+                Species to check.
+        names : tuple
+                Properties to check.
+        ids : np.ndarray
+                Id of every atom the trajectory was written with. If None, the atoms are numbered from 1.
+        """
+        if ids is None:
+            ids = np.arange(1, len(trajectory['types']) + 1)
+        atom_of_id = {atom_id: atom for atom, atom_id in enumerate(ids)}
+        self.assertEqual(experiment.number_of_configurations, len(trajectory['positions']))
+        for item in species:
+            atoms = np.array([atom_of_id[atom_id] for atom_id in experiment.species[item]['indices']])
+            atom_type = {'Na': 1, 'Cl': 2}.get(item, None) or int(item)
+            np.testing.assert_array_equal(np.sort(atoms), np.flatnonzero(trajectory['types'] == atom_type))
+            for name in names:
+                np.testing.assert_allclose(read_property(experiment, f"{item}/{name}"),
+                                           trajectory[name.lower()][:, atoms].transpose(1, 0, 2), atol=1e-5)
@@ -0,0 +1,93 @@
+"""
+Compare the throughput of the bulk LAMMPS trajectory parser with the line by line reader it replaced.
+
+Usage: python benchmark_trajectory_parsing.py [trajectory_file]
+
+If no trajectory file is given, a synthetic dump of 20000 atoms and 50 configurations is written to a temporary
+directory, which is removed afterwards together with the frame index of the dump.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from mdsuite.file_io.lammps_trajectory_files import LAMMPSTrajectoryFile
+
+
+def write_synthetic_dump(name: str, number_of_atoms: int = 20000, number_of_configurations: int = 50):
+    """
+    Write a LAMMPS dump with id, type, positions and velocities.
+    """
+    rng = np.random.default_rng(42)
+    with open(name, 'w') as f:
+        for step in range(number_of_configurations):
+            f.write(f"ITEM: TIMESTEP\n{step * 100}\nITEM: NUMBER OF ATOMS\n{number_of_atoms}\n"
+                    f"ITEM: BOX BOUNDS pp pp pp\n0 40.0\n0 40.0\n0 40.0\nITEM: ATOMS id type x y z vx vy vz\n")
+            data = np.column_stack((np.arange(1, number_of_atoms + 1), np.arange(number_of_atoms) % 2 + 1,
+                                    rng.random((number_of_atoms, 3)) * 40, rng.normal(size=(number_of_atoms, 3))))
+            np.savetxt(f, data, fmt=['%d', '%d'] + ['%.6f'] * 6)
+
+
+def legacy_read_configurations(reader, number_of_configurations, file_object, line_length):
+    """
+    The line by line reader used before the bulk parser, kept here as the reference.
+    """
+    configurations_data = np.empty((number_of_configurations * reader.experiment.number_of_atoms, line_length),
+                                   dtype='<U15')
+    counter = 0
+    for i in range(number_of_configurations):
+        for j in range(reader.header_lines):
+            file_object.readline()
+        for k in range(reader.experiment.number_of_atoms):
+            configurations_data[counter] = np.array(list(file_object.readline().split()))
+            counter += 1
+
+    return configurations_data.astype(float)
+
+
+def time_reader(read_function, reader, number_of_configurations, line_length) -> float:
+    """
+    Read the whole file with the given function and return the wall time.
+    """
+    with open(reader.file_path) as f:
+        start = time.perf_counter()
+        read_function(number_of_configurations, f, line_length)
+        stop = time.perf_counter()
+
+    return stop - start
+
+
+def run_benchmark(trajectory: str):
+    """
+    Time both readers on a trajectory file and print their throughput.
+    """
+    reader = LAMMPSTrajectoryFile(SimpleNamespace(), file_path=trajectory)
+    n_atoms = reader._get_number_of_atoms()
+    reader.experiment.number_of_atoms = n_atoms
+    n_configurations = reader._get_number_of_configurations(n_atoms)
+    _, _, _, n_columns = reader._get_species_information(n_atoms)
+    file_size = os.path.getsize(trajectory) / 1e6
+
+    legacy_time = time_reader(lambda *args: legacy_read_configurations(reader, *args), reader, n_configurations,
+                              n_columns)
+    bulk_time = time_reader(reader.read_configurations, reader, n_configurations, n_columns)
+
+    print(f"File size: {file_size:.1f} MB ({n_atoms} atoms, {n_configurations} configurations)")
+    print(f"Line reader: {file_size / legacy_time:8.1f} MB/s")
+    print(f"Bulk parser: {file_size / bulk_time:8.1f} MB/s")
+    print(f"Speed-up:    {legacy_time / bulk_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_benchmark(sys.argv[1])
+    else:
+        # the dump and the frame index written next to it are removed with the directory.
+        with tempfile.TemporaryDirectory() as directory:
+            trajectory = os.path.join(directory, 'benchmark.lammpstraj')
+            write_synthetic_dump(trajectory)
+            run_benchmark(trajectory)